@@ -0,0 +1,88 @@
+"""Сравнение кодеков кеша на типичных значениях.
+
+Запуск из каталога async_api:
+
+    PYTHONPATH=src python benchmarks/cache_codecs.py
+"""
+import timeit
+from uuid import uuid4
+
+import orjson
+
+import legacy_models
+from db.redis.codecs import CODECS
+from models.film import Actor, DetailFilm, Director, Genre, ShortFilm, Writer
+
+NUMBER = 2000
+
+
+def make_short_films(count: int = 50) -> list[ShortFilm]:
+    return [
+        ShortFilm(uuid=uuid4(), title=f'Star Wars {i}', imdb_rating=7.5)
+        for i in range(count)
+    ]
+
+
+def make_detail_film(actors: int = 50) -> DetailFilm:
+    return DetailFilm(
+        uuid=uuid4(),
+        title='Star Wars',
+        imdb_rating=8.6,
+        description='A long time ago in a galaxy far, far away...' * 5,
+        actors=tuple(Actor(uuid=uuid4(), full_name=f'Actor {i}') for i in range(actors)),
+        writers=(Writer(uuid=uuid4(), full_name='George Lucas'),),
+        directors=(Director(uuid=uuid4(), full_name='George Lucas'),),
+        genre=tuple(Genre(uuid=uuid4(), name=name) for name in ('Action', 'Sci-Fi')),
+    )
+
+
+def legacy_encode(films: list[legacy_models.ShortFilm]) -> bytes:
+    """Прежний формат: json каждой pydantic-модели, затем orjson списка строк."""
+    return orjson.dumps([film.json(by_alias=True) for film in films])
+
+
+def legacy_decode(data: bytes) -> list[legacy_models.ShortFilm]:
+    return [legacy_models.ShortFilm.parse_raw(item) for item in orjson.loads(data)]
+
+
+def to_legacy(film: DetailFilm) -> legacy_models.DetailFilm:
+    return legacy_models.DetailFilm.parse_raw(orjson.dumps(film))
+
+
+def bench(name: str, encode, decode) -> None:
+    data = encode()
+    enc = timeit.timeit(encode, number=NUMBER) / NUMBER * 1e6
+    dec = timeit.timeit(lambda: decode(data), number=NUMBER) / NUMBER * 1e6
+    print(f'{name:<28} {enc:>10.1f} {dec:>10.1f} {len(data):>8}')
+
+
+def main() -> None:
+    films = make_short_films()
+    film = make_detail_film()
+    print(f'{"codec":<28} {"encode,us":>10} {"decode,us":>10} {"bytes":>8}')
+
+    print('-- list[ShortFilm] x50')
+    legacy_films = [legacy_models.ShortFilm.parse_raw(orjson.dumps(f)) for f in films]
+    bench('legacy json-in-json', lambda: legacy_encode(legacy_films), legacy_decode)
+    for codec_name, codec_class in CODECS.items():
+        codec = codec_class()
+        bench(
+            codec_name,
+            lambda: codec.encode(films),
+            lambda data: codec.decode_many(data, ShortFilm),
+        )
+
+    print('-- DetailFilm, 50 actors')
+    legacy_film = to_legacy(film)
+    bench('legacy json', legacy_film.json, legacy_models.DetailFilm.parse_raw)
+    for codec_name, codec_class in CODECS.items():
+        codec = codec_class()
+        bench(
+            codec_name,
+            lambda: codec.encode(film),
+            lambda data: codec.decode(data, DetailFilm),
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Сравнение прежних pydantic-моделей и компактных slotted-моделей.
+
+Для фильма с 50 актерами измеряются время построения из _source
+elastic и из словаря кеша, а также память, которую удерживает
+построенная модель: число выделенных блоков (объектов) и байты
+по tracemalloc.
+
+Запуск из каталога async_api:
+
+    PYTHONPATH=src python benchmarks/domain_models.py
+"""
+import gc
+import time
+import tracemalloc
+
+import orjson
+
+import legacy_models
+from models.film import DetailFilm
+from response_path import make_film_source
+
+NUMBER = 2000
+RETAINED = 100
+
+
+def bench(name: str, func) -> None:
+    func()
+    started = time.process_time()
+    for _ in range(NUMBER):
+        func()
+    elapsed = (time.process_time() - started) / NUMBER * 1e6
+    print(f'{name:<36} {elapsed:>10.1f}')
+
+
+def retained(name: str, func) -> None:
+    """Память, удерживаемая RETAINED построенными моделями, на одну модель."""
+    func()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    films = [func() for _ in range(RETAINED)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats) / RETAINED
+    size = sum(stat.size_diff for stat in stats) / RETAINED
+    print(f'{name:<36} {blocks:>10.0f} {size:>10.0f}')
+    del films
+
+
+def main() -> None:
+    source = make_film_source()
+    cached = orjson.loads(orjson.dumps(DetailFilm.from_source(source)))
+
+    builders = {
+        'pydantic via SerializedFilm': lambda: legacy_models.legacy_detail_film(source),
+        'pydantic from_source': lambda: legacy_models.DetailFilm.from_source(source),
+        'slotted from_source': lambda: DetailFilm.from_source(source),
+    }
+    from_cache = {
+        'pydantic parse_obj': lambda: legacy_models.DetailFilm.parse_obj(cached),
+        'pydantic construct, no nesting': lambda: legacy_models.DetailFilm.construct(**cached),
+        'slotted from_dict': lambda: DetailFilm.from_dict(cached),
+    }
+
+    print(f'{"DetailFilm, 50 actors":<36} {"cpu,us":>10}')
+    print('-- from elastic _source')
+    for name, func in builders.items():
+        bench(name, func)
+    print('-- from cache dict')
+    for name, func in from_cache.items():
+        bench(name, func)
+
+    print()
+    print(f'{"retained per film":<36} {"blocks":>10} {"bytes":>10}')
+    for name, func in builders.items():
+        retained(name, func)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Прежние pydantic-модели, оставленные только для сравнения в бенчмарках.
+
+SerializedFilm - модель документа movies, через которую раньше строился
+DetailFilm; остальные - прежние доменные модели на pydantic.
+"""
+from typing import List
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+
+
+def orjson_dumps(v, *, default):
+    return orjson.dumps(v, default=default).decode()
+
+
+class BaseOrjsonModel(BaseModel):
+    class Config:
+        json_loads = orjson.loads
+        json_dumps = orjson_dumps
+
+
+class UUIDMixin(BaseOrjsonModel):
+    uuid: UUID
+
+
+class Person(BaseModel):
+    id: UUID
+    name: str
+
+
+class SerializedGenre(BaseModel):
+    id: UUID
+    name: str
+
+
+class SerializedFilm(BaseModel):
+    id: UUID
+    imdb_rating: float
+    genre: List[SerializedGenre] | None
+    title: str
+    description: str | None
+    director: List[Person] | None
+    actors_names: List[str] | None
+    writers_names: List[str] | None
+    actors: List[Person] | None
+    writers: List[Person] | None
+
+
+def _people(people: list[dict] | None) -> list[dict] | None:
+    if people is None:
+        return None
+    return [{'uuid': person['id'], 'full_name': person['name']} for person in people]
+
+
+class Actor(UUIDMixin):
+    full_name: str
+
+
+class Writer(Actor):
+    pass
+
+
+class Director(Actor):
+    pass
+
+
+class Genre(UUIDMixin):
+    name: str
+
+
+class ShortFilm(UUIDMixin):
+    title: str
+    imdb_rating: float
+
+    @classmethod
+    def from_source(cls, source: dict):
+        return cls(
+            uuid=source['id'],
+            title=source['title'],
+            imdb_rating=source['imdb_rating'],
+        )
+
+
+class DetailFilm(ShortFilm):
+    description: str | None
+    actors: List[Actor] | None
+    writers: List[Writer] | None
+    directors: List[Director] | None
+    genre: List[Genre] | None
+
+    @classmethod
+    def from_source(cls, source: dict):
+        """Модель валидируется один раз, без промежуточной SerializedFilm."""
+        genre = source.get('genre')
+        return cls.parse_obj({
+            'uuid': source['id'],
+            'title': source['title'],
+            'imdb_rating': source['imdb_rating'],
+            'description': source.get('description'),
+            'actors': _people(source.get('actors')),
+            'writers': _people(source.get('writers')),
+            'directors': _people(source.get('director')),
+            'genre': None if genre is None else [
+                {'uuid': g['id'], 'name': g['name']} for g in genre
+            ],
+        })
+
+
+def legacy_detail_film(source: dict) -> DetailFilm:
+    """Самый старый путь: DetailFilm через SerializedFilm."""
+    serialized = SerializedFilm(**source)
+    return DetailFilm(
+        uuid=serialized.id,
+        title=serialized.title,
+        imdb_rating=serialized.imdb_rating,
+        description=serialized.description,
+        genre=[Genre(uuid=g.id, name=g.name) for g in serialized.genre],
+        actors=[Actor(uuid=a.id, full_name=a.name) for a in serialized.actors],
+        writers=[Writer(uuid=w.id, full_name=w.name) for w in serialized.writers],
+        directors=[Director(uuid=d.id, full_name=d.name) for d in serialized.director],
+    )
@@ -0,0 +1,98 @@
+"""Сравнение пути от _source elastic до байтов ответа.
+
+Прежний путь: SerializedFilm -> DetailFilm -> dict -> модель ответа ->
+валидация response_model и jsonable_encoder в FastAPI -> orjson.
+Быстрый путь: DetailFilm.from_source -> orjson.
+
+Запуск из каталога async_api:
+
+    PYTHONPATH=src python benchmarks/response_path.py
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.v1.response_models import Film, FilmSearch
+from api.v1.utils import json_response
+from legacy_models import ShortFilm as LegacyShortFilm, legacy_detail_film
+from models.film import DetailFilm, ShortFilm
+
+NUMBER = 2000
+
+
+def make_film_source(actors: int = 50) -> dict:
+    return {
+        'id': str(uuid4()),
+        'imdb_rating': 8.6,
+        'genre': [{'id': str(uuid4()), 'name': name} for name in ('Action', 'Sci-Fi')],
+        'title': 'Star Wars',
+        'description': 'A long time ago in a galaxy far, far away...' * 5,
+        'director': [{'id': str(uuid4()), 'name': 'George Lucas'}],
+        'actors': [{'id': str(uuid4()), 'name': f'Actor {i}'} for i in range(actors)],
+        'writers': [{'id': str(uuid4()), 'name': 'George Lucas'}],
+    }
+
+
+def make_short_sources(count: int = 50) -> list[dict]:
+    return [
+        {'id': str(uuid4()), 'title': f'Star Wars {i}', 'imdb_rating': 7.5}
+        for i in range(count)
+    ]
+
+
+async def bench(name: str, func) -> None:
+    await func()
+    started = time.process_time()
+    for _ in range(NUMBER):
+        await func()
+    elapsed = (time.process_time() - started) / NUMBER * 1e6
+    print(f'{name:<28} {elapsed:>10.1f}')
+
+
+async def main() -> None:
+    film_source = make_film_source()
+    short_sources = make_short_sources()
+    film_field = create_response_field('film', Film)
+    films_field = create_response_field('films', list[FilmSearch])
+
+    async def legacy_detail():
+        film = legacy_detail_film(film_source)
+        content = await serialize_response(
+            field=film_field, response_content=Film(**film.dict())
+        )
+        return ORJSONResponse(content).body
+
+    async def fast_detail():
+        return json_response(DetailFilm.from_source(film_source)).body
+
+    async def legacy_list():
+        films = [
+            LegacyShortFilm(uuid=s['id'], title=s['title'], imdb_rating=s['imdb_rating'])
+            for s in short_sources
+        ]
+        content = await serialize_response(
+            field=films_field,
+            response_content=[FilmSearch(**film.dict()) for film in films],
+        )
+        return ORJSONResponse(content).body
+
+    async def fast_list():
+        return json_response(
+            [ShortFilm.from_source(s) for s in short_sources]
+        ).body
+
+    print(f'{"path":<28} {"cpu,us":>10}')
+    print('-- film details, 50 actors')
+    await bench('legacy', legacy_detail)
+    await bench('fast', fast_detail)
+    print('-- list[ShortFilm] x50')
+    await bench('legacy', legacy_list)
+    await bench('fast', fast_list)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
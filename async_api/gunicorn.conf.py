@@ -0,0 +1,22 @@
+"""Настройки gunicorn для сбора метрик со всех воркеров.
+
+Воркеры пишут метрики в PROMETHEUS_MULTIPROC_DIR: при старте мастера
+каталог очищается от файлов прошлого запуска, а при завершении
+воркера его gauge-метрики перестают учитываться.
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
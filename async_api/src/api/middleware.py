@@ -0,0 +1,101 @@
+import time
+from typing import Callable
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import REQUEST_LATENCY
+from services.cache import served_expired, served_stale_for
+
+STALE_HEADER = 'X-Stale-Seconds'
+
+
+class StaleDataMiddleware:
+    """Помечает ответы, собранные из устаревших данных кеша.
+
+    Если сервис отдал устаревшую запись, в ответ добавляется
+    STALE_HEADER с возрастом данных в секундах. Cache-Control маршрута
+    при этом сохраняется: stale-while-revalidate допускает такие
+    ответы. Только для последнего известного значения при недоступном
+    elastic Cache-Control заменяется на no-cache, чтобы такой ответ не
+    отдавался из кешей без повторной проверки.
+    ASGI-middleware без отдельной задачи: эндпоинт выполняется в том же
+    контексте, поэтому отметка сервиса видна при отправке заголовков.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        token = served_stale_for.set(None)
+        expired_token = served_expired.set(False)
+
+        async def send_with_stale_header(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                stale_for = served_stale_for.get()
+                if stale_for is not None:
+                    headers[STALE_HEADER] = str(int(stale_for))
+                if served_expired.get():
+                    headers['Cache-Control'] = 'no-cache'
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stale_header)
+        finally:
+            served_stale_for.reset(token)
+            served_expired.reset(expired_token)
+
+
+class MetricsMiddleware:
+    """Гистограмма времени запросов по шаблону маршрута и статусу.
+
+    Маршрут берется шаблоном (/api/v1/films/{film_id}), а не путем
+    запроса, чтобы число рядов метрики не зависело от id. Роутер
+    записывает эндпоинт в scope, по нему и находится шаблон.
+    После каждого запроса вызываются observers - обновление метрик
+    пулов соединений.
+    """
+
+    def __init__(self, app: ASGIApp, observers: tuple[Callable[[], None], ...] = ()):
+        self.app = app
+        self.observers = observers
+        self._route_paths: dict[Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(
+                scope['method'], self._route(scope), str(status)
+            ).observe(time.perf_counter() - started)
+            for observe in self.observers:
+                observe()
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        if not self._route_paths:
+            routes: list[BaseRoute] = scope['app'].routes
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in routes if hasattr(route, 'endpoint')
+            }
+        return self._route_paths.get(endpoint, 'unmatched')
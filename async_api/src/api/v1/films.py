@@ -1,24 +1,42 @@
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
+from db.elastic.base import SearchCursor
+from db.redis.base import make_tags
+from db.redis.response import ResponseCacheRepository, get_response_cache_repository
 from services.film import FilmService, get_film_service
 from core.messages import FILM_NOT_FOUND, TOTAL_FILM_NOT_FOUND
-from .response_models import FilmSearch, Film
-from .utils import PaginateQueryParams
+from .response_models import FilmBatch, FilmSearch, Film
+from .utils import (
+    FILM_CACHE_CONTROL,
+    NEXT_CURSOR_HEADER,
+    SEARCH_CACHE_CONTROL,
+    PaginateQueryParams,
+    cache_response,
+    cached_not_modified,
+    cached_response,
+    conditional_response,
+    cursor_query,
+    json_response,
+)
 
 router = APIRouter()
 
 
 @router.get('/search', response_model=list[FilmSearch])
 async def film_search(
+        request: Request,
+        response: Response,
         pqp: PaginateQueryParams = Depends(PaginateQueryParams),
         film_title: str = Query(
             'star',
             description="Название Кинопроизведения."),
+        cursor: SearchCursor | None = Depends(cursor_query),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         film_service: FilmService = Depends(get_film_service)
-) -> list[FilmSearch]:
+) -> Response:
     """
       возвращает список фильмов с похожим названием (с учетом пагинации):
       - **uuid**: id фильма
@@ -26,22 +44,68 @@ async def film_search(
       - **imdb_rating**: рейтинг фильма
     """
 
-    films = await film_service.get_by_title(film_title,
-                                            pqp.page_size, 
-                                            pqp.page_number)
+    # Страницы по курсору в кеш ответов не попадают.
+    if cursor is None:
+        cached = await cached_response(request, response_cache)
+        if cached:
+            return cached
+    if cursor is not None:
+        films, next_cursor = await film_service.get_by_title_after(
+            film_title, pqp.page_size, cursor
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor.encode()
+    else:
+        films = await film_service.get_by_title(film_title,
+                                                pqp.page_size,
+                                                pqp.page_number)
     if not films:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=TOTAL_FILM_NOT_FOUND)
-    return [FilmSearch(**film.dict()) for film in films]
+    body = json_response(films, response)
+    not_modified = conditional_response(request, body, SEARCH_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    if cursor is None:
+        await cache_response(
+            request, response_cache, body,
+            tags=['movies', *make_tags('movies', *(film.uuid for film in films))],
+        )
+    return body
+
+
+@router.post('/batch', response_model=list[Film])
+async def films_batch(
+        batch: FilmBatch,
+        film_service: FilmService = Depends(get_film_service)
+) -> Response:
+    """
+    Возвращает информацию о нескольких фильмах по списку id
+    (в порядке запроса, ненайденные id пропускаются):
+
+    - **uuid**: id фильма
+    - **title**: название фильма
+    - **imdb_rating**: рейтинг фильма
+    - **description**: описание фильма
+    - **actors**: актеры
+    - **writers**: сценаристы
+    - **directors**:  режиссеры
+    - **genre**: жанры
+    """
+    films = await film_service.get_many(batch.ids)
+    return json_response(films)
 
 
 @router.get('/{film_id}', response_model=Film)
 async def film_details(
+        request: Request,
+        response: Response,
         film_id: str = Query(
             '025c58cd-1b7e-43be-9ffb-8571a613579b',
             description="UUID фильма"
         ),
-        film_service: FilmService = Depends(get_film_service)) -> Film:
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
+        film_service: FilmService = Depends(get_film_service)) -> Response:
     """
     Возвращает информацию о фильме по его id:
 
@@ -55,15 +119,32 @@ async def film_details(
     - **genre**: жанры
     """
 
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
+    not_modified = await cached_not_modified(
+        request, lambda: film_service.get_etag(film_id), FILM_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     film = await film_service.get_by_id(film_id)
     if not film:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=FILM_NOT_FOUND % ('film id', film_id))
-    return Film(**film.dict())
+    body = json_response(film, response)
+    not_modified = conditional_response(request, body, FILM_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(
+        request, response_cache, body, tags=make_tags('movies', film.uuid)
+    )
+    return body
 
 
 @router.get('/', response_model=list[FilmSearch])
 async def films_sort(
+        request: Request,
+        response: Response,
         pqp: PaginateQueryParams = Depends(PaginateQueryParams),
         sort: str = Query(
             '-imdb_rating', regex='^-imdb_rating$|^imdb_rating$',
@@ -73,8 +154,10 @@ async def films_sort(
         genre_id: UUID | None = Query(
             None, description="id Жанра"
         ),
+        cursor: SearchCursor | None = Depends(cursor_query),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         film_service: FilmService = Depends(get_film_service)) \
-        -> list[FilmSearch]:
+        -> Response:
     """
        Возвращает отсортированный список фильмов (с учетом пагинации и жанра):
        - **uuid**: id фильма
@@ -82,11 +165,32 @@ async def films_sort(
        - **imdb_rating**: рейтинг фильма
     """
 
-    films = await film_service.get_by_sort(sort,
-                                           pqp.page_size,
-                                           pqp.page_number,
-                                           genre_id)
+    # Страницы по курсору в кеш ответов не попадают.
+    if cursor is None:
+        cached = await cached_response(request, response_cache)
+        if cached:
+            return cached
+    if cursor is not None:
+        films, next_cursor = await film_service.get_by_sort_after(
+            sort, pqp.page_size, genre_id, cursor
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor.encode()
+    else:
+        films = await film_service.get_by_sort(sort,
+                                               pqp.page_size,
+                                               pqp.page_number,
+                                               genre_id)
     if not films:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=TOTAL_FILM_NOT_FOUND)
-    return [FilmSearch(**film.dict()) for film in films]
+    body = json_response(films, response)
+    not_modified = conditional_response(request, body, FILM_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    if cursor is None:
+        await cache_response(
+            request, response_cache, body,
+            tags=['movies', *make_tags('movies', *(film.uuid for film in films))],
+        )
+    return body
@@ -1,35 +1,61 @@
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
+from db.redis.base import make_tags
+from db.redis.response import ResponseCacheRepository, get_response_cache_repository
 from services.genre import GenreService, get_genre_service
 from core.messages import GENRE_NOT_FOUND, TOTAL_GENRES_NOT_FOUND
 from .response_models import ResponseGenre
+from .utils import (
+    GENRE_CACHE_CONTROL,
+    cache_response,
+    cached_not_modified,
+    cached_response,
+    conditional_response,
+    json_response,
+)
 
 router = APIRouter()
 
 
 @router.get('/', response_model=list[ResponseGenre])
-async def get_genres(genre_service: GenreService = Depends(get_genre_service)):
+async def get_genres(
+        request: Request,
+        response: Response,
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
+        genre_service: GenreService = Depends(get_genre_service)
+):
     """
        Возвращает список всех жанров одним списком:
        - **uuid**: id жанра
        - **name**: название жанра
     """
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
     genres = await genre_service.get_all()
     if not genres:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=TOTAL_GENRES_NOT_FOUND)
-    return [ResponseGenre(**genre.dict()) for genre in genres]
+    body = json_response(genres, response)
+    not_modified = conditional_response(request, body, GENRE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(request, response_cache, body, tags=['genres'])
+    return body
 
 
 @router.get('/{genre_id}', response_model=ResponseGenre)
 async def detail_genre(
+        request: Request,
+        response: Response,
         genre_id: UUID = Query(
             '6c162475-c7ed-4461-9184-001ef3d9f26e',
             description=' UUID жанра',
         ),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         genre_service: GenreService = Depends(get_genre_service)
 ):
     """
@@ -38,8 +64,23 @@ async def detail_genre(
            - **name**: название жанра
     """
 
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
+    not_modified = await cached_not_modified(
+        request, lambda: genre_service.get_etag(genre_id), GENRE_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     genre = await genre_service.get_by_id(genre_id)
     if not genre:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=GENRE_NOT_FOUND % ('genre id', genre_id))
-    return ResponseGenre(**genre.dict())
+    body = json_response(genre, response)
+    not_modified = conditional_response(request, body, GENRE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(
+        request, response_cache, body, tags=make_tags('genres', genre.uuid)
+    )
+    return body
@@ -1,42 +1,78 @@
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
+from db.redis.base import make_tags
+from db.redis.response import ResponseCacheRepository, get_response_cache_repository
 from services.person import PersonService, get_person_service
 from core.messages import TOTAL_PERSON_NOT_FOUND, PERSON_NOT_FOUND, PERSONS_FILMS_NOT_FOUND
 from .response_models import PersonFilm, ResponsePerson
-from .utils import PaginateQueryParams
+from .utils import (
+    PERSON_CACHE_CONTROL,
+    SEARCH_CACHE_CONTROL,
+    PaginateQueryParams,
+    cache_response,
+    cached_not_modified,
+    cached_response,
+    conditional_response,
+    json_response,
+)
 
 router = APIRouter()
 
 
 @router.get('/{person_id}/film/', response_model=list[PersonFilm])
 async def person_films(
+        request: Request,
+        response: Response,
+        pqp: PaginateQueryParams = Depends(PaginateQueryParams),
         person_id: UUID = Query(
             'a5a8f573-3cee-4ccc-8a2b-91cb9f55250a',
             description='UUID персоны'
         ),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         person_service: PersonService = Depends(get_person_service)
 ):
     """
-       Возвращает список фильмов в создании которых приняла участие персона с переданным id:
+       Возвращает список фильмов в создании которых приняла участие персона с переданным id
+       (по убыванию рейтинга, с учетом пагинации):
        - **uuid**: id фильма
        - **name**: название фильма
     """
-    films = await person_service.get_films_for_person(person_id)
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
+    films = await person_service.get_films_for_person(person_id,
+                                                      pqp.page_size,
+                                                      pqp.page_number)
     if films is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=PERSONS_FILMS_NOT_FOUND)
-    return films
+    body = json_response(films, response)
+    not_modified = conditional_response(request, body, PERSON_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(
+        request, response_cache, body,
+        tags=[
+            'movies',
+            *make_tags('persons', person_id),
+            *make_tags('movies', *(film.uuid for film in films)),
+        ],
+    )
+    return body
 
 
 @router.get('/{person_id}', response_model=ResponsePerson)
 async def detail_person(
+        request: Request,
+        response: Response,
         person_id: UUID = Query(
             'a5a8f573-3cee-4ccc-8a2b-91cb9f55250a',
             description='UUID персоны'
         ),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         person_service: PersonService = Depends(get_person_service)
 ):
     """
@@ -45,20 +81,38 @@ async def detail_person(
        - **full_name**: полное имя персоны
        - **films**: список фильмов в которых уччастовала персона (id фильма и роль)
     """
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
+    not_modified = await cached_not_modified(
+        request, lambda: person_service.get_etag(person_id), PERSON_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     person = await person_service.get_by_id(person_id)
     if not person:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=PERSON_NOT_FOUND % ('person_id', person_id))
-    return ResponsePerson(**person.dict())
+    body = json_response(person, response)
+    not_modified = conditional_response(request, body, PERSON_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(
+        request, response_cache, body, tags=make_tags('persons', person.uuid)
+    )
+    return body
 
 
 @router.get('/search/', response_model=list[ResponsePerson])
 async def search_person(
+        request: Request,
+        response: Response,
         pqp: PaginateQueryParams = Depends(PaginateQueryParams),
         person_name: str = Query(
             'George Lucas',
             description='Имя персоны для нечеткого поиска'
         ),
+        response_cache: ResponseCacheRepository | None = Depends(get_response_cache_repository),
         person_service: PersonService = Depends(get_person_service)
 ):
     """
@@ -67,10 +121,21 @@ async def search_person(
        - **full_name**: полное имя персоны
        - **films**: список фильмов в которых участовала персона (id фильма и роль)
     """
+    cached = await cached_response(request, response_cache)
+    if cached:
+        return cached
     persons = await person_service.search_person(person_name,
                                                  pqp.page_size,
                                                  pqp.page_number)
     if not persons:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND,
                             detail=TOTAL_PERSON_NOT_FOUND)
-    return [ResponsePerson(**p.dict())for p in persons]
+    body = json_response(persons, response)
+    not_modified = conditional_response(request, body, SEARCH_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    await cache_response(
+        request, response_cache, body,
+        tags=['persons', *make_tags('persons', *(person.uuid for person in persons))],
+    )
+    return body
@@ -1,5 +1,7 @@
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from core.config import settings
 
 # Модели films.py
 class Person(BaseModel):
@@ -29,6 +31,10 @@ class FilmSearch(BaseModel):
     imdb_rating: float
 
 
+class FilmBatch(BaseModel):
+    ids: list[UUID] = Field(..., min_items=1, max_items=settings.film_batch_max_size)
+
+
 # Модель genres.py
 class ResponseGenre(BaseModel):
     uuid: UUID
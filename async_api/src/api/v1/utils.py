@@ -1,4 +1,104 @@
-from fastapi import Query
+from http import HTTPStatus
+from typing import Awaitable, Callable, Iterable
+
+import orjson
+from fastapi import HTTPException, Query, Request, Response
+
+from core import deadline
+from core.config import settings
+from core.messages import INVALID_CURSOR
+from db.elastic.base import SearchCursor
+from db.redis.base import make_etag
+from db.redis.response import CachedResponse, ResponseCacheRepository
+from models.base import DomainModel
+from services.cache import served_expired, served_stale_for
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def cache_control(max_age: int, stale: int = 0) -> str:
+    """Значение заголовка Cache-Control для публичного ответа."""
+    directives = ['public', f'max-age={max_age}']
+    if stale:
+        directives.append(f'stale-while-revalidate={stale}')
+    return ', '.join(directives)
+
+
+# Клиенты и CDN хранят ответ не дольше, чем его держит кеш API.
+FILM_CACHE_CONTROL = cache_control(settings.film_cache_ttl, settings.cache_stale_ttl)
+GENRE_CACHE_CONTROL = cache_control(settings.genre_cache_ttl, settings.cache_stale_ttl)
+PERSON_CACHE_CONTROL = cache_control(settings.person_cache_ttl, settings.cache_stale_ttl)
+SEARCH_CACHE_CONTROL = cache_control(settings.search_cache_ttl)
+
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    """Проверка If-None-Match (слабое сравнение ETag)."""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    etags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return etag.removeprefix('W/') in etags
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={'ETag': etag, 'Cache-Control': cache_control},
+    )
+
+
+async def request_deadline(request: Request) -> None:
+    """Дедлайн запроса: ROUTE_DEADLINES по имени эндпоинта или REQUEST_DEADLINE."""
+    endpoint = getattr(request.scope.get('endpoint'), '__name__', None)
+    seconds = settings.route_deadlines.get(endpoint, settings.request_deadline)
+    if seconds > 0:
+        deadline.set_deadline(seconds)
+
+
+async def cached_not_modified(
+        request: Request,
+        get_etag: Callable[[], Awaitable[str | None]],
+        cache_control: str
+) -> Response | None:
+    """Ответ 304 по ETag записи в кеше, без загрузки и сборки модели.
+
+    Проверка необязательна и пропускается, если бюджет запроса почти
+    исчерпан: ETag все равно сверяется после загрузки.
+    """
+    if (
+        'if-none-match' not in request.headers
+        or deadline.nearly_spent(settings.request_deadline_reserve)
+    ):
+        return None
+    etag = await get_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return None
+
+
+def conditional_response(
+        request: Request,
+        response: Response,
+        cache_control: str
+) -> Response | None:
+    """Выставить ETag тела ответа и Cache-Control; вернуть 304, если копия клиента актуальна.
+
+    ETag считается по уже закодированному телу, повторно значение не
+    кодируется. С кодеком orjson тело совпадает с записью в кеше, и
+    cached_not_modified сверяет тот же ETag без загрузки модели.
+    """
+    etag = make_etag(response.body)
+    if etag_matches(request, etag):
+        response_304 = not_modified(etag, cache_control)
+        # Без курсора клиент не сможет читать выдачу дальше.
+        if NEXT_CURSOR_HEADER in response.headers:
+            response_304.headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+        return response_304
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = cache_control
+    return None
 
 
 class PaginateQueryParams:
@@ -22,3 +122,90 @@ class PaginateQueryParams:
     ):
         self.page_number = page_number
         self.page_size = page_size
+
+
+def json_response(
+        value: DomainModel | list[DomainModel],
+        response: Response | None = None
+) -> Response:
+    """Ответ из уже закодированного JSON, без повторной валидации.
+
+    Поля доменных моделей совпадают с моделями ответа, поэтому orjson
+    кодирует их напрямую; response_model остается только для схемы
+    OpenAPI. Заголовки (ETag, Cache-Control) переносятся из response.
+    """
+    return Response(
+        orjson.dumps(value),
+        media_type='application/json',
+        headers=dict(response.headers) if response is not None else None,
+    )
+
+
+# Заголовки, которые сохраняются вместе с телом ответа.
+_CACHED_HEADERS = ('etag', 'cache-control')
+
+
+async def cached_response(
+        request: Request,
+        response_cache: ResponseCacheRepository | None
+) -> Response | None:
+    """Готовый ответ из кеша ответов: GET из redis без работы с моделями."""
+    if response_cache is None:
+        return None
+    entry = await response_cache.get_response(
+        response_cache.response_key(request.url.path, request.query_params.multi_items())
+    )
+    if entry is None or entry.is_stale:
+        return None
+    headers = entry.value.headers
+    if etag_matches(request, headers.get('etag')):
+        return not_modified(headers['etag'], headers['cache-control'])
+    return Response(entry.value.body, media_type='application/json', headers=headers)
+
+
+async def cache_response(
+        request: Request,
+        response_cache: ResponseCacheRepository | None,
+        response: Response,
+        tags: Iterable[str]
+) -> None:
+    """Сохранить тело и заголовки ответа; tags - теги данных ответа.
+
+    Ответ из устаревших данных не сохраняется. Запись необязательна и
+    пропускается, если бюджет запроса почти исчерпан.
+    """
+    if (
+        response_cache is not None
+        and served_stale_for.get() is None
+        and not served_expired.get()
+        and not deadline.nearly_spent(settings.request_deadline_reserve)
+    ):
+        await response_cache.put_response(
+            response_cache.response_key(request.url.path, request.query_params.multi_items()),
+            CachedResponse(
+                body=response.body,
+                headers={
+                    name: value for name, value in response.headers.items()
+                    if name in _CACHED_HEADERS
+                },
+            ),
+            tags=tags,
+        )
+
+
+def cursor_query(
+        cursor: str | None = Query(
+            None,
+            description="Курсор следующей страницы из заголовка X-Next-Cursor "
+                        "(пустое значение - первая страница). Если задан, "
+                        "page_number не учитывается.",
+        )
+) -> SearchCursor | None:
+    """Dependency: курсор для постраничного чтения без from/size."""
+    if cursor is None:
+        return None
+    try:
+        return SearchCursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                            detail=INVALID_CURSOR)
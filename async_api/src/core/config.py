@@ -14,6 +14,40 @@ class Settings(BaseSettings):
     redis_port: int = Field(6379, env='REDIS_PORT')
     elastic_host: str = Field('localhost', env='ELASTICSEARCH_HOST')
     elastic_port: int = Field(9200, env='ELASTICSEARCH_PORT')
+    film_cache_ttl: int = Field(60 * 5, env='FILM_CACHE_TTL')
+    genre_cache_ttl: int = Field(60 * 60, env='GENRE_CACHE_TTL')
+    person_cache_ttl: int = Field(60 * 5, env='PERSON_CACHE_TTL')
+    cache_stale_ttl: int = Field(60 * 10, env='CACHE_STALE_TTL')
+    cache_fallback_ttl: int = Field(60 * 60 * 24, env='CACHE_FALLBACK_TTL')
+    search_cache_ttl: int = Field(60, env='SEARCH_CACHE_TTL')
+    search_cache_max_entries: int = Field(10_000, env='SEARCH_CACHE_MAX_ENTRIES')
+    response_cache_ttl: int = Field(60, env='RESPONSE_CACHE_TTL')
+    local_cache_size: int = Field(1024, env='LOCAL_CACHE_SIZE')
+    local_cache_ttl: int = Field(10, env='LOCAL_CACHE_TTL')
+    cache_lock_enabled: bool = Field(False, env='CACHE_LOCK_ENABLED')
+    cache_changes_stream: str = Field('cache:changes', env='CACHE_CHANGES_STREAM')
+    cache_generation_refresh_interval: float = Field(
+        1, env='CACHE_GENERATION_REFRESH_INTERVAL'
+    )
+    cache_warmup_pages: int = Field(3, env='CACHE_WARMUP_PAGES')
+    cache_warmup_page_size: int = Field(50, env='CACHE_WARMUP_PAGE_SIZE')
+    cache_warmup_top_films: int = Field(50, env='CACHE_WARMUP_TOP_FILMS')
+    cache_warmup_concurrency: int = Field(4, env='CACHE_WARMUP_CONCURRENCY')
+    cache_warmup_interval: int = Field(60 * 5, env='CACHE_WARMUP_INTERVAL')
+    film_batch_max_size: int = Field(100, env='FILM_BATCH_MAX_SIZE')
+    elastic_msearch_batching: bool = Field(True, env='ELASTIC_MSEARCH_BATCHING')
+    elastic_use_pit: bool = Field(False, env='ELASTIC_USE_PIT')
+    elastic_breaker_enabled: bool = Field(True, env='ELASTIC_BREAKER_ENABLED')
+    elastic_breaker_failure_rate: float = Field(0.5, env='ELASTIC_BREAKER_FAILURE_RATE')
+    elastic_breaker_slow_call: float = Field(1.0, env='ELASTIC_BREAKER_SLOW_CALL')
+    elastic_breaker_open_timeout: int = Field(10, env='ELASTIC_BREAKER_OPEN_TIMEOUT')
+    request_deadline: float = Field(2.0, env='REQUEST_DEADLINE')
+    route_deadlines: dict[str, float] = Field({}, env='ROUTE_DEADLINES')
+    request_deadline_reserve: float = Field(0.1, env='REQUEST_DEADLINE_RESERVE')
+    genre_catalog_refresh_interval: int = Field(60, env='GENRE_CATALOG_REFRESH_INTERVAL')
+    dataloader_enabled: bool = Field(True, env='DATALOADER_ENABLED')
+    dataloader_window: float = Field(0, env='DATALOADER_WINDOW')
+    cache_codec: str = Field('orjson', env='CACHE_CODEC')
     base_dir: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
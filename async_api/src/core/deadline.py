@@ -0,0 +1,68 @@
+"""Дедлайн текущего запроса.
+
+Дедлайн хранится в contextvar как момент time.monotonic() и виден всем
+вызовам внутри запроса, в том числе задачам, созданным из него.
+Транспорт elastic и соединения redis берут из него таймауты, а
+необязательная работа пропускается, когда бюджет почти исчерпан.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator
+
+# Минимальный таймаут: нулевой redis и elastic понимают как "без таймаута".
+MIN_TIMEOUT_IN_SECONDS = 0.001
+
+_deadline: ContextVar[float | None] = ContextVar('deadline', default=None)
+
+
+def set_deadline(seconds: float) -> None:
+    """Установить дедлайн через seconds секунд от текущего момента."""
+    _deadline.set(time.monotonic() + seconds)
+
+
+def current() -> float | None:
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Сколько секунд осталось до дедлайна; None - дедлайна нет."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def timeout(default: float | None = None) -> float | None:
+    """Таймаут вызова: остаток дедлайна, но не больше default."""
+    left = remaining()
+    if left is None:
+        return default
+    left = max(left, MIN_TIMEOUT_IN_SECONDS)
+    return left if default is None else min(left, default)
+
+
+def nearly_spent(reserve: float) -> bool:
+    """Осталось меньше reserve секунд: необязательную работу пропускаем."""
+    left = remaining()
+    return left is not None and left < reserve
+
+
+def latest(deadlines: Iterable[float | None]) -> float | None:
+    """Самый поздний из дедлайнов; None, если у кого-то дедлайна нет."""
+    result = None
+    for deadline in deadlines:
+        if deadline is None:
+            return None
+        result = deadline if result is None else max(result, deadline)
+    return result
+
+
+@contextmanager
+def scope(deadline: float | None) -> Iterator[None]:
+    """Выполнить блок с заданным дедлайном (момент time.monotonic())."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -1,8 +1,12 @@
+# Common messages
+STORAGE_UNAVAILABLE = 'Storage is unavailable, try again later.'
 # Films messages
 TOTAL_FILM_NOT_FOUND = 'Films is not found.'
 FILM_NOT_FOUND = 'Film(s) with %s: %s is not found.'
 FILM_NOT_FOUND_ES = 'Film(s) with %s: %s is not found in elastic!'
 FILM_CACHE_NOT_FOUND = 'Film(s) with %s: %s is not in cache!'
+INVALID_CURSOR = 'Cursor is invalid.'
+EXPIRED_CURSOR = 'Cursor is expired or invalid, start from the first page.'
 # Genres messages
 TOTAL_GENRES_NOT_FOUND = 'Genres is not found!!'
 GENRE_NOT_FOUND = 'Genres with %s: %s is not found.'
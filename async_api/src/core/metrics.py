@@ -0,0 +1,91 @@
+"""Метрики Prometheus.
+
+Под gunicorn каждый воркер пишет метрики в файлы каталога
+PROMETHEUS_MULTIPROC_DIR, а /metrics любого воркера собирает их все
+через MultiProcessCollector (см. gunicorn.conf.py). Без этой
+переменной окружения используется обычный реестр процесса.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки запроса API',
+    ['method', 'route', 'status'],
+)
+
+CACHE_HITS = Counter('cache_hits_total', 'Попадания в кеш', ['repository'])
+CACHE_MISSES = Counter('cache_misses_total', 'Промахи кеша', ['repository'])
+CACHE_SETS = Counter('cache_sets_total', 'Записи в кеш', ['repository'])
+CACHE_STALE_HITS = Counter(
+    'cache_stale_hits_total', 'Отданные устаревшие записи кеша', ['cache']
+)
+CACHE_COALESCED = Counter(
+    'cache_coalesced_loads_total',
+    'Загрузки, объединенные с уже идущей загрузкой того же ключа',
+    ['cache'],
+)
+CACHE_FALLBACKS = Counter(
+    'cache_fallbacks_total',
+    'Последние известные значения, отданные при недоступном хранилище',
+    ['cache'],
+)
+
+ELASTIC_REQUEST_DURATION = Histogram(
+    'elastic_request_duration_seconds',
+    'Время запроса к elastic с точки зрения клиента',
+    ['operation'],
+)
+ELASTIC_TOOK = Histogram(
+    'elastic_took_seconds',
+    'Время выполнения запроса в elastic (поле took ответа)',
+    ['operation'],
+)
+ELASTIC_ERRORS = Counter(
+    'elastic_request_errors_total', 'Запросы к elastic с ошибкой', ['operation']
+)
+ELASTIC_BREAKER_STATE = Gauge(
+    'elastic_breaker_state',
+    'Состояние breaker: 0 - closed, 1 - half-open, 2 - open',
+    multiprocess_mode='livemax',
+)
+ELASTIC_BREAKER_TRANSITIONS = Counter(
+    'elastic_breaker_transitions_total', 'Переходы breaker в состояние', ['state']
+)
+ELASTIC_BREAKER_REJECTED = Counter(
+    'elastic_breaker_rejected_total', 'Запросы, отклоненные открытым breaker'
+)
+
+DATALOADER_BATCH_SIZE = Histogram(
+    'dataloader_batch_size',
+    'Число ключей в пакете загрузчика',
+    ['loader'],
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+POOL_CONNECTIONS = Gauge(
+    'pool_connections',
+    'Соединения в пулах клиентов redis и elastic',
+    ['pool', 'state'],
+    multiprocess_mode='livesum',
+)
+
+
+def render() -> tuple[bytes, str]:
+    """Тело и content-type ответа /metrics."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
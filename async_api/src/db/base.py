@@ -43,7 +43,7 @@ class AbstractCacheStorage(abc.ABC):
     def _set(self, key, value):
         """Установить данные по ключу со значением."""
 
-    def _key_generate(*args, **kwargs) -> str:
+    def _key_generate(self, *args, **kwargs) -> str:
         """Генерация ключа для хранения в кеш"""
 
     @abc.abstractmethod
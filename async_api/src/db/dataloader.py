@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from core import deadline
+from core.metrics import DATALOADER_BATCH_SIZE
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+MAX_BATCH_SIZE = 100
+
+
+class DataLoader(Generic[K, V]):
+    """Объединение точечных чтений по ключу в один пакетный запрос.
+
+    Ключи, запрошенные за один проход event loop (или за window секунд),
+    в том числе разными HTTP-запросами, загружаются одним вызовом
+    batch_load; он возвращает значения в порядке ключей (None, если
+    значения нет). Каждый вызывающий получает свое значение или
+    исключение пакета. Одинаковые ключи одного пакета загружаются
+    один раз. Пакет выполняется с самым поздним из дедлайнов
+    вызывающих. Размеры пакетов пишутся в метрику dataloader_batch_size.
+    """
+
+    def __init__(
+            self,
+            batch_load: Callable[[list[K]], Awaitable[list[V | None]]],
+            name: str,
+            window: float = 0,
+            max_batch_size: int = MAX_BATCH_SIZE
+    ):
+        self.batch_load = batch_load
+        self.name = name
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._batch_size = DATALOADER_BATCH_SIZE.labels(name)
+        self._pending: dict[K, asyncio.Future] = {}
+        self._deadlines: list[float | None] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        self._deadlines.append(deadline.current())
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                # Остальные готовые корутины успеют добавить свои ключи.
+                if self.window > 0:
+                    self._flush_handle = loop.call_later(self.window, self._flush)
+                else:
+                    self._flush_handle = loop.call_soon(self._flush)
+        # Будущее общее для одинаковых ключей: отмена одного вызывающего
+        # не должна отменять загрузку для остальных.
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        deadlines, self._deadlines = self._deadlines, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch, deadline.latest(deadlines)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+            self, batch: dict[K, asyncio.Future], batch_deadline: float | None
+    ) -> None:
+        self._batch_size.observe(len(batch))
+        logging.debug('%s loads %s keys in one batch', self.name, len(batch))
+        try:
+            with deadline.scope(batch_deadline):
+                values = await self.batch_load(list(batch))
+        except Exception as er:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(er)
+            return
+        for future, value in zip(batch.values(), values):
+            if not future.done():
+                future.set_result(value)
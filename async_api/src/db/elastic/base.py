@@ -1,5 +1,10 @@
+import base64
+import binascii
 import logging
+from dataclasses import asdict, dataclass
 from uuid import UUID
+
+import orjson
 from pydantic import BaseModel
 from typing import Type, List, Union
 
@@ -7,21 +12,70 @@ from elasticsearch import AsyncElasticsearch
 from elasticsearch.exceptions import NotFoundError, RequestError
 
 from db.base import AbstractDataStorage
+from db.dataloader import DataLoader
+from db.elastic.msearch import MSearchBatcher
+
+
+PIT_KEEP_ALIVE = '1m'
+
+
+@dataclass
+class SearchCursor:
+    """Позиция в выдаче для постраничного чтения через search_after.
+
+    search_after - значения сортировки последнего документа страницы,
+    pit_id - point in time, если выдача читается по снимку индекса.
+    Клиенту курсор отдается непрозрачной строкой.
+    """
+    search_after: list | None = None
+    pit_id: str | None = None
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(orjson.dumps(asdict(self))).decode()
+
+    @classmethod
+    def decode(cls, token: str) -> 'SearchCursor':
+        """Курсор из строки; пустая строка - начало выдачи."""
+        if not token:
+            return cls()
+        try:
+            return cls(**orjson.loads(base64.urlsafe_b64decode(token)))
+        except (binascii.Error, TypeError, ValueError) as er:
+            raise ValueError(f'invalid cursor: {er}') from er
+
+
+class InvalidCursorError(ValueError):
+    """Курсор не подходит к выдаче: истек point in time или неверный search_after."""
 
 
 class BaseElasticStorage(AbstractDataStorage):
-    def __init__(self, elastic: AsyncElasticsearch) -> None:
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            use_pit: bool = False,
+            batcher: MSearchBatcher | None = None,
+            batch_gets: bool = False,
+            batch_window: float = 0
+    ) -> None:
         self.elastic = elastic
+        self.use_pit = use_pit
+        # Если задан, поиски отправляются через общий _msearch.
+        self.batcher = batcher
+        # Если включено, чтения документов по id объединяются в mget.
+        self.batch_gets = batch_gets
+        self.batch_window = batch_window
+        self.loaders: dict[tuple, DataLoader[UUID, dict]] = {}
 
     async def _get_by_id(
             self,
             index: str,
             obj_id: UUID,
-            response_model: Type[BaseModel] | None
+            response_model: Type[BaseModel] | None,
+            source: list[str] | None = None
     ) -> Union[BaseModel, List] | None:
-        """Получить данные."""
+        """Получить данные; source - нужные поля документа."""
         try:
-            doc = await self.elastic.get(index, obj_id)
+            doc = await self.elastic.get(index, obj_id, _source_includes=source)
         except NotFoundError:
             return None
         logging.info(f'response model is: {response_model}')
@@ -30,6 +84,59 @@ class BaseElasticStorage(AbstractDataStorage):
             return doc
         return response_model(**doc['_source'])
 
+    async def _get_source(
+            self,
+            index: str,
+            obj_id: UUID,
+            source: list[str] | None = None
+    ) -> dict | None:
+        """_source документа по id.
+
+        При batch_gets чтения за один проход event loop (или за
+        batch_window секунд) уходят в elastic одним mget.
+        """
+        if not self.batch_gets:
+            doc = await self._get_by_id(index, obj_id, None, source=source)
+            return None if doc is None else doc['_source']
+        loader_key = (index, tuple(source or ()))
+        loader = self.loaders.get(loader_key)
+        if loader is None:
+            loader = self.loaders[loader_key] = DataLoader(
+                lambda obj_ids: self._mget(index, obj_ids, source),
+                name=f'elastic:{index}',
+                window=self.batch_window,
+            )
+        return await loader.load(obj_id)
+
+    async def _mget(
+            self,
+            index: str,
+            obj_ids: list[UUID],
+            source: list[str] | None = None
+    ) -> list[dict | None]:
+        """_source документов в порядке obj_ids, None для ненайденных."""
+        if not obj_ids:
+            return []
+        response = await self.elastic.mget(
+            index=index,
+            body={'ids': [str(obj_id) for obj_id in obj_ids]},
+            _source_includes=source,
+        )
+        return [
+            doc['_source'] if doc.get('found') else None
+            for doc in response['docs']
+        ]
+
+    async def _get_many(
+            self,
+            index: str,
+            obj_ids: list[UUID],
+            source: list[str] | None = None
+    ) -> list[dict]:
+        """Получить найденные документы по списку id одним запросом mget."""
+        docs = await self._mget(index, obj_ids, source)
+        return [doc for doc in docs if doc is not None]
+
     async def _search(
             self,
             index: str,
@@ -40,13 +147,21 @@ class BaseElasticStorage(AbstractDataStorage):
     ) -> list:
         try:
             from_ = size * (page_number - 1) if page_number is not None else None
-            page = await self.elastic.search(
-                index=index,
-                body=body_of_query,
-                size=size,
-                from_=from_,
-                *args, **kwargs
-            )
+            if self.batcher is not None and not args and not kwargs:
+                body = dict(body_of_query)
+                if size is not None:
+                    body['size'] = size
+                if from_ is not None:
+                    body['from'] = from_
+                page = await self.batcher.search(index, body)
+            else:
+                page = await self.elastic.search(
+                    index=index,
+                    body=body_of_query,
+                    size=size,
+                    from_=from_,
+                    *args, **kwargs
+                )
             hits = page['hits']['hits']
             return hits
         except NotFoundError:
@@ -54,6 +169,58 @@ class BaseElasticStorage(AbstractDataStorage):
         except RequestError:
             return []
 
+    async def _search_after(
+            self,
+            index: str,
+            body_of_query: dict,
+            size: int,
+            cursor: SearchCursor
+    ) -> tuple[list, SearchCursor | None]:
+        """Страница выдачи после курсора и курсор следующей страницы.
+
+        Стоимость запроса не зависит от глубины страницы, в отличие от
+        from/size. Сортировка в body_of_query должна быть однозначной
+        (с уникальным полем в конце).
+        """
+        body = {**body_of_query, 'size': size}
+        if cursor.search_after is not None:
+            body['search_after'] = cursor.search_after
+        try:
+            if self.use_pit:
+                pit_id = cursor.pit_id or await self._open_pit(index)
+                body['pit'] = {'id': pit_id, 'keep_alive': PIT_KEEP_ALIVE}
+                page = await self.elastic.search(body=body)
+            else:
+                page = await self.elastic.search(index=index, body=body)
+        except (NotFoundError, RequestError) as er:
+            if cursor.search_after is None and cursor.pit_id is None:
+                # Первая страница: индекса нет, выдача пуста.
+                return [], None
+            # В том числе истекший point in time.
+            raise InvalidCursorError(f'cursor is expired or invalid: {er}') from er
+        hits = page['hits']['hits']
+        pit_id = page.get('pit_id')
+        if len(hits) < size:
+            if pit_id:
+                await self._close_pit(pit_id)
+            return hits, None
+        return hits, SearchCursor(hits[-1]['sort'], pit_id)
+
+    async def _open_pit(self, index: str) -> str:
+        # В elasticsearch-py 7.9 нет open_point_in_time.
+        response = await self.elastic.transport.perform_request(
+            'POST', f'/{index}/_pit', params={'keep_alive': PIT_KEEP_ALIVE}
+        )
+        return response['id']
+
+    async def _close_pit(self, pit_id: str) -> None:
+        try:
+            await self.elastic.transport.perform_request(
+                'DELETE', '/_pit', body={'id': pit_id}
+            )
+        except NotFoundError:
+            pass
+
     async def close(self):
         await self.elastic.close()
 
@@ -0,0 +1,150 @@
+import enum
+import logging
+import time
+from collections import deque
+from typing import Awaitable
+
+from elasticsearch.exceptions import ConnectionError, TransportError
+
+from core.metrics import (
+    ELASTIC_BREAKER_REJECTED,
+    ELASTIC_BREAKER_STATE,
+    ELASTIC_BREAKER_TRANSITIONS,
+)
+
+FAILURE_RATE_THRESHOLD = 0.5
+SLOW_CALL_IN_SECONDS = 1.0
+WINDOW_SIZE = 20
+MIN_CALLS = 10
+OPEN_IN_SECONDS = 10
+HALF_OPEN_CALLS = 3
+
+
+class BreakerState(enum.IntEnum):
+    """Состояние breaker; числовое значение удобно отдавать как метрику."""
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitOpenError(ConnectionError):
+    """Запрос не отправлен: elastic считается недоступным."""
+
+    def __init__(self):
+        super().__init__('N/A', 'circuit breaker is open', None)
+
+
+def is_unavailable(er: BaseException) -> bool:
+    """Ошибка недоступности elastic, а не ошибка самого запроса.
+
+    Сюда относятся сбои соединения и таймауты (ConnectionError), ответы
+    5xx и 429. Ответы 4xx (например, NotFoundError) означают, что
+    elastic работает.
+    """
+    if isinstance(er, ConnectionError):
+        return True
+    if isinstance(er, TransportError) and isinstance(er.status_code, int):
+        return er.status_code == 429 or er.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Circuit breaker для запросов к elastic.
+
+    Результаты последних window_size запросов хранятся в скользящем
+    окне. Медленный запрос (дольше slow_call секунд) считается
+    неудачным так же, как ошибка недоступности. Если набралось хотя бы
+    min_calls запросов и доля неудачных не меньше failure_rate,
+    breaker открывается: запросы сразу завершаются CircuitOpenError.
+    Через open_timeout секунд breaker переходит в полуоткрытое
+    состояние и пропускает half_open_calls пробных запросов: если все
+    они успешны, breaker закрывается, иначе снова открывается.
+    Состояние, переходы и отклоненные запросы пишутся в метрики
+    elastic_breaker_*.
+    """
+
+    def __init__(
+            self,
+            failure_rate: float = FAILURE_RATE_THRESHOLD,
+            slow_call: float = SLOW_CALL_IN_SECONDS,
+            window_size: int = WINDOW_SIZE,
+            min_calls: int = MIN_CALLS,
+            open_timeout: float = OPEN_IN_SECONDS,
+            half_open_calls: int = HALF_OPEN_CALLS
+    ):
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.min_calls = min_calls
+        self.open_timeout = open_timeout
+        self.half_open_calls = half_open_calls
+        self.state = BreakerState.CLOSED
+        ELASTIC_BREAKER_STATE.set(self.state)
+        self._window: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    async def call(self, request: Awaitable):
+        """Выполнить запрос request через breaker."""
+        probe = self._acquire()
+        if probe is None:
+            request.close()
+            ELASTIC_BREAKER_REJECTED.inc()
+            raise CircuitOpenError()
+        started = time.monotonic()
+        try:
+            result = await request
+        except TransportError as er:
+            # Ответ 4xx тоже означает, что elastic работает.
+            self._record(probe, failed=is_unavailable(er))
+            raise
+        except BaseException:
+            if probe:
+                # Пробный запрос отменен: место для пробы освобождается.
+                self._probes -= 1
+            raise
+        self._record(probe, failed=time.monotonic() - started > self.slow_call)
+        return result
+
+    def _acquire(self) -> bool | None:
+        """True - пробный запрос, False - обычный, None - отклонить."""
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_timeout:
+                return None
+            self._transition(BreakerState.HALF_OPEN)
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                return None
+            self._probes += 1
+            return True
+        return False
+
+    def _record(self, probe: bool, failed: bool) -> None:
+        if probe:
+            if self.state != BreakerState.HALF_OPEN:
+                return
+            if failed:
+                self._transition(BreakerState.OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(BreakerState.CLOSED)
+            return
+        if self.state != BreakerState.CLOSED:
+            return
+        self._window.append(failed)
+        calls = len(self._window)
+        if calls >= self.min_calls and sum(self._window) / calls >= self.failure_rate:
+            self._transition(BreakerState.OPEN)
+
+    def _transition(self, state: BreakerState) -> None:
+        logging.warning('Elastic circuit breaker: %s -> %s', self.state.name, state.name)
+        self.state = state
+        ELASTIC_BREAKER_STATE.set(state)
+        ELASTIC_BREAKER_TRANSITIONS.labels(state.name.lower()).inc()
+        self._probes = 0
+        self._probe_successes = 0
+        if state == BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == BreakerState.CLOSED:
+            self._window.clear()
@@ -1,20 +1,79 @@
+import asyncio
+
 from elasticsearch import AsyncElasticsearch
 
+from core.config import settings
+from core.metrics import POOL_CONNECTIONS
 from db.elastic import film, person
 from db.elastic import genre
+from db.elastic.breaker import CircuitBreaker
+from db.elastic.genre_catalog import GenreCatalog
+from db.elastic.msearch import MSearchBatcher
+from db.elastic.transport import ServiceTransport
 
 
 es: AsyncElasticsearch | None = None
+breaker: CircuitBreaker | None = None
+_genre_catalog_task: asyncio.Task | None = None
 
 
 def on_startup(data_storage_hosts: list):
-    global es
-    es = AsyncElasticsearch(hosts=data_storage_hosts)
-    film.film_repository = film.FilmElasticRepository(es)
-    genre.genre_repository = genre.GenreElasticRepository(es)
-    person.person_repository = person.PersonElasticRepository(es)
+    global es, breaker, _genre_catalog_task
+    if settings.elastic_breaker_enabled:
+        breaker = CircuitBreaker(
+            failure_rate=settings.elastic_breaker_failure_rate,
+            slow_call=settings.elastic_breaker_slow_call,
+            open_timeout=settings.elastic_breaker_open_timeout,
+        )
+    es = AsyncElasticsearch(
+        hosts=data_storage_hosts,
+        transport_class=ServiceTransport,
+        breaker=breaker,
+    )
+    # Один снимок жанров на процесс.
+    genre_catalog = GenreCatalog(
+        es, interval=settings.genre_catalog_refresh_interval
+    )
+    _genre_catalog_task = asyncio.create_task(genre_catalog.run())
+    # Один батчер на процесс: поиски разных репозиториев тоже объединяются.
+    batcher = MSearchBatcher(es) if settings.elastic_msearch_batching else None
+    film.film_repository = film.FilmElasticRepository(
+        es,
+        use_pit=settings.elastic_use_pit,
+        batcher=batcher,
+        batch_gets=settings.dataloader_enabled,
+        batch_window=settings.dataloader_window,
+    )
+    genre.genre_repository = genre.GenreElasticRepository(
+        es, genre_catalog, batcher=batcher
+    )
+    person.person_repository = person.PersonElasticRepository(
+        es,
+        batcher=batcher,
+        batch_gets=settings.dataloader_enabled,
+        batch_window=settings.dataloader_window,
+    )
+
+
+def observe_pool():
+    """Обновить метрики пулов aiohttp, по одному на каждый узел elastic."""
+    if es is None:
+        return
+    in_use = idle = 0
+    for connection in es.transport.connection_pool.connections:
+        # Сессия aiohttp создается при первом запросе к узлу.
+        session = getattr(connection, 'session', None)
+        connector = getattr(session, 'connector', None)
+        if connector is None:
+            continue
+        in_use += len(getattr(connector, '_acquired', ()))
+        idle += sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+    POOL_CONNECTIONS.labels('elastic', 'in_use').set(in_use)
+    POOL_CONNECTIONS.labels('elastic', 'idle').set(idle)
 
 
-def on_shutdown():
-    es.close()
+async def on_shutdown():
+    if _genre_catalog_task is not None:
+        _genre_catalog_task.cancel()
+    await es.close()
 
@@ -5,29 +5,62 @@ from typing import List
 from elasticsearch.exceptions import NotFoundError
 
 from core.messages import FILM_NOT_FOUND_ES
-from .base import BaseElasticStorage
-from db.models.elastic_models import SerializedFilm, SerializedGenre
+from .base import BaseElasticStorage, SearchCursor
 from models.film import ShortFilm, DetailFilm
 
 
+# Поля документа movies, которые нужны моделям: остальное (например,
+# actors_names и writers_names для поиска) elastic не передает.
+SHORT_FILM_FIELDS = ['id', 'title', 'imdb_rating']
+DETAIL_FILM_FIELDS = [
+    'id', 'title', 'imdb_rating', 'description',
+    'genre', 'director', 'actors', 'writers',
+]
+
+
+def _title_query(film_title: str) -> dict:
+    return {
+        "query": {"match": {"title": {"query": film_title, "fuzziness": "AUTO"}}},
+        "_source": SHORT_FILM_FIELDS,
+    }
+
+
+def _sort_query(sort: str, genre_id: UUID | None) -> dict:
+    if sort.startswith('-'):
+        type_sort = 'desc'
+        sort_value = sort[1:]
+    else:
+        type_sort = 'asc'
+        sort_value = sort
+
+    if genre_id:
+        q = {'nested': {
+            'path': 'genre',
+            'query': {'term': {'genre.id': str(genre_id)}},
+        }}
+    else:
+        q = {"match_all": {}}
+    # id делает порядок однозначным для search_after.
+    return {
+        'query': q,
+        'sort': [{sort_value: type_sort}, {'id': 'asc'}],
+        '_source': SHORT_FILM_FIELDS,
+    }
+
+
 class FilmElasticRepository(BaseElasticStorage):
     async def get_by_id(self, film_uuid: UUID) -> DetailFilm:
-        doc = await self._get_by_id('movies', film_uuid, None)
+        doc = await self._get_source('movies', film_uuid, source=DETAIL_FILM_FIELDS)
         if doc is None:
             logging.error(FILM_NOT_FOUND_ES, 'id', film_uuid)
             return None
-        genres = []
-        for genre_name in doc['_source']['genre']:
-            q = {'query': {'match_phrase': {'name': genre_name}}}
-            res = await self._search(
-                index='genres', body_of_query=q
-            )
-            genre_id = res[0]['_source']['id']
-            genres.append({'id': genre_id, 'name': genre_name})
-        doc['_source']['genre'] = genres
-        ser_film = SerializedFilm(**doc['_source'])
-        film = DetailFilm.from_serialized_movie(ser_film)
-        return film
+        return DetailFilm.from_source(doc)
+
+    async def get_many(self, film_ids: list[UUID]) -> list[DetailFilm]:
+        docs = await self._get_many('movies', film_ids, source=DETAIL_FILM_FIELDS)
+        return [
+            DetailFilm.from_source(doc) for doc in docs
+        ]
 
     async def get_by_title(
             self,
@@ -35,20 +68,25 @@ class FilmElasticRepository(BaseElasticStorage):
             page_size: int,
             page_number: int
     ) -> List[ShortFilm] | None:
-        body_of_q = {"query": {"match": {"title": {"query": film_title, "fuzziness": "AUTO"}}}}
-        doc = await self._search('movies', body_of_q, page_number, page_size)
+        doc = await self._search(
+            'movies', _title_query(film_title), page_number, page_size
+        )
         if doc is None:
             logging.error(FILM_NOT_FOUND_ES, 'query', film_title)
             return None
-        films = list(map(
-            lambda fl: ShortFilm(
-                uuid=fl['_source']['id'],
-                title=fl['_source']['title'],
-                imdb_rating=fl['_source']['imdb_rating']
-            ),
-            doc,
-        ))
-        return films
+        return [ShortFilm.from_source(hit['_source']) for hit in doc]
+
+    async def get_by_title_after(
+            self,
+            film_title: str,
+            page_size: int,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        body_of_q = {**_title_query(film_title), 'sort': ['_score', {'id': 'asc'}]}
+        doc, next_cursor = await self._search_after(
+            'movies', body_of_q, page_size, cursor
+        )
+        return [ShortFilm.from_source(hit['_source']) for hit in doc], next_cursor
 
     async def get_by_sort(
             self,
@@ -57,40 +95,28 @@ class FilmElasticRepository(BaseElasticStorage):
             page_number: int,
             genre_id: UUID | None
     ) -> list[ShortFilm] | None:
-
-        if sort.startswith('-'):
-            type_sort = 'desc'
-            sort_value = sort[1:]
-        else:
-            type_sort = 'asc'
-            sort_value = sort
-
-        if genre_id:
-            genre_inf: SerializedGenre = await self._get_by_id(
-                'genres', genre_id, SerializedGenre
-            )
-            q = {'match': {'genre': genre_inf.name}}
-        else:
-            q = {"match_all": {}}
         doc = await self._search(
             index='movies',
-            body_of_query={'query': q, 'sort': [{sort_value: type_sort}]},
+            body_of_query=_sort_query(sort, genre_id),
             size=page_size,
             page_number=page_number
         )
         if doc is None:
             logging.error(FILM_NOT_FOUND_ES, 'sort', sort)
             return None
+        return [ShortFilm.from_source(hit['_source']) for hit in doc]
 
-        films = list(map(
-            lambda fl: ShortFilm(
-                uuid=fl['_source']['id'],
-                title=fl['_source']['title'],
-                imdb_rating=fl['_source']['imdb_rating']
-            ),
-            doc,
-        ))
-        return films
+    async def get_by_sort_after(
+            self,
+            sort: str,
+            page_size: int,
+            genre_id: UUID | None,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        doc, next_cursor = await self._search_after(
+            'movies', _sort_query(sort, genre_id), page_size, cursor
+        )
+        return [ShortFilm.from_source(hit['_source']) for hit in doc], next_cursor
 
 
 film_repository: FilmElasticRepository | None = None
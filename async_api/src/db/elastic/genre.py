@@ -1,38 +1,39 @@
 from uuid import UUID
 from typing import List
 
+from elasticsearch import AsyncElasticsearch
+
 from .base import BaseElasticStorage
-from db.models.elastic_models import SerializedGenre
+from .genre_catalog import GenreCatalog
 from models.genre import Genre
 
 
 class GenreElasticRepository(BaseElasticStorage):
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            genre_catalog: GenreCatalog,
+            **kwargs
+    ) -> None:
+        super().__init__(elastic, **kwargs)
+        self.genre_catalog = genre_catalog
+
     async def get_by_id(self, genre_id: UUID) -> Genre | None:
-        ser_genre = await self._get_by_id(
+        genre = await self.genre_catalog.get_by_id(genre_id)
+        if genre is not None:
+            return genre
+        doc = await self._get_by_id(
             'genres',
             genre_id,
-            SerializedGenre
+            None,
+            source=['id', 'name']
         )
-        if ser_genre is None:
+        if doc is None:
             return None
-        return Genre.from_serialized_genre(ser_genre)
+        return Genre.from_source(doc['_source'])
 
     async def get_all_genres(self) -> List[Genre] | None:
-        body_of_q = {'query': {'match_all': {}}}
-        _doc = await self._search(
-            index='genres',
-            body_of_query=body_of_q,
-            size=1000
-        )
-        all_ser_genres = [
-            SerializedGenre(**g['_source'])
-            for g in _doc
-        ]
-        all_genre = [
-            Genre.from_serialized_genre(g)
-            for g in all_ser_genres
-        ]
-        return all_genre
+        return list(await self.genre_catalog.all())
 
 
 genre_repository: GenreElasticRepository | None = None
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import TransportError
+
+from models.genre import Genre
+
+REFRESH_INTERVAL_IN_SECONDS = 60
+# Не чаще, чем раз в это время, перечитывать каталог из-за неизвестного жанра.
+MISS_REFRESH_INTERVAL_IN_SECONDS = 5
+MAX_GENRES = 1000
+
+
+class GenreCatalog:
+    """Снимок индекса genres в памяти процесса.
+
+    Жанров немного и меняются они редко, поэтому каталог целиком читается
+    одним запросом и обновляется в фоне раз в interval секунд. Если жанр
+    не найден (добавлен после последнего обновления), каталог
+    перечитывается, но не чаще MISS_REFRESH_INTERVAL_IN_SECONDS.
+    """
+
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            interval: int = REFRESH_INTERVAL_IN_SECONDS
+    ):
+        self.elastic = elastic
+        self.interval = interval
+        self._by_id: dict[str, Genre] = {}
+        self._genres: list[Genre] = []
+        self._loaded_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        async with self._refresh_lock:
+            page = await self.elastic.search(
+                index='genres',
+                body={'query': {'match_all': {}}, '_source': ['id', 'name']},
+                size=MAX_GENRES,
+            )
+            genres = [
+                Genre.from_source(hit['_source'])
+                for hit in page['hits']['hits']
+            ]
+            self._genres = genres
+            self._by_id = {str(genre.uuid): genre for genre in genres}
+            self._loaded_at = time.monotonic()
+
+    async def _refresh_after_miss(self) -> None:
+        if self._refresh_lock.locked():
+            # Каталог уже перечитывает другая корутина.
+            async with self._refresh_lock:
+                return
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > MISS_REFRESH_INTERVAL_IN_SECONDS
+        ):
+            await self.refresh()
+
+    async def all(self) -> list[Genre]:
+        if self._loaded_at is None:
+            await self._refresh_after_miss()
+        return self._genres
+
+    async def get_by_id(self, genre_id: UUID | str) -> Genre | None:
+        genre = self._by_id.get(str(genre_id))
+        if genre is None:
+            await self._refresh_after_miss()
+            genre = self._by_id.get(str(genre_id))
+        return genre
+
+    async def run(self) -> None:
+        """Обновлять каталог каждые interval секунд."""
+        while True:
+            try:
+                await self.refresh()
+            except TransportError as er:
+                logging.error('Genre catalog refresh error: %s', er)
+            await asyncio.sleep(self.interval)
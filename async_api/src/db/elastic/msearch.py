@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import HTTP_EXCEPTIONS, TransportError
+
+from core import deadline
+
+MAX_BATCH_SIZE = 50
+
+
+class MSearchBatcher:
+    """Объединение независимых поисков в один запрос _msearch.
+
+    Поиски, запрошенные за один проход event loop (например, через
+    asyncio.gather в одном запросе или одновременно разными запросами),
+    уходят в elastic одним _msearch; каждый вызывающий получает свой
+    ответ или исключение, как от обычного search. Каждый поиск
+    получает timeout из дедлайна своего запроса, а весь _msearch
+    выполняется с самым поздним из дедлайнов.
+    """
+
+    def __init__(
+            self,
+            elastic: AsyncElasticsearch,
+            max_batch_size: int = MAX_BATCH_SIZE
+    ):
+        self.elastic = elastic
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[str, dict, asyncio.Future, float | None]] = []
+        self._flush_scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+    async def search(self, index: str, body: dict) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        left = deadline.remaining()
+        if left is not None:
+            body = {**body, 'timeout': f'{max(int(left * 1000), 1)}ms'}
+        self._pending.append((index, body, future, deadline.current()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            # Остальные готовые корутины успеют добавить свои поиски.
+            asyncio.get_running_loop().call_soon(self._flush)
+            self._flush_scheduled = True
+        return await future
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        self._flush_scheduled = False
+        if not batch:
+            return
+        batch_deadline = deadline.latest(item[3] for item in batch)
+        task = asyncio.create_task(self._send(batch, batch_deadline))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+            self,
+            batch: list[tuple[str, dict, asyncio.Future, float | None]],
+            batch_deadline: float | None
+    ) -> None:
+        body = []
+        for index, query, *_ in batch:
+            body.extend(({'index': index}, query))
+        try:
+            with deadline.scope(batch_deadline):
+                response = await self.elastic.msearch(body=body)
+        except Exception as er:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(er)
+            return
+        logging.debug('msearch sent %s searches', len(batch))
+        for (_, _, future, _), item in zip(batch, response['responses']):
+            if future.done():
+                continue
+            if 'error' in item:
+                status = item.get('status', 500)
+                error = item['error']
+                error_type = error.get('type') if isinstance(error, dict) else error
+                exception = HTTP_EXCEPTIONS.get(status, TransportError)
+                future.set_exception(exception(status, error_type, item))
+            else:
+                future.set_result(item)
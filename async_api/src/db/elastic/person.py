@@ -4,21 +4,21 @@ from typing import List
 
 from core.messages import PERSON_NOT_FOUND_ES
 from .base import BaseElasticStorage
-from db.models.elastic_models import SerializedPerson, SerializedPersonFilm
 from models.person import Person, PersonFilm
 
 
+PERSON_FIELDS = ['id', 'full_name', 'films']
+# Вложенные поля movies с участниками фильма.
+PERSON_ROLES = ('actors', 'writers', 'director')
+
+
 class PersonElasticRepository(BaseElasticStorage):
     async def get_by_id(self, person_id: UUID) -> Person | None:
-        person: SerializedPerson = await self._get_by_id(
-            'persons',
-            person_id,
-            SerializedPerson
-        )
-        if person is None:
+        doc = await self._get_source('persons', person_id, source=PERSON_FIELDS)
+        if doc is None:
             logging.info(PERSON_NOT_FOUND_ES, 'person_id', person_id)
             return None
-        return Person.from_serialized_person(person)
+        return Person.from_source(doc)
 
     async def search_by_name(
             self,
@@ -32,7 +32,7 @@ class PersonElasticRepository(BaseElasticStorage):
                 }
             }
         }
-        body_of_q = {"query": q}
+        body_of_q = {"query": q, "_source": PERSON_FIELDS}
         doc = await self._search(
             index='persons',
             body_of_query=body_of_q,
@@ -42,38 +42,43 @@ class PersonElasticRepository(BaseElasticStorage):
         if doc is None:
             logging.info(PERSON_NOT_FOUND_ES, 'person_name', person_name)
             return None
-        ser_person = [
-            SerializedPerson(**p['_source'])
-            for p in doc
-        ]
-        return [
-            Person.from_serialized_person(s_p)
-            for s_p in ser_person
-        ]
+        return [Person.from_source(p['_source']) for p in doc]
 
-    async def get_films_for_person(self, person_id: UUID) -> list[PersonFilm] | None:
-        person = await self.get_by_id(person_id)
-        if person is None:
-            logging.info(PERSON_NOT_FOUND_ES, 'person_id', person_id)
-            return None
-        person_films_id = [f.uuid for f in person.films]
-        body = {
-            "docs": [
-                {
-                    "_index": "movies",
-                    "_id": f_id,
-                    "_source": ["id", "title", "imdb_rating"]
-                }
-                for f_id in person_films_id
-            ]
+    async def get_films_for_person(
+            self,
+            person_id: UUID,
+            page_size: int,
+            page_number: int
+    ) -> list[PersonFilm] | None:
+        # Один поиск по movies вместо чтения персоны и mget ее фильмов.
+        q = {
+            "bool": {
+                "should": [
+                    {
+                        "nested": {
+                            "path": role,
+                            "query": {"term": {f"{role}.id": str(person_id)}}
+                        }
+                    }
+                    for role in PERSON_ROLES
+                ],
+                "minimum_should_match": 1
+            }
         }
-        docs = await self.elastic.mget(index="movies", body=body)
-        ser_film_for_person = [SerializedPersonFilm(**doc['_source']) for doc in docs['docs']]
-
-        film_for_person = [
-            PersonFilm.from_serialized_person_film(s_p) for s_p in ser_film_for_person
+        body_of_q = {
+            "query": q,
+            "sort": [{"imdb_rating": "desc"}, {"id": "asc"}],
+            "_source": ["id", "title", "imdb_rating"]
+        }
+        doc = await self._search(
+            index='movies',
+            body_of_query=body_of_q,
+            page_number=page_number,
+            size=page_size
+        )
+        return [
+            PersonFilm.from_source(f['_source']) for f in doc
         ]
-        return film_for_person
 
 
 person_repository: PersonElasticRepository | None = None
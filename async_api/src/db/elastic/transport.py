@@ -0,0 +1,56 @@
+import time
+
+from elasticsearch import AsyncTransport
+from elasticsearch.exceptions import ConnectionTimeout
+
+from core import deadline
+from core.metrics import ELASTIC_ERRORS, ELASTIC_REQUEST_DURATION, ELASTIC_TOOK
+from db.elastic.breaker import CircuitBreaker
+
+
+def _operation(url: str) -> str:
+    """Имя операции по url: последний сегмент вида _search, _mget, _doc."""
+    for part in reversed(url.split('/')):
+        if part.startswith('_'):
+            return part
+    return 'other'
+
+
+class ServiceTransport(AsyncTransport):
+    """Транспорт elastic с дедлайном запроса и circuit breaker.
+
+    Подключается через transport_class у AsyncElasticsearch, поэтому
+    действует на все запросы клиента: get, mget, search, msearch.
+    Остаток дедлайна передается как request_timeout, а поиску еще и
+    как timeout: шарды, не успевшие ответить, elastic пропускает.
+    Время каждого запроса (и took из ответа поиска) пишется в метрики.
+    """
+
+    def __init__(self, hosts, *args, breaker: CircuitBreaker | None = None, **kwargs):
+        self.breaker = breaker
+        super().__init__(hosts, *args, **kwargs)
+
+    async def perform_request(self, method, url, headers=None, params=None, body=None):
+        left = deadline.remaining()
+        if left is not None:
+            if left <= 0:
+                raise ConnectionTimeout('TIMEOUT', 'request deadline exceeded', None)
+            params = dict(params or {})
+            params['request_timeout'] = deadline.timeout(params.get('request_timeout'))
+            if url.endswith('/_search'):
+                params.setdefault('timeout', f'{max(int(left * 1000), 1)}ms')
+        operation = _operation(url)
+        request = super().perform_request(method, url, headers, params, body)
+        started = time.perf_counter()
+        try:
+            if self.breaker is None:
+                response = await request
+            else:
+                response = await self.breaker.call(request)
+        except Exception:
+            ELASTIC_ERRORS.labels(operation).inc()
+            raise
+        ELASTIC_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started)
+        if isinstance(response, dict) and 'took' in response:
+            ELASTIC_TOOK.labels(operation).observe(response['took'] / 1000)
+        return response
@@ -1,33 +1,414 @@
-import json
+import hashlib
+import logging
+import struct
+import time
+import unicodedata
+from contextlib import asynccontextmanager, contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Generic, Iterable, Iterator, Type, TypeVar
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import LockError
 
+from core.metrics import CACHE_HITS, CACHE_MISSES, CACHE_SETS
 from db.base import AbstractCacheStorage
+from db.dataloader import DataLoader
+from db.redis.codecs import CacheCodec, OrjsonCodec
+from db.redis.local_cache import LocalCache
+from models.base import DomainModel
 
 
 CACHE_EXPIRE_IN_SECONDS = 60 * 5
+LOCK_EXPIRE_IN_SECONDS = 10
+LOCK_WAIT_IN_SECONDS = 5
+SEARCH_CACHE_EXPIRE_IN_SECONDS = 60
+SEARCH_CACHE_MAX_ENTRIES = 10_000
+
+# Заголовок записи: время мягкого истечения (unix time, double).
+_ENTRY_HEADER = struct.Struct('!d')
+
+T = TypeVar('T')
+M = TypeVar('M', bound=DomainModel)
+
+# Отдавать ли в текущем контексте записи после жесткого истечения.
+_serve_expired: ContextVar[bool] = ContextVar('serve_expired', default=False)
+
+
+@contextmanager
+def serving_expired() -> Iterator[None]:
+    """Читать из кеша и истекшие записи, пока они хранятся для отката."""
+    token = _serve_expired.set(True)
+    try:
+        yield
+    finally:
+        _serve_expired.reset(token)
+
+
+def make_tags(index: str, *ids) -> list[str]:
+    """Теги записей кеша, зависящих от документов index с данными id."""
+    return [f'{index}:{doc_id}' for doc_id in ids]
+
+
+def normalize_query(query: str) -> str:
+    """Канонический вид поискового запроса: регистр, пробелы, unicode."""
+    return ' '.join(unicodedata.normalize('NFKC', query).casefold().split())
+
+
+def make_etag(data: bytes) -> str:
+    """Слабый ETag по закодированному значению."""
+    return f'W/"{hashlib.sha1(data).hexdigest()}"'
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    """Значение из кеша и признак того, что его пора обновить.
+
+    expires_at - время мягкого истечения записи (unix time).
+    """
+    value: T
+    is_stale: bool = False
+    expires_at: float = 0
 
 
 class RedisStorage(AbstractCacheStorage):
-    def __init__(self, redis: Redis):
+    """Базовый репозиторий кеша.
+
+    Все ключи имеют вид ``<namespace>:v<generation>:<arg1>:<kwarg>=<value>``,
+    namespace задается в наследниках (film, genre, person). Поколение
+    namespace хранится в redis (``<namespace>:generation``): после
+    bump_generation старые ключи перестают читаться и истекают сами,
+    так что все записи сущности сбрасываются без SCAN и DEL.
+    Если передан local_cache, чтение сначала идет в память процесса.
+
+    У записи два срока: через ttl она становится устаревшей (мягкое
+    истечение), но еще stale_ttl секунд хранится в redis и может быть
+    отдана, пока значение обновляется в фоне (жесткое истечение).
+    Еще fallback_ttl секунд запись остается в redis как последнее
+    известное значение: обычное чтение ее не видит, а внутри
+    serving_expired() она отдается, когда хранилище недоступно.
+
+    Результаты поиска хранятся меньше (search_ttl), а их число
+    ограничено search_max_entries: самые старые вытесняются.
+
+    Модели кодируются codec (по умолчанию orjson).
+
+    Если передан get_loader, одиночные GET за один проход event loop
+    объединяются в MGET.
+
+    Запись можно пометить тегами (``movies:<id>``, ``movies``): по тегу
+    invalidate_tags удаляет все зависящие от документа записи. Тег -
+    sorted set ключей с моментом их удаления из redis: истекшие и
+    вытесненные ключи из тегов вычищаются при записи.
+    """
+    namespace: str = 'cache'
+
+    def __init__(
+            self,
+            redis: Redis,
+            ttl: int = CACHE_EXPIRE_IN_SECONDS,
+            stale_ttl: int = 0,
+            fallback_ttl: int = 0,
+            search_ttl: int = SEARCH_CACHE_EXPIRE_IN_SECONDS,
+            search_max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+            local_cache: LocalCache | None = None,
+            codec: CacheCodec | None = None,
+            get_loader: DataLoader[str, bytes] | None = None
+    ):
         self.redis = redis
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.fallback_ttl = fallback_ttl
+        self.search_ttl = search_ttl
+        self.search_max_entries = search_max_entries
+        self.local_cache = local_cache
+        self.codec = codec or OrjsonCodec()
+        self.get_loader = get_loader
+        self.generation = 0
+        repository = type(self).__name__
+        self._hits = CACHE_HITS.labels(repository)
+        self._misses = CACHE_MISSES.labels(repository)
+        self._sets = CACHE_SETS.labels(repository)
 
-    async def _get(self, key):
-        return await self.redis.get(key)
+    async def _get(self, key: str) -> CacheEntry[bytes] | None:
+        data = await self._get_raw(key)
+        entry = None if data is None else self._unpack_alive(data)
+        (self._misses if entry is None else self._hits).inc()
+        return entry
 
-    async def _set(self, key, value):
-        await self.redis.set(
-            key,
-            value,
-            expire=CACHE_EXPIRE_IN_SECONDS
+    async def _get_many(self, keys: list[str]) -> list[CacheEntry[bytes] | None]:
+        """Получить несколько ключей за один запрос MGET."""
+        found: dict[str, bytes] = {}
+        if self.local_cache is not None:
+            for key in keys:
+                data = self.local_cache.get(key)
+                if data is not None:
+                    found[key] = data
+        missing = [key for key in keys if key not in found]
+        if missing:
+            for key, data in zip(missing, await self.redis.mget(missing)):
+                if data is not None:
+                    found[key] = data
+                    if self.local_cache is not None:
+                        self.local_cache.set(key, data)
+        entries = [
+            self._unpack_alive(found[key]) if key in found else None
+            for key in keys
+        ]
+        hits = sum(entry is not None for entry in entries)
+        self._hits.inc(hits)
+        self._misses.inc(len(entries) - hits)
+        return entries
+
+    @staticmethod
+    def _unpack(data: bytes) -> CacheEntry[bytes]:
+        soft_expire_at, = _ENTRY_HEADER.unpack_from(data)
+        return CacheEntry(
+            value=data[_ENTRY_HEADER.size:],
+            is_stale=soft_expire_at < time.time(),
+            expires_at=soft_expire_at,
         )
 
-    def _key_generate(*args, **kwargs) -> str:
-        return f'{args}:{json.dumps({"kwargs": kwargs}, sort_keys=True)}'
+    def _unpack_alive(self, data: bytes) -> CacheEntry[bytes] | None:
+        """Запись, если она не истекла жестко (или истекшие разрешены)."""
+        entry = self._unpack(data)
+        if (
+            self.fallback_ttl
+            and entry.expires_at + self.stale_ttl < time.time()
+            and not _serve_expired.get()
+        ):
+            return None
+        return entry
+
+    def _redis_ttl(self, ttl: int) -> int:
+        """Срок хранения записи в redis с учетом stale_ttl и fallback_ttl."""
+        return ttl + self.stale_ttl + self.fallback_ttl
+
+    @staticmethod
+    def _pack(value: bytes | str, ttl: int) -> bytes:
+        if isinstance(value, str):
+            value = value.encode()
+        return _ENTRY_HEADER.pack(time.time() + ttl) + value
+
+    async def _get_model(self, key: str, model: Type[M]) -> CacheEntry[M] | None:
+        entry = await self._get(key)
+        if entry is None:
+            return None
+        try:
+            value = self.codec.decode(entry.value, model)
+        except (KeyError, TypeError, ValueError) as er:
+            logging.warning('Cache entry %s can not be decoded: %s', key, er)
+            return None
+        return CacheEntry(value, entry.is_stale, entry.expires_at)
+
+    async def _get_models(self, key: str, model: Type[M]) -> CacheEntry[list[M]] | None:
+        entry = await self._get(key)
+        if entry is None:
+            return None
+        try:
+            value = self.codec.decode_many(entry.value, model)
+        except (KeyError, TypeError, ValueError) as er:
+            logging.warning('Cache entry %s can not be decoded: %s', key, er)
+            return None
+        return CacheEntry(value, entry.is_stale, entry.expires_at)
+
+    async def _get_many_models(
+            self, keys: list[str], model: Type[M]
+    ) -> list[CacheEntry[M] | None]:
+        entries = []
+        for key, entry in zip(keys, await self._get_many(keys)):
+            if entry is not None:
+                try:
+                    entry = CacheEntry(
+                        self.codec.decode(entry.value, model),
+                        entry.is_stale,
+                        entry.expires_at,
+                    )
+                except (KeyError, TypeError, ValueError) as er:
+                    logging.warning('Cache entry %s can not be decoded: %s', key, er)
+                    entry = None
+            entries.append(entry)
+        return entries
+
+    async def _get_etag(self, key: str) -> str | None:
+        """ETag свежей записи без декодирования модели.
+
+        Совпадает с ETag ответа, только если запись хранит тот же JSON,
+        что уходит клиенту (кодек orjson); иначе None.
+        """
+        if not self.codec.is_json:
+            return None
+        entry = await self._get(key)
+        if entry is None or entry.is_stale:
+            return None
+        return make_etag(entry.value)
+
+    async def _get_raw(self, key: str) -> bytes | None:
+        if self.local_cache is not None:
+            data = self.local_cache.get(key)
+            if data is not None:
+                return data
+        if self.get_loader is not None:
+            data = await self.get_loader.load(key)
+        else:
+            data = await self.redis.get(key)
+        if data is not None and self.local_cache is not None:
+            self.local_cache.set(key, data)
+        return data
+
+    async def _set(self, key: str, value: bytes | str,
+                   ttl: int | None = None, tags: Iterable[str] = ()) -> None:
+        ttl = ttl or self.ttl
+        data = self._pack(value, ttl)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, data, ex=self._redis_ttl(ttl))
+            self._tag(pipe, key, tags, self._redis_ttl(ttl))
+            await pipe.execute()
+        self._sets.inc()
+        if self.local_cache is not None:
+            self.local_cache.set(key, data)
+            await self.local_cache.publish(key)
+
+    async def _set_many(self, items: dict[str, bytes | str],
+                        ttl: int | None = None,
+                        tags: dict[str, Iterable[str]] | None = None) -> None:
+        """Записать несколько ключей одним pipeline."""
+        if not items:
+            return
+        ttl = ttl or self.ttl
+        tags = tags or {}
+        packed = {key: self._pack(value, ttl) for key, value in items.items()}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, data in packed.items():
+                pipe.set(key, data, ex=self._redis_ttl(ttl))
+                self._tag(pipe, key, tags.get(key, ()), self._redis_ttl(ttl))
+            await pipe.execute()
+        self._sets.inc(len(packed))
+        if self.local_cache is not None:
+            for key, data in packed.items():
+                self.local_cache.set(key, data)
+            await self.local_cache.publish(*packed)
+
+    async def _delete(self, *keys: str) -> None:
+        await self.redis.delete(*keys)
+        if self.local_cache is not None:
+            self.local_cache.delete(*keys)
+            await self.local_cache.publish(*keys)
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        # Sorted set (раньше - set с ключом tag:<tag>, такие истекают сами).
+        return f'tags:{tag}'
+
+    def _tag(self, pipe: Pipeline, key: str, tags: Iterable[str], ttl: int) -> None:
+        # Оценка участника - момент его удаления из redis: истекшие ключи
+        # вычищаются при каждой записи, и под постоянной нагрузкой
+        # широкие теги (movies, persons) не растут без ограничения.
+        now = time.time()
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.zadd(tag_key, {key: now + ttl})
+            pipe.zremrangebyscore(tag_key, '-inf', now)
+            # Тег живет не меньше самой долгой из помеченных записей.
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Удалить все записи, помеченные любым из тегов."""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for tag_key in tag_keys:
+                pipe.zrange(tag_key, now, '+inf', byscore=True)
+            pipe.delete(*tag_keys)
+            *members, _ = await pipe.execute()
+        keys = {key.decode() for tag_members in members for key in tag_members}
+        if keys:
+            await self._delete(*keys)
+        return len(keys)
+
+    def _search_key_generate(self, query: str, *args) -> str:
+        query_hash = hashlib.sha1(normalize_query(query).encode()).hexdigest()
+        return self._key_generate('search', query_hash, *args)
+
+    async def _set_search(self, key: str, value: bytes | str,
+                          tags: Iterable[str] = ()) -> None:
+        """Записать результат поиска, вытеснив самые старые сверх лимита."""
+        tags = list(tags)
+        await self._set(key, value, ttl=self.search_ttl, tags=tags)
+        # Индекс не версионируется, иначе после смены поколения старый
+        # индекс остался бы в redis навсегда.
+        index = f'{self.namespace}:search:index'
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(index, {key: time.time()})
+            pipe.zrange(index, 0, -self.search_max_entries - 1)
+            pipe.zremrangebyrank(index, 0, -self.search_max_entries - 1)
+            _, evicted, _ = await pipe.execute()
+        if evicted:
+            evicted = [k.decode() for k in evicted]
+            await self._delete(*evicted)
+            # Из тегов этой записи, среди них общий тег поиска (movies,
+            # persons), вытесненные удаляем сразу; в тегах документов
+            # они остаются до своего срока.
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.zrem(self._tag_key(tag), *evicted)
+                await pipe.execute()
+
+    def _key_generate(self, *args, **kwargs) -> str:
+        parts = [self.namespace, f'v{self.generation}', *map(str, args)]
+        parts.extend(f'{k}={v}' for k, v in sorted(kwargs.items()))
+        return ':'.join(parts)
+
+    @property
+    def generation_key(self) -> str:
+        return f'{self.namespace}:generation'
+
+    async def load_generation(self) -> int:
+        """Прочитать текущее поколение namespace из redis."""
+        generation = await self.redis.get(self.generation_key)
+        self.generation = int(generation or 0)
+        return self.generation
+
+    async def bump_generation(self) -> int:
+        """Сбросить все записи namespace, увеличив номер поколения."""
+        self.generation = await self.redis.incr(self.generation_key)
+        return self.generation
+
+    @asynccontextmanager
+    async def lock(self, name: str) -> AsyncIterator[bool]:
+        """Распределенная блокировка на время загрузки значения.
+
+        Отдает True, если блокировку удалось взять за LOCK_WAIT_IN_SECONDS.
+        """
+        lock = self.redis.lock(
+            self._key_generate('lock', name),
+            timeout=LOCK_EXPIRE_IN_SECONDS,
+            blocking_timeout=LOCK_WAIT_IN_SECONDS,
+        )
+        acquired = await lock.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                # Блокировка могла истечь, пока шла загрузка.
+                with suppress(LockError):
+                    await lock.release()
+
+    async def claim(self, name: str, ttl: int) -> bool:
+        """Отметка "уже выполняется" на ttl секунд, без ожидания.
+
+        Отдает True только первому из вызвавших за ttl секунд. Отметка
+        не снимается и истекает сама, поэтому задача выполняется не
+        чаще раза за ttl, сколько бы она ни длилась.
+        """
+        return bool(await self.redis.set(
+            self._key_generate('claim', name), 1, nx=True, ex=ttl
+        ))
 
     async def close(self):
-        self.redis.close()
-        await self.redis.wait_closed()
+        await self.redis.close()
 
 
 redis_storage: AbstractCacheStorage | None = None
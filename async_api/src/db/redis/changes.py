@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+
+from orjson import orjson
+from redis.exceptions import RedisError, ResponseError
+
+from db.redis.base import RedisStorage, make_tags
+
+CHANGES_STREAM = 'cache:changes'
+CONSUMER_GROUP = 'async_api'
+READ_COUNT = 100
+READ_BLOCK_IN_MILLISECONDS = 5000
+RECONNECT_DELAY_IN_SECONDS = 1
+# Сообщение, не подтвержденное дольше этого времени, забирает себе
+# другой воркер: прежний получатель, скорее всего, завершился.
+CLAIM_IDLE_IN_MILLISECONDS = 60_000
+CLAIM_INTERVAL_IN_SECONDS = 30
+# Получатели без сообщений, не читавшие stream дольше этого времени
+# (остановленные воркеры), удаляются из группы.
+CONSUMER_IDLE_IN_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+class ChangesConsumer:
+    """Инвалидация кеша по изменениям, которые публикует ETL.
+
+    ETL после загрузки пачки документов пишет в redis stream сообщение
+    ``{'index': 'movies', 'ids': '["<id>", ...]'}``. Воркеры API читают
+    stream через общую consumer group, поэтому каждое сообщение
+    обрабатывает один воркер; остальные узнают об удаленных ключах через
+    pub/sub локального кеша.
+
+    Имя получателя - хост и pid воркера. Сообщения, которые получил
+    завершившийся воркер, остаются в списке ожидающих группы: раз в
+    CLAIM_INTERVAL_IN_SECONDS живые воркеры забирают их через XAUTOCLAIM
+    и обрабатывают повторно. Сообщение, которое не удалось обработать
+    из-за ошибки redis, тоже остается ожидающим; некорректное сообщение
+    записывается в лог и подтверждается.
+    """
+
+    def __init__(
+            self,
+            storage: RedisStorage,
+            stream: str = CHANGES_STREAM,
+            group: str = CONSUMER_GROUP
+    ):
+        self.storage = storage
+        self.redis = storage.redis
+        self.stream = stream
+        self.group = group
+        self.consumer = f'{socket.gethostname()}-{os.getpid()}'
+        self._claimed_at = 0.0
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                await self._create_group()
+                await self._consume()
+            except RedisError as er:
+                # ResponseError: например, stream удалили вместе с группой.
+                logging.error('Cache changes stream error: %s', er)
+                await asyncio.sleep(RECONNECT_DELAY_IN_SECONDS)
+            except Exception:
+                logging.exception('Cache changes consumer failed')
+                await asyncio.sleep(RECONNECT_DELAY_IN_SECONDS)
+
+    async def _create_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(
+                self.stream, self.group, id='$', mkstream=True
+            )
+        except ResponseError as er:
+            if 'BUSYGROUP' not in str(er):
+                raise
+
+    async def _consume(self) -> None:
+        while True:
+            if time.monotonic() - self._claimed_at >= CLAIM_INTERVAL_IN_SECONDS:
+                await self._claim_pending()
+                self._claimed_at = time.monotonic()
+            response = await self.redis.xreadgroup(
+                self.group, self.consumer, {self.stream: '>'},
+                count=READ_COUNT, block=READ_BLOCK_IN_MILLISECONDS,
+            )
+            for _, messages in response:
+                await self._process(messages)
+
+    async def _claim_pending(self) -> None:
+        """Забрать и обработать сообщения, зависшие у других получателей."""
+        start_id = '0-0'
+        while True:
+            start_id, messages, *_ = await self.redis.xautoclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=CLAIM_IDLE_IN_MILLISECONDS,
+                start_id=start_id, count=READ_COUNT,
+            )
+            if messages:
+                logging.warning(
+                    'Claimed %s pending cache changes', len(messages)
+                )
+                await self._process(messages)
+            if start_id in (b'0-0', '0-0'):
+                break
+        for consumer in await self.redis.xinfo_consumers(self.stream, self.group):
+            if (consumer['pending'] == 0
+                    and consumer['idle'] > CONSUMER_IDLE_IN_MILLISECONDS):
+                await self.redis.xgroup_delconsumer(
+                    self.stream, self.group, consumer['name']
+                )
+
+    async def _process(self, messages: list) -> None:
+        for message_id, fields in messages:
+            if message_id is None:
+                # Redis 6: сообщение удалено из stream (MAXLEN).
+                continue
+            try:
+                await self.handle(fields)
+            except RedisError:
+                # Сообщение остается ожидающим и будет забрано повторно.
+                logging.exception('Cache changes %s failed', message_id)
+                continue
+            except Exception:
+                logging.exception(
+                    'Malformed cache changes %s: %s', message_id, fields
+                )
+            await self.redis.xack(self.stream, self.group, message_id)
+
+    async def handle(self, fields: dict[bytes, bytes]) -> None:
+        index = fields[b'index'].decode()
+        ids = orjson.loads(fields[b'ids'])
+        # Тег индекса - страницы списков и поиска, куда мог попасть
+        # новый документ.
+        deleted = await self.storage.invalidate_tags(
+            index, *make_tags(index, *ids)
+        )
+        logging.info(
+            'Cache invalidated for %s %s documents: %s keys',
+            len(ids), index, deleted
+        )
@@ -0,0 +1,83 @@
+import abc
+from typing import Type, TypeVar
+
+import orjson
+
+from models.base import DomainModel
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack не обязателен
+    msgpack = None
+
+M = TypeVar('M', bound=DomainModel)
+
+
+class CacheCodec(abc.ABC):
+    """Сериализация моделей для хранения в кеше.
+
+    Модель или список моделей кодируется за один проход. Значения
+    восстанавливаются через from_dict модели без повторной проверки:
+    в кеш попадают только данные, уже проверенные на входе из elastic.
+
+    is_json - закодированное значение совпадает с телом JSON-ответа.
+    """
+    is_json: bool = False
+
+    @abc.abstractmethod
+    def dumps(self, obj) -> bytes:
+        """Закодировать python-объект вместе с моделями в нем."""
+
+    @abc.abstractmethod
+    def loads(self, data: bytes):
+        """Раскодировать python-объект."""
+
+    def encode(self, value: DomainModel | list[DomainModel]) -> bytes:
+        return self.dumps(value)
+
+    def decode(self, data: bytes, model: Type[M]) -> M:
+        return model.from_dict(self.loads(data))
+
+    def decode_many(self, data: bytes, model: Type[M]) -> list[M]:
+        return [model.from_dict(item) for item in self.loads(data)]
+
+
+class OrjsonCodec(CacheCodec):
+    name = 'orjson'
+    is_json = True
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, DomainModel):
+        return obj.to_dict()
+    return str(obj)
+
+
+class MsgpackCodec(CacheCodec):
+    name = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError('msgpack codec requires the msgpack package')
+
+    def dumps(self, obj) -> bytes:
+        return msgpack.packb(obj, default=_msgpack_default)
+
+    def loads(self, data: bytes):
+        return msgpack.unpackb(data)
+
+
+CODECS: dict[str, Type[CacheCodec]] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+
+
+def get_codec(name: str) -> CacheCodec:
+    return CODECS[name]()
@@ -0,0 +1,22 @@
+from redis.asyncio.connection import Connection
+
+from core import deadline
+
+
+class DeadlineConnection(Connection):
+    """Соединение redis с таймаутом из дедлайна текущего запроса.
+
+    redis-py читает socket_timeout при каждой записи и чтении, поэтому
+    таймаут команды - остаток дедлайна запроса (но не больше заданного
+    socket_timeout). Вне запроса (фоновые задачи, XREAD BLOCK, pub/sub)
+    действует обычный socket_timeout. По таймауту redis-py закрывает
+    соединение, так что ответ не достанется следующей команде.
+    """
+
+    @property
+    def socket_timeout(self) -> float | None:
+        return deadline.timeout(self._socket_timeout)
+
+    @socket_timeout.setter
+    def socket_timeout(self, value: float | None) -> None:
+        self._socket_timeout = value
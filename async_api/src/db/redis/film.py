@@ -1,47 +1,76 @@
 import logging
 from uuid import UUID
 
-from orjson import orjson
-from pydantic import BaseModel
-
 from core.messages import FILM_CACHE_NOT_FOUND
-from db.redis.base import RedisStorage
+from db.redis.base import CacheEntry, RedisStorage, make_tags
 from models.film import DetailFilm, ShortFilm
 
 
 class FilmCacheRepository(RedisStorage):
-    async def get_by_id(self, film_id: UUID) -> DetailFilm | None:
+    namespace = 'film'
+
+    async def get_by_id(self, film_id: UUID) -> CacheEntry[DetailFilm] | None:
         key = self._key_generate(film_id)
-        data = await self.redis.get(key)
-        if not data:
+        entry = await self._get_model(key, DetailFilm)
+        if not entry:
             logging.info(FILM_CACHE_NOT_FOUND, 'film_id', film_id)
             return None
-        film = DetailFilm.parse_raw(data)
-        return film
+        return entry
 
     async def get_by_sort(self, sort: str, page_size: int,
-                          page_number: int, genre: UUID | None):
-        key = self._key_generate(sort, page_size, page_number, genre)
-        data = await self.redis.get(key)
-        if not data:
+                          page_number: int, genre: UUID | None
+                          ) -> CacheEntry[list[ShortFilm]] | None:
+        key = self._key_generate('sort', sort, page_size, page_number, genre)
+        entry = await self._get_models(key, ShortFilm)
+        if not entry:
             logging.info(FILM_CACHE_NOT_FOUND, 'sort', sort)
             return None
-        return [ShortFilm.parse_raw(item) for item in orjson.loads(data)]
-
-    async def put_to_cache(self,
-                           name_id: str,
-                           data: BaseModel):
-        await self.redis.set(
-            f'{name_id}:{data.uuid}',
-            data.json()
+        return entry
+
+    async def get_by_title(self, film_title: str, page_size: int,
+                           page_number: int) -> CacheEntry[list[ShortFilm]] | None:
+        key = self._search_key_generate(film_title, page_size, page_number)
+        entry = await self._get_models(key, ShortFilm)
+        if not entry:
+            logging.info(FILM_CACHE_NOT_FOUND, 'query', film_title)
+            return None
+        return entry
+
+    async def get_etag_by_id(self, film_id: UUID) -> str | None:
+        return await self._get_etag(self._key_generate(film_id))
+
+    async def get_many(self, film_ids: list[UUID]) -> list[CacheEntry[DetailFilm] | None]:
+        keys = [self._key_generate(film_id) for film_id in film_ids]
+        return await self._get_many_models(keys, DetailFilm)
+
+    async def put_film(self, film: DetailFilm) -> None:
+        key = self._key_generate(film.uuid)
+        await self._set(
+            key, self.codec.encode(film), tags=make_tags('movies', film.uuid)
+        )
+
+    async def put_many(self, films: list[DetailFilm]) -> None:
+        keys = {film.uuid: self._key_generate(film.uuid) for film in films}
+        await self._set_many(
+            {keys[film.uuid]: self.codec.encode(film) for film in films},
+            tags={keys[film.uuid]: make_tags('movies', film.uuid) for film in films},
         )
 
     async def put_sort_films_to_cache(self, films: list[ShortFilm], sort: str, page_size: int,
                                       page_number: int, genre: UUID | None) -> None:
-        key = self._key_generate(sort, page_size, page_number, genre)
-        await self.redis.set(
-            key,
-            orjson.dumps([film.json(by_alias=True) for film in films]),
+        key = self._key_generate('sort', sort, page_size, page_number, genre)
+        # Страница зависит и от своих фильмов, и от появления новых.
+        await self._set(
+            key, self.codec.encode(films),
+            tags=['movies', *make_tags('movies', *(film.uuid for film in films))]
+        )
+
+    async def put_search_films_to_cache(self, films: list[ShortFilm], film_title: str,
+                                        page_size: int, page_number: int) -> None:
+        key = self._search_key_generate(film_title, page_size, page_number)
+        await self._set_search(
+            key, self.codec.encode(films),
+            tags=['movies', *make_tags('movies', *(film.uuid for film in films))]
         )
 
 
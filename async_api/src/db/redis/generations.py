@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from db.redis.base import RedisStorage
+
+REFRESH_INTERVAL_IN_SECONDS = 1
+
+
+class GenerationWatcher:
+    """Синхронизация поколений кеша между воркерами.
+
+    Поколение namespace меняет любой процесс (bump_generation, ETL при
+    пересоздании индекса или ``INCR film:generation`` из redis-cli), поэтому
+    воркеры раз в interval секунд перечитывают все поколения одним MGET.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            storages: list[RedisStorage],
+            interval: float = REFRESH_INTERVAL_IN_SECONDS
+    ):
+        self.redis = redis
+        self.storages = storages
+        self.interval = interval
+
+    async def refresh(self) -> None:
+        generations = await self.redis.mget(
+            [storage.generation_key for storage in self.storages]
+        )
+        for storage, generation in zip(self.storages, generations):
+            generation = int(generation or 0)
+            if generation != storage.generation:
+                logging.info(
+                    'Cache %s generation changed: %s -> %s',
+                    storage.namespace, storage.generation, generation
+                )
+                storage.generation = generation
+
+    async def listen(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except ConnectionError as er:
+                logging.error('Cache generations refresh error: %s', er)
@@ -1,41 +1,53 @@
 import logging
 from uuid import UUID
 
-from orjson import orjson
-
 from core.messages import GENRE_CACHE_NOT_FOUND, TOTAL_GENRE_CACHE_NOT_FOUND
-from db.redis.base import RedisStorage
+from db.redis.base import CacheEntry, RedisStorage, make_tags
 from models.genre import Genre
 
 
 class GenreCacheRepository(RedisStorage):
-    async def get_by_id(self, genre_id: UUID) -> Genre | None:
+    namespace = 'genre'
+
+    async def get_by_id(self, genre_id: UUID) -> CacheEntry[Genre] | None:
         key = self._key_generate(genre_id)
-        data = await self.redis.get(key)
-        if not data:
+        entry = await self._get_model(key, Genre)
+        if not entry:
             logging.info(GENRE_CACHE_NOT_FOUND, 'genre_id', genre_id)
             return None
-        genre = Genre.parse_raw(data)
-        return genre
+        return entry
 
-    async def get_all(self) -> list[Genre] | None:
-        key = self._key_generate(source='all_genres')
-        data = await self.redis.get(key)
-        if not data:
+    async def get_all(self) -> CacheEntry[list[Genre]] | None:
+        key = self._key_generate('all')
+        entry = await self._get_models(key, Genre)
+        if not entry:
             logging.error(TOTAL_GENRE_CACHE_NOT_FOUND)
             return None
-        return [Genre.parse_raw(item) for item in orjson.loads(data)]
+        return entry
+
+    async def get_etag_by_id(self, genre_id: UUID) -> str | None:
+        return await self._get_etag(self._key_generate(genre_id))
+
+    async def get_many(self, genre_ids: list[UUID]) -> list[CacheEntry[Genre] | None]:
+        keys = [self._key_generate(genre_id) for genre_id in genre_ids]
+        return await self._get_many_models(keys, Genre)
 
     async def put_genres(self, genres: list[Genre]) -> None:
-        key = self._key_generate(source='all_genres')
-        await self.redis.set(
-            key,
-            orjson.dumps([genre.json(by_alias=True) for genre in genres])
-        )
+        key = self._key_generate('all')
+        await self._set(key, self.codec.encode(genres), tags=['genres'])
 
     async def put_genre(self, genre: Genre) -> None:
         key = self._key_generate(genre.uuid)
-        await self.redis.set(key, genre.json())
+        await self._set(
+            key, self.codec.encode(genre), tags=make_tags('genres', genre.uuid)
+        )
+
+    async def put_many(self, genres: list[Genre]) -> None:
+        keys = {genre.uuid: self._key_generate(genre.uuid) for genre in genres}
+        await self._set_many(
+            {keys[genre.uuid]: self.codec.encode(genre) for genre in genres},
+            tags={keys[genre.uuid]: make_tags('genres', genre.uuid) for genre in genres},
+        )
 
 
 genre_cache_repository: GenreCacheRepository | None = None
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from orjson import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+RECONNECT_DELAY_IN_SECONDS = 1
+
+
+class LocalCache:
+    """Кеш первого уровня в памяти процесса перед redis.
+
+    Хранит сырые значения из redis, ограничен по числу записей (LRU)
+    и по времени жизни записи. Изменение ключа в одном воркере
+    рассылается остальным через pub/sub канал redis, и они удаляют
+    у себя устаревшую запись.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            maxsize: int,
+            ttl: int,
+            channel: str = INVALIDATION_CHANNEL
+    ):
+        self.redis = redis
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.channel = channel
+        self._node_id = uuid4().hex
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def get(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def publish(self, *keys: str) -> None:
+        """Сообщить остальным воркерам об изменении ключей."""
+        message = orjson.dumps({'node': self._node_id, 'keys': keys})
+        await self.redis.publish(self.channel, message)
+
+    async def listen(self) -> None:
+        """Удалять записи, измененные в других воркерах."""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    data = orjson.loads(message['data'])
+                    if data['node'] != self._node_id:
+                        self.delete(*data['keys'])
+            except ConnectionError as er:
+                logging.error('Cache invalidation channel error: %s', er)
+                # Пока соединения не было, сообщения могли потеряться.
+                self.clear()
+                await asyncio.sleep(RECONNECT_DELAY_IN_SECONDS)
+            finally:
+                await pubsub.close()
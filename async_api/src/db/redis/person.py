@@ -1,42 +1,79 @@
 import logging
 from uuid import UUID
 
-from orjson import orjson
-
 from core.messages import PERSON_CACHE_NOT_FOUND
-from db.redis.base import RedisStorage
+from db.redis.base import CacheEntry, RedisStorage, make_tags
 from models.person import Person, PersonFilm
 
 
 class PersonCacheRepository(RedisStorage):
-    async def get_by_id(self, person_id: UUID) -> Person | None:
+    namespace = 'person'
+
+    async def get_by_id(self, person_id: UUID) -> CacheEntry[Person] | None:
         key = self._key_generate(person_id)
-        data = await self.redis.get(key)
-        if not data:
+        entry = await self._get_model(key, Person)
+        if not entry:
             logging.info(PERSON_CACHE_NOT_FOUND, 'person_id', person_id)
             return None
-        person = Person.parse_raw(data)
-        return person
+        return entry
 
-    async def get_person_films(self, person_id: UUID) -> list[PersonFilm] | None:
-        key = self._key_generate(person_id, source='person_films')
-        data = await self.redis.get(key)
-        if not data:
+    async def get_person_films(self, person_id: UUID, page_size: int,
+                               page_number: int) -> CacheEntry[list[PersonFilm]] | None:
+        key = self._key_generate(person_id, 'films', page_size, page_number)
+        entry = await self._get_models(key, PersonFilm)
+        if not entry:
             logging.info(PERSON_CACHE_NOT_FOUND, 'person_id', person_id)
             return None
-        return [PersonFilm.parse_raw(item) for item in orjson.loads(data)]
+        return entry
+
+    async def search_by_name(self, person_name: str, page_size: int,
+                             page_number: int) -> CacheEntry[list[Person]] | None:
+        key = self._search_key_generate(person_name, page_size, page_number)
+        entry = await self._get_models(key, Person)
+        if not entry:
+            logging.info(PERSON_CACHE_NOT_FOUND, 'person_name', person_name)
+            return None
+        return entry
+
+    async def get_etag_by_id(self, person_id: UUID) -> str | None:
+        return await self._get_etag(self._key_generate(person_id))
 
-    async def put_person_films(self, person_id: UUID, person_films: list[PersonFilm]) -> None:
-        key = self._key_generate(person_id, source='person_films')
-        await self.redis.set(
-            key,
-            orjson.dumps([person_film.json(by_alias=True) for person_film in person_films])
+    async def get_many(self, person_ids: list[UUID]) -> list[CacheEntry[Person] | None]:
+        keys = [self._key_generate(person_id) for person_id in person_ids]
+        return await self._get_many_models(keys, Person)
+
+    async def put_person_films(self, person_id: UUID, person_films: list[PersonFilm],
+                               page_size: int, page_number: int) -> None:
+        key = self._key_generate(person_id, 'films', page_size, page_number)
+        # Фильмография - поиск по movies: новый фильм персоны меняет страницу.
+        await self._set(
+            key, self.codec.encode(person_films),
+            tags=[
+                'movies',
+                *make_tags('persons', person_id),
+                *make_tags('movies', *(film.uuid for film in person_films)),
+            ]
         )
 
     async def put_person(self, person: Person) -> None:
         key = self._key_generate(person.uuid)
-        await self.redis.set(
-            key, person.json()
+        await self._set(
+            key, self.codec.encode(person), tags=make_tags('persons', person.uuid)
+        )
+
+    async def put_many(self, persons: list[Person]) -> None:
+        keys = {person.uuid: self._key_generate(person.uuid) for person in persons}
+        await self._set_many(
+            {keys[person.uuid]: self.codec.encode(person) for person in persons},
+            tags={keys[person.uuid]: make_tags('persons', person.uuid) for person in persons},
+        )
+
+    async def put_search_persons(self, persons: list[Person], person_name: str,
+                                 page_size: int, page_number: int) -> None:
+        key = self._search_key_generate(person_name, page_size, page_number)
+        await self._set_search(
+            key, self.codec.encode(persons),
+            tags=['persons', *make_tags('persons', *(person.uuid for person in persons))]
         )
 
 
@@ -1,17 +1,121 @@
-from redis.asyncio import Redis
-from db.redis import film, genre, person
+import asyncio
+
+from redis.asyncio import ConnectionPool, Redis
+
+from core.config import settings
+from core.metrics import POOL_CONNECTIONS
+from db.redis import film, genre, person, response
+from db.dataloader import DataLoader
+from db.redis.base import RedisStorage
+from db.redis.changes import ChangesConsumer
+from db.redis.codecs import get_codec
+from db.redis.connection import DeadlineConnection
+from db.redis.generations import GenerationWatcher
+from db.redis.local_cache import LocalCache
 
 
 redis: Redis | None = None
+local_cache: LocalCache | None = None
+_invalidation_task: asyncio.Task | None = None
+_changes_task: asyncio.Task | None = None
+_generations_task: asyncio.Task | None = None
+
+
+async def on_startup(host: str, port: int):
+    global redis, local_cache, _invalidation_task, _changes_task, \
+        _generations_task
+    # Таймауты команд берутся из дедлайна запроса.
+    redis = Redis(connection_pool=ConnectionPool(
+        host=host, port=port, connection_class=DeadlineConnection
+    ))
+    codec = get_codec(settings.cache_codec)
+    if settings.local_cache_size > 0:
+        local_cache = LocalCache(
+            redis,
+            maxsize=settings.local_cache_size,
+            ttl=settings.local_cache_ttl,
+        )
+        _invalidation_task = asyncio.create_task(local_cache.listen())
+    get_loader = None
+    if settings.dataloader_enabled:
+        # Один загрузчик на процесс: GET разных репозиториев тоже
+        # объединяются в общий MGET.
+        get_loader = DataLoader(
+            redis.mget, name='redis:get', window=settings.dataloader_window
+        )
+    film.film_cache_repository = film.FilmCacheRepository(
+        redis,
+        ttl=settings.film_cache_ttl,
+        stale_ttl=settings.cache_stale_ttl,
+        fallback_ttl=settings.cache_fallback_ttl,
+        search_ttl=settings.search_cache_ttl,
+        search_max_entries=settings.search_cache_max_entries,
+        local_cache=local_cache,
+        codec=codec,
+        get_loader=get_loader,
+    )
+    genre.genre_cache_repository = genre.GenreCacheRepository(
+        redis,
+        ttl=settings.genre_cache_ttl,
+        stale_ttl=settings.cache_stale_ttl,
+        fallback_ttl=settings.cache_fallback_ttl,
+        local_cache=local_cache,
+        codec=codec,
+        get_loader=get_loader,
+    )
+    person.person_cache_repository = person.PersonCacheRepository(
+        redis,
+        ttl=settings.person_cache_ttl,
+        stale_ttl=settings.cache_stale_ttl,
+        fallback_ttl=settings.cache_fallback_ttl,
+        search_ttl=settings.search_cache_ttl,
+        search_max_entries=settings.search_cache_max_entries,
+        local_cache=local_cache,
+        codec=codec,
+        get_loader=get_loader,
+    )
+    if settings.response_cache_ttl > 0:
+        response.response_cache_repository = response.ResponseCacheRepository(
+            redis,
+            ttl=settings.response_cache_ttl,
+            local_cache=local_cache,
+            get_loader=get_loader,
+        )
+    changes_consumer = ChangesConsumer(
+        RedisStorage(redis, local_cache=local_cache),
+        stream=settings.cache_changes_stream,
+    )
+    _changes_task = asyncio.create_task(changes_consumer.listen())
+    generation_watcher = GenerationWatcher(
+        redis,
+        [
+            storage for storage in (
+                film.film_cache_repository,
+                genre.genre_cache_repository,
+                person.person_cache_repository,
+                response.response_cache_repository,
+            )
+            if storage is not None
+        ],
+        interval=settings.cache_generation_refresh_interval,
+    )
+    # До первых запросов, чтобы не читать записи сброшенного поколения.
+    await generation_watcher.refresh()
+    _generations_task = asyncio.create_task(generation_watcher.listen())
 
 
-def on_startup(host: str, port: int):
-    global redis
-    redis = Redis(host=host, port=port)
-    film.film_cache_repository = film.FilmCacheRepository(redis)
-    genre.genre_cache_repository = genre.GenreCacheRepository(redis)
-    person.person_cache_repository = person.PersonCacheRepository(redis)
+def observe_pool():
+    """Обновить метрики пула соединений redis."""
+    if redis is None:
+        return
+    pool = redis.connection_pool
+    POOL_CONNECTIONS.labels('redis', 'in_use').set(len(pool._in_use_connections))
+    POOL_CONNECTIONS.labels('redis', 'idle').set(len(pool._available_connections))
 
 
-def on_shutdown():
-    redis.close()
+async def on_shutdown():
+    for task in (_invalidation_task, _changes_task, _generations_task):
+        if task is not None:
+            task.cancel()
+    await redis.close()
+    await redis.connection_pool.disconnect()
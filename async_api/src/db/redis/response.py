@@ -0,0 +1,62 @@
+import hashlib
+import struct
+from dataclasses import dataclass
+from typing import Iterable
+from urllib.parse import urlencode
+
+import orjson
+
+from db.redis.base import CacheEntry, RedisStorage
+
+# Длина блока заголовков перед телом ответа.
+_HEADERS_LENGTH = struct.Struct('!I')
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+
+
+class ResponseCacheRepository(RedisStorage):
+    """Кеш готовых HTTP-ответов: закодированное тело и его заголовки.
+
+    Ключ - путь маршрута и отсортированные параметры запроса. Запись
+    помечается теми же тегами, что и данные, из которых собран ответ,
+    поэтому изменения из ETL сбрасывают и ее.
+    """
+    namespace = 'response'
+
+    def response_key(self, path: str, params: Iterable[tuple[str, str]]) -> str:
+        query = urlencode(sorted(params))
+        return self._key_generate(hashlib.sha1(f'{path}?{query}'.encode()).hexdigest())
+
+    async def get_response(self, key: str) -> CacheEntry[CachedResponse] | None:
+        entry = await self._get(key)
+        if entry is None:
+            return None
+        data = entry.value
+        length, = _HEADERS_LENGTH.unpack_from(data)
+        start = _HEADERS_LENGTH.size
+        headers = orjson.loads(data[start:start + length])
+        return CacheEntry(
+            CachedResponse(body=data[start + length:], headers=headers),
+            entry.is_stale,
+            entry.expires_at,
+        )
+
+    async def put_response(self, key: str, response: CachedResponse,
+                           tags: Iterable[str] = ()) -> None:
+        headers = orjson.dumps(response.headers)
+        await self._set(
+            key,
+            _HEADERS_LENGTH.pack(len(headers)) + headers + response.body,
+            tags=tags,
+        )
+
+
+response_cache_repository: ResponseCacheRepository | None = None
+
+
+def get_response_cache_repository() -> ResponseCacheRepository | None:
+    return response_cache_repository
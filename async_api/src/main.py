@@ -1,10 +1,19 @@
-from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
+from http import HTTPStatus
 
+from elasticsearch.exceptions import ConnectionError as ElasticConnectionError
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+
+from api.middleware import MetricsMiddleware, StaleDataMiddleware
 from api.v1 import films, genres, persons
+from api.v1.utils import request_deadline
+from core import metrics
 from core.config import settings
+from core.messages import EXPIRED_CURSOR, STORAGE_UNAVAILABLE
 from db.elastic import elastic_storage
+from db.elastic.base import InvalidCursorError
 from db.redis import redis_storage
+from services import warmup
 
 
 app = FastAPI(
@@ -13,26 +22,72 @@ app = FastAPI(
     openapi_url='/api/openapi.json',
     default_response_class=ORJSONResponse,
 )
+app.add_middleware(StaleDataMiddleware)
+app.add_middleware(
+    MetricsMiddleware,
+    observers=(redis_storage.observe_pool, elastic_storage.observe_pool),
+)
 
 
 @app.on_event('startup')
 async def startup():
-    redis_storage.on_startup(
+    await redis_storage.on_startup(
         host=settings.redis_host, port=settings.redis_port
     )
     elastic_storage.on_startup(
         data_storage_hosts=[f'{settings.elastic_host}:{settings.elastic_port}']
     )
+    warmup.on_startup()
 
 
 @app.on_event('shutdown')
 async def shutdown():
+    await warmup.on_shutdown()
     await redis_storage.on_shutdown()
     await elastic_storage.on_shutdown()
 
 
+@app.exception_handler(ElasticConnectionError)
+async def storage_unavailable(request: Request, exc: ElasticConnectionError):
+    # Elastic недоступен (или открыт breaker), а в кеше значения нет.
+    return ORJSONResponse(
+        {'detail': STORAGE_UNAVAILABLE},
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(settings.elastic_breaker_open_timeout)},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def cursor_expired(request: Request, exc: InvalidCursorError):
+    # Истек point in time курсора или search_after не подходит к выдаче.
+    return ORJSONResponse(
+        {'detail': EXPIRED_CURSOR}, status_code=HTTPStatus.BAD_REQUEST,
+    )
+
+
+@app.get('/metrics', include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(body, headers={'Content-Type': content_type})
+
+
 # Подключаем роутер к серверу, указав префикс /v1/films
 # Теги указываем для удобства навигации по документации
-app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
-app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
-app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
+app.include_router(
+    films.router,
+    prefix='/api/v1/films',
+    tags=['films'],
+    dependencies=[Depends(request_deadline)],
+)
+app.include_router(
+    genres.router,
+    prefix='/api/v1/genres',
+    tags=['genres'],
+    dependencies=[Depends(request_deadline)],
+)
+app.include_router(
+    persons.router,
+    prefix='/api/v1/persons',
+    tags=['persons'],
+    dependencies=[Depends(request_deadline)],
+)
@@ -1,18 +1,39 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields
+from typing import Callable, Iterable, TypeVar
 from uuid import UUID
 
-import orjson
-from pydantic import BaseModel
+T = TypeVar('T')
 
 
-def orjson_dumps(v, *, default):
-    return orjson.dumps(v, default=default).decode()
+class DomainModel(ABC):
+    """Основа доменных моделей.
 
+    Модели - frozen dataclass со __slots__: у экземпляра нет __dict__ и
+    служебных полей pydantic. Коллекции в полях - кортежи, поэтому
+    экземпляр неизменяем целиком и его можно разделять между запросами
+    и локальным кешем. Данные проверяются один раз на входе из elastic
+    (from_source); из кеша модель собирается без проверок (from_dict).
+    orjson сериализует такие модели напрямую.
+    """
+    __slots__ = ()
 
-class BaseOrjsonModel(BaseModel):
-    class Config:
-        json_loads = orjson.loads
-        json_dumps = orjson_dumps
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: dict):
+        """Модель из словаря, сохраненного в кеше."""
 
+    def to_dict(self) -> dict:
+        """Поля модели; вложенные модели не разворачиваются."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
 
-class UUIDMixin(BaseOrjsonModel):
+
+@dataclass(slots=True, frozen=True)
+class UUIDMixin(DomainModel):
     uuid: UUID
+
+
+def build_many(build: Callable[[dict], T], items: Iterable[dict] | None) -> tuple[T, ...] | None:
+    if items is None:
+        return None
+    return tuple(build(item) for item in items)
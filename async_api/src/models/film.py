@@ -1,89 +1,80 @@
-from typing import List
+from dataclasses import dataclass
+from uuid import UUID
 
-import orjson
-
-from db.models.elastic_models import SerializedFilm
-from .base import UUIDMixin
-
-
-def orjson_dumps(v, *, default):
-    return orjson.dumps(v, default=default).decode()
+from .base import UUIDMixin, build_many
+from .genre import Genre
 
 
+@dataclass(slots=True, frozen=True)
 class Actor(UUIDMixin):
     full_name: str
 
+    @classmethod
+    def from_source(cls, source: dict):
+        """Участник из вложенного поля документа movies."""
+        return cls(UUID(source['id']), source['name'])
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(UUID(data['uuid']), data['full_name'])
+
+
+@dataclass(slots=True, frozen=True)
 class Writer(Actor):
     pass
 
 
+@dataclass(slots=True, frozen=True)
 class Director(Actor):
     pass
 
 
-class Genre(UUIDMixin):
-    name: str
-
-
+@dataclass(slots=True, frozen=True)
 class ShortFilm(UUIDMixin):
     title: str
     imdb_rating: float
 
     @classmethod
-    def from_serialized_movie(cls, serialized_movie: SerializedFilm):
-        return cls(
-            uuid=serialized_movie.id,
-            title=serialized_movie.title,
-            imdb_rating=serialized_movie.imdb_rating,
-        )
+    def from_source(cls, source: dict):
+        """Фильм из _source документа movies."""
+        return cls(UUID(source['id']), source['title'], float(source['imdb_rating']))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(UUID(data['uuid']), data['title'], data['imdb_rating'])
 
 
+@dataclass(slots=True, frozen=True)
 class DetailFilm(ShortFilm):
-    description: str | None
-    actors: List[Actor] | None
-    writers: List[Writer] | None
-    directors: List[Director] | None
-    genre: List[Genre] | None
+    description: str | None = None
+    actors: tuple[Actor, ...] | None = None
+    writers: tuple[Writer, ...] | None = None
+    directors: tuple[Director, ...] | None = None
+    genre: tuple[Genre, ...] | None = None
+
+    @classmethod
+    def from_source(cls, source: dict):
+        """Фильм из _source документа movies."""
+        return cls(
+            UUID(source['id']),
+            source['title'],
+            float(source['imdb_rating']),
+            source.get('description'),
+            build_many(Actor.from_source, source.get('actors')),
+            build_many(Writer.from_source, source.get('writers')),
+            build_many(Director.from_source, source.get('director')),
+            build_many(Genre.from_source, source.get('genre')),
+        )
 
     @classmethod
-    def from_serialized_movie(cls, serialized_movie: SerializedFilm):
-        if serialized_movie.actors is None:
-            actors = None
-        else:
-            actors = [
-                Actor(uuid=actor.id, full_name=actor.name)
-                for actor in serialized_movie.actors]
-
-        if serialized_movie.writers is None:
-            writers = None
-        else:
-            writers = [
-                Writer(uuid=writer.id, full_name=writer.name)
-                for writer in serialized_movie.writers
-            ]
-
-        if serialized_movie.director is None:
-            directors = None
-        else:
-            directors = [
-                Director(uuid=director.id, full_name=director.name)
-                for director in serialized_movie.director
-            ]
-        if serialized_movie.genre is None:
-            genre = None
-        else:
-            genre = [
-                Genre(uuid=g.id, name=g.name)
-                for g in serialized_movie.genre
-            ]
+    def from_dict(cls, data: dict):
         return cls(
-            uuid=serialized_movie.id,
-            title=serialized_movie.title,
-            imdb_rating=serialized_movie.imdb_rating,
-            description=serialized_movie.description,
-            genre=genre,
-            actors=actors,
-            writers=writers,
-            directors=directors,
+            UUID(data['uuid']),
+            data['title'],
+            data['imdb_rating'],
+            data.get('description'),
+            build_many(Actor.from_dict, data.get('actors')),
+            build_many(Writer.from_dict, data.get('writers')),
+            build_many(Director.from_dict, data.get('directors')),
+            build_many(Genre.from_dict, data.get('genre')),
         )
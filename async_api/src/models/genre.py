@@ -1,18 +1,19 @@
+from dataclasses import dataclass
 from uuid import UUID
 
-from db.models.elastic_models import SerializedGenre
+from .base import UUIDMixin
 
-from .base import BaseOrjsonModel
 
-
-class Genre(BaseOrjsonModel):
+@dataclass(slots=True, frozen=True)
+class Genre(UUIDMixin):
     """Список жанров."""
-    uuid: UUID
     name: str
 
     @classmethod
-    def from_serialized_genre(cls, serialized_genre: SerializedGenre):
-        return cls(
-            uuid=serialized_genre.id,
-            name=serialized_genre.name
-        )
+    def from_source(cls, source: dict):
+        """Жанр из _source документа genres."""
+        return cls(UUID(source['id']), source['name'])
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(UUID(data['uuid']), data['name'])
@@ -1,43 +1,57 @@
-from typing import List
+from dataclasses import dataclass
+from uuid import UUID
 
-from db.models.elastic_models import SerializedPerson, SerializedPersonFilm
-
-from .base import UUIDMixin
+from .base import UUIDMixin, build_many
 
 
+@dataclass(slots=True, frozen=True)
 class PersonRoleInFilm(UUIDMixin):
     """Фильмы персоны"""
-    roles: List[str]
+    roles: tuple[str, ...]
+
+    @classmethod
+    def from_source(cls, source: dict):
+        return cls(UUID(source['id']), tuple(source['roles']))
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(UUID(data['uuid']), tuple(data['roles']))
 
+
+@dataclass(slots=True, frozen=True)
 class Person(UUIDMixin):
     """Данные по персоне."""
     full_name: str
-    films: List[PersonRoleInFilm] | None
+    films: tuple[PersonRoleInFilm, ...] | None = None
 
     @classmethod
-    def from_serialized_person(cls, serialized_person: SerializedPerson):
+    def from_source(cls, source: dict):
+        """Персона из _source документа persons."""
         return cls(
-            uuid=serialized_person.id,
-            full_name=serialized_person.full_name,
-            films=[
-                PersonRoleInFilm(uuid=f.id, roles=f.roles)
-                for f in serialized_person.films
-            ]
+            UUID(source['id']),
+            source['full_name'],
+            tuple(PersonRoleInFilm.from_source(f) for f in source.get('films') or ()),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            UUID(data['uuid']),
+            data['full_name'],
+            build_many(PersonRoleInFilm.from_dict, data.get('films')),
         )
 
 
+@dataclass(slots=True, frozen=True)
 class PersonFilm(UUIDMixin):
     title: str
-    imdb_rating: str
+    imdb_rating: float
 
     @classmethod
-    def from_serialized_person_film(
-            cls,
-            serialized_person_film: SerializedPersonFilm
-    ):
-        return cls(
-            uuid=serialized_person_film.id,
-            title=serialized_person_film.title,
-            imdb_rating=serialized_person_film.imdb_rating
-        )
+    def from_source(cls, source: dict):
+        """Фильм персоны из _source документа movies."""
+        return cls(UUID(source['id']), source['title'], float(source['imdb_rating']))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(UUID(data['uuid']), data['title'], data['imdb_rating'])
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import AsyncContextManager, Awaitable, Callable, Hashable, TypeVar
+
+from elasticsearch.exceptions import ConnectionTimeout
+
+from core import deadline
+from core.config import settings
+from core.metrics import CACHE_COALESCED, CACHE_FALLBACKS, CACHE_STALE_HITS
+from db.elastic.breaker import is_unavailable
+from db.redis.base import CacheEntry, serving_expired
+
+T = TypeVar('T')
+K = TypeVar('K', bound=Hashable)
+
+# На сколько секунд устарели данные, отданные в текущем запросе.
+served_stale_for: ContextVar[float | None] = ContextVar(
+    'served_stale_for', default=None
+)
+# В текущем запросе хранилище было недоступно: отданы последние
+# известные значения из кеша, а не просто устаревшие записи.
+served_expired: ContextVar[bool] = ContextVar('served_expired', default=False)
+
+
+def _mark_stale(entry: CacheEntry, expired: bool = False) -> None:
+    stale_for = max(time.time() - entry.expires_at, 0)
+    served_stale_for.set(max(served_stale_for.get() or 0, stale_for))
+    if expired:
+        served_expired.set(True)
+
+
+class CacheAside:
+    """Чтение через кеш (cache-aside).
+
+    Сначала данные ищутся в кеше, при промахе загружаются из хранилища
+    и записываются в кеш. Общий для всех сервисов.
+
+    Одновременные промахи по одному ключу объединяются: хранилище
+    запрашивается один раз, результат получают все ожидающие. Если
+    передан lock, загрузка дополнительно сериализуется между воркерами
+    через распределенную блокировку.
+
+    Устаревшая запись (после мягкого истечения) отдается сразу,
+    а обновление из хранилища запускается в фоне. Если хранилище
+    недоступно, отдается последнее известное значение из кеша, даже
+    жестко истекшее. Отданная устаревшая запись отмечается в
+    served_stale_for, последнее известное значение - еще и в
+    served_expired.
+
+    Загрузка общая для всех ожидающих, поэтому ограничена не остатком
+    дедлайна запроса, который ее запустил, а полным бюджетом запроса
+    REQUEST_DEADLINE от ее старта (или дедлайном запустившего, если он
+    позже). Каждый ожидающий ждет ее не дольше своего дедлайна, а затем
+    получает ConnectionTimeout (и последнее известное значение, если
+    оно есть в кеше).
+    """
+
+    def __init__(
+            self,
+            name: str,
+            lock: Callable[[str], AsyncContextManager[bool]] | None = None
+    ):
+        self.name = name
+        self._stale_hits = CACHE_STALE_HITS.labels(name)
+        self._coalesced = CACHE_COALESCED.labels(name)
+        self._fallbacks = CACHE_FALLBACKS.labels(name)
+        self._lock = lock
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def get_or_load(
+            self,
+            key: str,
+            cached: Callable[[], Awaitable[CacheEntry[T] | None]],
+            load: Callable[[], Awaitable[T | None]],
+            put: Callable[[T], Awaitable[None]],
+    ) -> T | None:
+        """
+        :param key: ключ для объединения одновременных загрузок
+        :param cached: получение записи из кеша
+        :param load: загрузка значения из хранилища при промахе
+        :param put: запись загруженного значения в кеш
+        """
+        entry = await cached()
+        if entry and entry.value:
+            if entry.is_stale:
+                self._stale_hits.inc()
+                _mark_stale(entry)
+                self._start_load(key, cached, load, put)
+            return entry.value
+        try:
+            return await self._wait(self._start_load(key, cached, load, put))
+        except Exception as er:
+            if not is_unavailable(er):
+                raise
+            with serving_expired():
+                entry = await cached()
+            if not entry or not entry.value:
+                raise
+            self._fallbacks.inc()
+            _mark_stale(entry, expired=True)
+            logging.warning(
+                'Storage is unavailable, %s:%s served from expired cache',
+                self.name, key
+            )
+            return entry.value
+
+    async def get_many_or_load(
+            self,
+            ids: list[K],
+            cached: Callable[[list[K]], Awaitable[list[CacheEntry[T] | None]]],
+            load: Callable[[list[K]], Awaitable[dict[K, T]]],
+            put: Callable[[list[T]], Awaitable[None]],
+    ) -> dict[K, T]:
+        """Пакетный get_or_load: значения по списку id, ненайденные пропускаются.
+
+        Кеш читается одним запросом, промахи загружаются одним запросом
+        к хранилищу, устаревшие записи отдаются сразу и обновляются
+        одной фоновой загрузкой. Если хранилище недоступно, промахи
+        ищутся среди жестко истекших записей; ошибка поднимается, только
+        если отдать нечего.
+
+        :param cached: получение записей из кеша в порядке id
+        :param load: загрузка значений из хранилища по id
+        :param put: запись загруженных значений в кеш
+        """
+        values = {}
+        stale, missing = [], []
+        for id_, entry in zip(ids, await cached(ids)):
+            if entry and entry.value:
+                values[id_] = entry.value
+                if entry.is_stale:
+                    self._stale_hits.inc()
+                    _mark_stale(entry)
+                    stale.append(id_)
+            else:
+                missing.append(id_)
+        if stale:
+            self._start(self._many_key(stale), self._load_many_and_put(stale, load, put))
+        if not missing:
+            return values
+        try:
+            values.update(await self._wait(self._start(
+                self._many_key(missing), self._load_many_and_put(missing, load, put)
+            )))
+        except Exception as er:
+            if not is_unavailable(er):
+                raise
+            with serving_expired():
+                entries = await cached(missing)
+            expired = {
+                id_: entry for id_, entry in zip(missing, entries)
+                if entry and entry.value
+            }
+            if not values and not expired:
+                raise
+            for id_, entry in expired.items():
+                values[id_] = entry.value
+                _mark_stale(entry, expired=True)
+            # Ответ без части данных тоже нельзя отдавать из кешей.
+            served_expired.set(True)
+            self._fallbacks.inc(len(expired))
+            logging.warning(
+                'Storage is unavailable, %s of %s %s ids served from expired cache',
+                len(expired), len(missing), self.name
+            )
+        return values
+
+    async def refresh(
+            self,
+            key: str,
+            load: Callable[[], Awaitable[T | None]],
+            put: Callable[[T], Awaitable[None]],
+    ) -> T | None:
+        """Загрузить значение из хранилища и перезаписать кеш, даже свежий.
+
+        Возвращается после записи в кеш; с идущей загрузкой того же
+        ключа объединяется.
+        """
+        return await self._start(key, self._load_and_put(load, put))
+
+    @staticmethod
+    def _many_key(ids: list) -> str:
+        return 'many:' + ','.join(sorted(map(str, ids)))
+
+    def _start_load(self, key, cached, load, put) -> asyncio.Task:
+        return self._start(key, self._load(key, cached, load, put))
+
+    def _start(self, key: str, loading: Awaitable) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is not None:
+            loading.close()
+            self._coalesced.inc()
+            return task
+        # Задача копирует contextvars запроса: дедлайн заменяем, чтобы
+        # почти истекший запрос не обрывал загрузку для остальных.
+        with deadline.scope(self._load_deadline()):
+            task = asyncio.create_task(loading)
+        self._in_flight[key] = task
+        task.add_done_callback(self._on_load_done(key))
+        return task
+
+    @staticmethod
+    def _load_deadline() -> float | None:
+        """Дедлайн общей загрузки: полный бюджет запроса от ее старта."""
+        current = deadline.current()
+        if settings.request_deadline <= 0:
+            return current
+        started = time.monotonic() + settings.request_deadline
+        return started if current is None else max(current, started)
+
+    @staticmethod
+    async def _wait(task: asyncio.Task):
+        """Дождаться общей загрузки, но не дольше дедлайна запроса."""
+        try:
+            # shield: отмена одного запроса не должна отменять общую загрузку.
+            return await asyncio.wait_for(asyncio.shield(task), deadline.timeout())
+        except asyncio.TimeoutError:
+            raise ConnectionTimeout(
+                'TIMEOUT', 'request deadline exceeded', None
+            ) from None
+
+    def _on_load_done(self, key: str) -> Callable[[asyncio.Task], None]:
+        def callback(task: asyncio.Task) -> None:
+            self._in_flight.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logging.error(
+                    'Cache load %s:%s failed: %s',
+                    self.name, key, task.exception()
+                )
+        return callback
+
+    async def _load(self, key, cached, load, put):
+        if self._lock is None:
+            return await self._load_and_put(load, put)
+        async with self._lock(key) as acquired:
+            if acquired:
+                # Пока ждали блокировку, кеш мог обновить другой воркер.
+                entry = await cached()
+                if entry and entry.value and not entry.is_stale:
+                    return entry.value
+            return await self._load_and_put(load, put)
+
+    @staticmethod
+    async def _load_and_put(load, put):
+        value = await load()
+        if value:
+            await put(value)
+        return value
+
+    @staticmethod
+    async def _load_many_and_put(ids, load, put):
+        values = await load(ids)
+        if values:
+            await put(list(values.values()))
+        return values
@@ -1,17 +1,20 @@
 import logging
 from functools import lru_cache
 from uuid import UUID
-from typing import Protocol
+from typing import AsyncContextManager, Protocol
 
 from fastapi import Depends
-from pydantic import BaseModel
 
+from core.config import settings
 from core.messages import (
     FILM_NOT_FOUND,
 )
+from db.elastic.base import SearchCursor
 from db.elastic.film import get_film_repository
+from db.redis.base import CacheEntry, normalize_query
 from db.redis.film import get_film_cache_repository
 from models.film import DetailFilm, ShortFilm
+from services.cache import CacheAside
 
 
 class FilmRepositoryProtocol(Protocol):
@@ -19,6 +22,10 @@ class FilmRepositoryProtocol(Protocol):
         """возвращает подробное описание фильма по id"""
         ...
 
+    async def get_many(self, film_ids: list[UUID]) -> list[DetailFilm]:
+        """возвращает найденные фильмы по списку id одним запросом"""
+        ...
+
     async def get_by_title(
             self,
             film_title: str,
@@ -38,9 +45,28 @@ class FilmRepositoryProtocol(Protocol):
         """возвращает фильмы с учетом сортировки и пагинации"""
         ...
 
+    async def get_by_title_after(
+            self,
+            film_title: str,
+            page_size: int,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        """возвращает фильмы с похожим названием после курсора и следующий курсор"""
+        ...
 
-class FilmCacheRepositoryProtocol:
-    async def get_by_id(self, film_id: UUID) -> DetailFilm | None:
+    async def get_by_sort_after(
+            self,
+            sort: str,
+            page_size: int,
+            genre_id: UUID | None,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        """возвращает отсортированные фильмы после курсора и следующий курсор"""
+        ...
+
+
+class FilmCacheRepositoryProtocol(Protocol):
+    async def get_by_id(self, film_id: UUID) -> CacheEntry[DetailFilm] | None:
         """возвращает описание фильма по id из кеша"""
         ...
 
@@ -48,14 +74,24 @@ class FilmCacheRepositoryProtocol:
             self, sort: str,
             page_size: int, page_number: int,
             genre: UUID | None
-    ) -> list[ShortFilm] | None:
+    ) -> CacheEntry[list[ShortFilm]] | None:
         """возвращает список коротких описаний фильмов с учетом сортировки из кеша"""
         ...
 
-    async def put_to_cache(self, name_id: str, data: BaseModel) -> None:
+    async def put_film(self, film: DetailFilm) -> None:
         """добавить фильм в кеш"""
         ...
 
+    async def get_many(
+            self, film_ids: list[UUID]
+    ) -> list[CacheEntry[DetailFilm] | None]:
+        """возвращает описания фильмов по списку id из кеша одним запросом"""
+        ...
+
+    async def put_many(self, films: list[DetailFilm]) -> None:
+        """добавить в кеш несколько фильмов за один запрос"""
+        ...
+
     async def put_sort_films_to_cache(
             self, films: list[ShortFilm],
             sort: str, page_size: int,
@@ -64,6 +100,29 @@ class FilmCacheRepositoryProtocol:
         """добавить фотсортированные фильмы в кеш"""
         ...
 
+    async def get_by_title(
+            self, film_title: str,
+            page_size: int, page_number: int
+    ) -> CacheEntry[list[ShortFilm]] | None:
+        """возвращает результат поиска фильмов по названию из кеша"""
+        ...
+
+    async def put_search_films_to_cache(
+            self, films: list[ShortFilm],
+            film_title: str, page_size: int,
+            page_number: int
+    ) -> None:
+        """добавить результат поиска фильмов по названию в кеш"""
+        ...
+
+    async def get_etag_by_id(self, film_id: UUID) -> str | None:
+        """возвращает ETag свежей записи фильма из кеша"""
+        ...
+
+    def lock(self, name: str) -> AsyncContextManager[bool]:
+        """распределенная блокировка на время загрузки значения"""
+        ...
+
 
 class FilmService:
     def __init__(
@@ -73,18 +132,62 @@ class FilmService:
     ):
         self._film_cache_repository = film_cache_repository
         self._film_repository = film_repository
+        self._cache = CacheAside(
+            'film',
+            lock=film_cache_repository.lock if settings.cache_lock_enabled else None
+        )
+
+    async def get_etag(self, film_id: UUID) -> str | None:
+        return await self._film_cache_repository.get_etag_by_id(film_id)
+
+    def _by_id(self, film_id: UUID) -> dict:
+        return dict(
+            key=f'id:{film_id}',
+            load=lambda: self._film_repository.get_by_id(film_id),
+            put=self._film_cache_repository.put_film,
+        )
 
     async def get_by_id(self, film_id: UUID) -> DetailFilm | None:
-        film = await self._film_repository.get_by_id(film_id)
+        film = await self._cache.get_or_load(
+            cached=lambda: self._film_cache_repository.get_by_id(film_id),
+            **self._by_id(film_id),
+        )
         if not film:
-            film = await self._film_repository.get_by_id(film_id)
-            if not film:
-                logging.info(FILM_NOT_FOUND, 'id', film_id)
-                return None
-            await self._film_cache_repository.put_to_cache(name_id='film_id',
-                                                           data=film)
+            logging.info(FILM_NOT_FOUND, 'id', film_id)
+            return None
         return film
 
+    async def get_many(self, film_ids: list[UUID]) -> list[DetailFilm]:
+        """Фильмы по списку id в порядке запроса, ненайденные пропускаются.
+
+        Кеш читается одним MGET, промахи загружаются одним mget из
+        elastic и записываются в кеш одним pipeline.
+        """
+        film_ids = list(dict.fromkeys(film_ids))
+        films = await self._cache.get_many_or_load(
+            film_ids,
+            cached=self._film_cache_repository.get_many,
+            load=self._load_many,
+            put=self._film_cache_repository.put_many,
+        )
+        return [films[film_id] for film_id in film_ids if film_id in films]
+
+    async def _load_many(self, film_ids: list[UUID]) -> dict[UUID, DetailFilm]:
+        films = await self._film_repository.get_many(film_ids)
+        return {film.uuid: film for film in films}
+
+    def _by_sort(self, sort: str, page_size: int, page_number: int,
+                 genre_id: UUID | None) -> dict:
+        return dict(
+            key=f'sort:{sort}:{page_size}:{page_number}:{genre_id}',
+            load=lambda: self._film_repository.get_by_sort(
+                sort, page_size, page_number, genre_id
+            ),
+            put=lambda films: self._film_cache_repository.put_sort_films_to_cache(
+                films, sort, page_size, page_number, genre_id
+            ),
+        )
+
     async def get_by_sort(
             self,
             sort: str,
@@ -92,34 +195,81 @@ class FilmService:
             page_number: int,
             genre_id: UUID | None
     ) -> list[ShortFilm] | None:
-        films = await self._film_cache_repository.get_by_sort(
-            sort, page_size,
-            page_number, genre_id
+        films = await self._cache.get_or_load(
+            cached=lambda: self._film_cache_repository.get_by_sort(
+                sort, page_size, page_number, genre_id
+            ),
+            **self._by_sort(sort, page_size, page_number, genre_id),
         )
         if not films:
-            films = await self._film_repository.get_by_sort(sort,
-                                                            page_size,
-                                                            page_number,
-                                                            genre_id)
-            if not films:
-                logging.info(FILM_NOT_FOUND, 'sort', sort)
-                return None
-            await self._film_cache_repository.put_sort_films_to_cache(
-                films, sort, page_size,
-                page_number, genre_id
-            )
+            logging.info(FILM_NOT_FOUND, 'sort', sort)
+            return None
         return films
 
+    # Принудительное обновление записей кеша (прогрев): загрузка из
+    # хранилища, даже если запись в кеше еще свежая.
+    async def refresh_by_id(self, film_id: UUID) -> DetailFilm | None:
+        return await self._cache.refresh(**self._by_id(film_id))
+
+    async def refresh_by_sort(
+            self,
+            sort: str,
+            page_size: int,
+            page_number: int,
+            genre_id: UUID | None
+    ) -> list[ShortFilm] | None:
+        return await self._cache.refresh(
+            **self._by_sort(sort, page_size, page_number, genre_id)
+        )
+
     async def get_by_title(self, film_title: str, page_size: int,
                            page_number: int) -> list[ShortFilm] | None:
-        films = await self._film_repository.get_by_title(
-            film_title, page_size, page_number
+        films = await self._cache.get_or_load(
+            key=f'search:{normalize_query(film_title)}:{page_size}:{page_number}',
+            cached=lambda: self._film_cache_repository.get_by_title(
+                film_title, page_size, page_number
+            ),
+            load=lambda: self._film_repository.get_by_title(
+                film_title, page_size, page_number
+            ),
+            put=lambda films: self._film_cache_repository.put_search_films_to_cache(
+                films, film_title, page_size, page_number
+            ),
         )
         if not films:
             logging.info(FILM_NOT_FOUND, 'film_title', film_title)
             return None
         return films
 
+    # Страницы по курсору не кешируются: курсор с point in time
+    # уникален для клиента, а глубокие страницы редко запрашивают повторно.
+    async def get_by_sort_after(
+            self,
+            sort: str,
+            page_size: int,
+            genre_id: UUID | None,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        films, next_cursor = await self._film_repository.get_by_sort_after(
+            sort, page_size, genre_id, cursor
+        )
+        if not films:
+            logging.info(FILM_NOT_FOUND, 'sort', sort)
+        return films, next_cursor
+
+    async def get_by_title_after(
+            self,
+            film_title: str,
+            page_size: int,
+            cursor: SearchCursor
+    ) -> tuple[list[ShortFilm], SearchCursor | None]:
+        films, next_cursor = await self._film_repository.get_by_title_after(
+            film_title, page_size, cursor
+        )
+        if not films:
+            logging.info(FILM_NOT_FOUND, 'film_title', film_title)
+        return films, next_cursor
+
 
 @lru_cache()
 def get_film_service(
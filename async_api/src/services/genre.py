@@ -1,25 +1,28 @@
 import logging
 from functools import lru_cache
 from uuid import UUID
-from typing import Protocol
+from typing import AsyncContextManager, Protocol
 
 from fastapi import Depends
 
+from core.config import settings
 from db.elastic.genre import get_genre_repository
 from core.messages import (
     TOTAL_GENRES_NOT_FOUND,
     GENRE_NOT_FOUND,
 )
+from db.redis.base import CacheEntry
 from db.redis.genre import get_genre_cache_repository
 from models.genre import Genre
+from services.cache import CacheAside
 
 
 class GenreCacheRepositoryProtocol(Protocol):
-    async def get_by_id(self, genre_id: UUID) -> Genre | None:
+    async def get_by_id(self, genre_id: UUID) -> CacheEntry[Genre] | None:
         """возвращает описание жанра  из кеш по id"""
         ...
 
-    async def get_all(self) -> list[Genre] | None:
+    async def get_all(self) -> CacheEntry[list[Genre]] | None:
         """возвращает список всех жанров"""
         ...
 
@@ -31,6 +34,18 @@ class GenreCacheRepositoryProtocol(Protocol):
         """добавить в кеш жанр"""
         ...
 
+    async def put_many(self, genres: list[Genre]) -> None:
+        """добавить в кеш несколько жанров за один запрос"""
+        ...
+
+    async def get_etag_by_id(self, genre_id: UUID) -> str | None:
+        """возвращает ETag свежей записи жанра из кеша"""
+        ...
+
+    def lock(self, name: str) -> AsyncContextManager[bool]:
+        """распределенная блокировка на время загрузки значения"""
+        ...
+
 
 class GenreRepositoryProtocol(Protocol):
     async def get_by_id(self, genre_id: UUID) -> Genre | None:
@@ -49,25 +64,41 @@ class GenreService:
             genre_repository: GenreRepositoryProtocol):
         self._genre_cache_repository = genre_cache_repository
         self._genre_repository = genre_repository
+        self._cache = CacheAside(
+            'genre',
+            lock=genre_cache_repository.lock if settings.cache_lock_enabled else None
+        )
 
     async def get_all(self) -> list[Genre] | None:
-        genres = await self._genre_cache_repository.get_all()
+        genres = await self._cache.get_or_load(
+            key='all',
+            cached=self._genre_cache_repository.get_all,
+            load=self._genre_repository.get_all_genres,
+            put=self._put_genres,
+        )
         if not genres:
-            genres = await self._genre_repository.get_all_genres()
-            if not genres:
-                logging.info(TOTAL_GENRES_NOT_FOUND)
-                return None
-            await self._genre_cache_repository.put_genres(genres)
+            logging.info(TOTAL_GENRES_NOT_FOUND)
+            return None
         return genres
 
+    async def _put_genres(self, genres: list[Genre]) -> None:
+        # Список жанров заодно заполняет кеш отдельных жанров.
+        await self._genre_cache_repository.put_genres(genres)
+        await self._genre_cache_repository.put_many(genres)
+
+    async def get_etag(self, genre_id: UUID) -> str | None:
+        return await self._genre_cache_repository.get_etag_by_id(genre_id)
+
     async def get_by_id(self, genre_id: UUID) -> Genre | None:
-        genre = await self._genre_cache_repository.get_by_id(genre_id=genre_id)
+        genre = await self._cache.get_or_load(
+            key=f'id:{genre_id}',
+            cached=lambda: self._genre_cache_repository.get_by_id(genre_id=genre_id),
+            load=lambda: self._genre_repository.get_by_id(genre_id=genre_id),
+            put=self._genre_cache_repository.put_genre,
+        )
         if not genre:
-            genre = await self._genre_repository.get_by_id(genre_id=genre_id)
-            if not genre:
-                logging.info(GENRE_NOT_FOUND, 'genre_id', genre_id)
-                return None
-            await self._genre_cache_repository.put_genre(genre)
+            logging.info(GENRE_NOT_FOUND, 'genre_id', genre_id)
+            return None
         return genre
 
 
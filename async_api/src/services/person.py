@@ -1,16 +1,19 @@
 import logging
 from functools import lru_cache
-from typing import Protocol
+from typing import AsyncContextManager, Protocol
 from uuid import UUID
 
 from fastapi import Depends
 
+from core.config import settings
 from db.elastic.person import get_person_repository
 from core.messages import (
     PERSON_NOT_FOUND,
 )
+from db.redis.base import CacheEntry, normalize_query
 from db.redis.person import get_person_cache_repository
 from models.person import Person, PersonFilm
+from services.cache import CacheAside
 
 
 class PersonRepositoryProtocol(Protocol):
@@ -28,9 +31,10 @@ class PersonRepositoryProtocol(Protocol):
         ...
 
     async def get_films_for_person(
-            self, person_id: UUID
+            self, person_id: UUID,
+            page_size: int, page_number: int
     ) -> list[PersonFilm] | None:
-        """Возвращает все фильмы в которых участвовала персона"""
+        """Возвращает фильмы в которых участвовала персона (по убыванию рейтинга)"""
         ...
 
 
@@ -38,21 +42,25 @@ class PersonCacheRepositoryProtocol(Protocol):
     async def get_by_id(
             self,
             person_id: UUID
-    ) -> Person | None:
+    ) -> CacheEntry[Person] | None:
         """Возвращает персону из кеш по id"""
         ...
 
     async def get_person_films(
             self,
-            person_id: UUID
-    ) -> list[PersonFilm] | None:
+            person_id: UUID,
+            page_size: int,
+            page_number: int
+    ) -> CacheEntry[list[PersonFilm]] | None:
         """Возвращает все фильмы в которых участвовала персона из кеш"""
         ...
 
     async def put_person_films(
             self,
             person_id: UUID,
-            person_films: list[PersonFilm] | None
+            person_films: list[PersonFilm] | None,
+            page_size: int,
+            page_number: int
     ) -> None:
         """Добавить фильмы в которых участвовала персона в кеш"""
         ...
@@ -61,6 +69,37 @@ class PersonCacheRepositoryProtocol(Protocol):
         """Добавить в кеш персону"""
         ...
 
+    async def put_many(self, persons: list[Person]) -> None:
+        """Добавить в кеш несколько персон за один запрос"""
+        ...
+
+    async def search_by_name(
+            self,
+            person_name: str,
+            page_size: int,
+            page_number: int
+    ) -> CacheEntry[list[Person]] | None:
+        """Возвращает результат поиска персон по имени из кеш"""
+        ...
+
+    async def put_search_persons(
+            self,
+            persons: list[Person],
+            person_name: str,
+            page_size: int,
+            page_number: int
+    ) -> None:
+        """Добавить результат поиска персон по имени в кеш"""
+        ...
+
+    async def get_etag_by_id(self, person_id: UUID) -> str | None:
+        """Возвращает ETag свежей записи персоны из кеша"""
+        ...
+
+    def lock(self, name: str) -> AsyncContextManager[bool]:
+        """Распределенная блокировка на время загрузки значения"""
+        ...
+
 
 class PersonService:
     def __init__(
@@ -69,45 +108,78 @@ class PersonService:
             person_repository: PersonRepositoryProtocol):
         self._person_cache_repository = person_cache_repository
         self._person_repository = person_repository
+        self._cache = CacheAside(
+            'person',
+            lock=person_cache_repository.lock if settings.cache_lock_enabled else None
+        )
+
+    async def get_etag(self, person_id: UUID) -> str | None:
+        return await self._person_cache_repository.get_etag_by_id(person_id)
 
     async def get_by_id(self, person_id: UUID) -> Person | None:
-        person = await self._person_cache_repository.get_by_id(
-            person_id
+        person = await self._cache.get_or_load(
+            key=f'id:{person_id}',
+            cached=lambda: self._person_cache_repository.get_by_id(person_id),
+            load=lambda: self._person_repository.get_by_id(person_id),
+            put=self._person_cache_repository.put_person,
         )
         if not person:
-            person = await self._person_repository.get_by_id(person_id)
-            if not person:
-                logging.info(PERSON_NOT_FOUND, 'person_id', person_id)
-                return None
-            await self._person_cache_repository.put_person(person)
+            logging.info(PERSON_NOT_FOUND, 'person_id', person_id)
+            return None
         return person
 
-    async def get_films_for_person(self, person_id) -> list[PersonFilm] | None:
-        films_for_person = await self._person_cache_repository.get_person_films(person_id)
+    async def get_films_for_person(
+            self, person_id: UUID,
+            page_size: int, page_number: int
+    ) -> list[PersonFilm] | None:
+        films_for_person = await self._cache.get_or_load(
+            key=f'films:{person_id}:{page_size}:{page_number}',
+            cached=lambda: self._person_cache_repository.get_person_films(
+                person_id, page_size, page_number
+            ),
+            load=lambda: self._person_repository.get_films_for_person(
+                person_id, page_size, page_number
+            ),
+            put=lambda films: self._person_cache_repository.put_person_films(
+                person_id, films, page_size, page_number
+            ),
+        )
         if not films_for_person:
-            films_for_person = await self._person_repository.get_films_for_person(person_id)
-            if not films_for_person:
-                logging.info(PERSON_NOT_FOUND, 'person_id', person_id)
-                return None
-            await self._person_cache_repository.put_person_films(
-                person_id, films_for_person
-            )
+            logging.info(PERSON_NOT_FOUND, 'person_id', person_id)
+            return None
         return films_for_person
 
     async def search_person(
             self, person_name: str,
             page_size: int, page_number: int
     ) -> list[Person] | None:
-        persons = await self._person_repository.search_by_name(
-            person_name,
-            page_size,
-            page_number
+        persons = await self._cache.get_or_load(
+            key=f'search:{normalize_query(person_name)}:{page_size}:{page_number}',
+            cached=lambda: self._person_cache_repository.search_by_name(
+                person_name, page_size, page_number
+            ),
+            load=lambda: self._person_repository.search_by_name(
+                person_name, page_size, page_number
+            ),
+            put=lambda persons: self._put_search_persons(
+                persons, person_name, page_size, page_number
+            ),
         )
         if not persons:
             logging.info(PERSON_NOT_FOUND, 'person_name', person_name)
             return None
         return persons
 
+    async def _put_search_persons(
+            self, persons: list[Person], person_name: str,
+            page_size: int, page_number: int
+    ) -> None:
+        # Найденные персоны заодно заполняют кеш карточек персон.
+        await self._person_cache_repository.put_search_persons(
+            persons, person_name, page_size, page_number
+        )
+        await self._person_cache_repository.put_many(persons)
+
 
 @lru_cache()
 def get_person_service(
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Awaitable, Callable, TypeVar
+
+from core.config import settings
+from db.elastic.film import get_film_repository
+from db.elastic.genre import get_genre_repository
+from db.redis.film import get_film_cache_repository
+from db.redis.genre import get_genre_cache_repository
+from services.film import FilmService, get_film_service
+from services.genre import GenreService, get_genre_service
+
+T = TypeVar('T')
+
+SORTS = ('-imdb_rating', 'imdb_rating')
+# Срок отметки для однократного прогрева (interval <= 0): за это время
+# успевают стартовать все воркеры.
+WARMUP_ONCE_CLAIM_IN_SECONDS = 60
+
+
+class CacheWarmer:
+    """Прогрев кеша самыми востребованными страницами.
+
+    Кеширует список жанров, первые pages страниц сортированного списка
+    фильмов для каждого жанра и направления сортировки и карточки
+    top_films фильмов с наибольшим рейтингом. Страницы и карточки
+    загружаются из хранилища и перезаписываются, даже если запись еще
+    свежая: иначе к следующему прогреву она успевает устареть.
+    Одновременно выполняется не больше concurrency загрузок (слот
+    освобождается только после записи в кеш), а среди воркеров
+    прогрев выполняет тот, кто первым получил отметку claim на
+    очередной интервал.
+    """
+
+    def __init__(
+            self,
+            film_service: FilmService,
+            genre_service: GenreService,
+            pages: int,
+            page_size: int,
+            top_films: int,
+            concurrency: int,
+            claim: Callable[[str, int], Awaitable[bool]]
+    ):
+        self._film_service = film_service
+        self._genre_service = genre_service
+        self._claim = claim
+        self.pages = pages
+        self.page_size = page_size
+        self.top_films = top_films
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(self) -> None:
+        genres = await self._genre_service.get_all() or []
+        await asyncio.gather(*(
+            self._limited(partial(
+                self._film_service.refresh_by_sort,
+                sort, self.page_size, page_number, genre_id
+            ))
+            for genre_id in [None, *(genre.uuid for genre in genres)]
+            for sort in SORTS
+            for page_number in range(1, self.pages + 1)
+        ))
+        top = await self._limited(partial(
+            self._film_service.refresh_by_sort,
+            '-imdb_rating', self.top_films, 1, None
+        )) or []
+        await asyncio.gather(*(
+            self._limited(partial(self._film_service.refresh_by_id, film.uuid))
+            for film in top
+        ))
+        logging.info(
+            'Cache warmed: %s genres, %s top films', len(genres), len(top)
+        )
+
+    async def run(self, interval: int) -> None:
+        """Прогревать кеш сразу и затем каждые interval секунд."""
+        claim_ttl = interval if interval > 0 else WARMUP_ONCE_CLAIM_IN_SECONDS
+        while True:
+            try:
+                # Без отметки кеш в этом интервале уже прогревает или
+                # прогрел другой воркер.
+                if await self._claim('warmup', claim_ttl):
+                    await self.warm()
+            except Exception:
+                logging.exception('Cache warmup failed')
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    async def _limited(self, refresh: Callable[[], Awaitable[T]]) -> T:
+        # Корутина создается только после захвата слота.
+        async with self._semaphore:
+            return await refresh()
+
+
+_warmup_task: asyncio.Task | None = None
+
+
+def on_startup():
+    global _warmup_task
+    if settings.cache_warmup_pages <= 0:
+        return
+    film_cache_repository = get_film_cache_repository()
+    # Те же экземпляры сервисов, что получают обработчики запросов.
+    film_service = get_film_service(
+        film_cache_repository=film_cache_repository,
+        film_repository=get_film_repository(),
+    )
+    genre_service = get_genre_service(
+        genre_cache_repository=get_genre_cache_repository(),
+        genre_repository=get_genre_repository(),
+    )
+    warmer = CacheWarmer(
+        film_service,
+        genre_service,
+        pages=settings.cache_warmup_pages,
+        page_size=settings.cache_warmup_page_size,
+        top_films=settings.cache_warmup_top_films,
+        concurrency=settings.cache_warmup_concurrency,
+        claim=film_cache_repository.claim,
+    )
+    _warmup_task = asyncio.create_task(
+        warmer.run(settings.cache_warmup_interval)
+    )
+
+
+async def on_shutdown():
+    if _warmup_task is not None:
+        _warmup_task.cancel()
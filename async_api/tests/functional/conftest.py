@@ -3,6 +3,7 @@ import aiohttp
 import pytest
 import pytest_asyncio
 from elasticsearch import AsyncElasticsearch
+from redis.asyncio import Redis
 
 from functional.settings import test_settings
 
@@ -29,6 +30,13 @@ async def es_client():
     await client.close()
 
 
+@pytest_asyncio.fixture(scope="session")
+async def redis_client():
+    client = Redis(host=test_settings.redis_host, port=test_settings.redis_port)
+    yield client
+    await client.close()
+
+
 @pytest_asyncio.fixture(scope='function')
 async def session_client():
     session = aiohttp.ClientSession()
@@ -46,3 +54,26 @@ def make_get_request(session_client: aiohttp.ClientSession):
             return body, status
 
     return inner
+
+
+@pytest.fixture(scope='function')
+def make_post_request(session_client: aiohttp.ClientSession):
+    async def inner(url: str, data: dict = None):
+        async with session_client.post(url, json=data) as response:
+            body = await response.json()
+            status = response.status
+            print(body)
+            return body, status
+
+    return inner
+
+
+@pytest.fixture(scope='function')
+def make_get_response(session_client: aiohttp.ClientSession):
+    """GET с заголовками запроса; тело отдается как есть (304, /metrics)."""
+    async def inner(url: str, params: dict = None, headers: dict = None):
+        async with session_client.get(url, params=params, headers=headers) as response:
+            body = await response.read()
+            return body, response.status, response.headers
+
+    return inner
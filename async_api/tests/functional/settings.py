@@ -11,6 +11,7 @@ class TestSettings(BaseSettings):
 
     redis_host: str = Field('localhost', env='REDIS_HOST')
     redis_port: int = Field(6379, env='REDIS_PORT')
+    search_cache_max_entries: int = Field(5, env='SEARCH_CACHE_MAX_ENTRIES')
 
     service_url: str = Field('http://127.0.0.1:8000', env='SERVICE_URL')
 
@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+from http import HTTPStatus
+
+import pytest
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+from settings import test_settings
+from functional.testdata.es_data import movies
+
+pytestmark = pytest.mark.asyncio
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+@pytest.mark.parametrize(
+    'path, query_data',
+    [
+        ('/api/v1/films/', {'sort': '-imdb_rating'}),
+        ('/api/v1/films/search', {'film_title': 'The Star'}),
+    ]
+)
+async def test_cursor_walks_all_films(make_get_response, path: str, query_data: dict):
+    # 60 фильмов по 25: последняя страница неполная и курсора не отдает.
+    url = test_settings.service_url + path
+    params = {**query_data, 'page_size': 25, 'cursor': ''}
+    film_ids = []
+    pages = 0
+    while True:
+        body, status, headers = await make_get_response(url, params)
+        assert status == HTTPStatus.OK
+        film_ids.extend(film['uuid'] for film in json.loads(body))
+        pages += 1
+        next_cursor = headers.get(NEXT_CURSOR_HEADER)
+        if not next_cursor:
+            break
+        params['cursor'] = next_cursor
+
+    assert pages == 3
+    assert len(film_ids) == len(set(film_ids)), 'страницы по курсору пересекаются'
+    assert set(film_ids) == {movie['id'] for movie in movies}
+
+
+async def test_invalid_cursor(make_get_request):
+    url = test_settings.service_url + '/api/v1/films/'
+    body, status = await make_get_request(url, {'cursor': 'garbage'})
+
+    assert status == HTTPStatus.BAD_REQUEST
@@ -78,3 +78,37 @@ async def test_get_film_by_id(make_get_request, expected_answer: dict, query_dat
 
     if status == HTTPStatus.OK:
         assert cache_body == body
+
+
+@pytest.mark.parametrize(
+    'query_data, expected_answer',
+    [
+        (
+                {'ids': [movies[0]['id'], movies[1]['id'], movies[2]['id']]},
+                {'status': HTTPStatus.OK, 'length': 3}
+        ),
+        (
+                {'ids': [movies[3]['id'], '3fa85f64-5717-4562-b3fc-2c963f66afa6']},
+                {'status': HTTPStatus.OK, 'length': 1}
+        ),
+        (
+                {'ids': []},
+                {'status': HTTPStatus.UNPROCESSABLE_ENTITY, 'length': 0}
+        )
+    ]
+)
+async def test_get_films_batch(make_post_request, query_data: dict, expected_answer: dict):
+    url = test_settings.service_url + '/api/v1/films/batch'
+    body, status = await make_post_request(url, query_data)
+    logging.info(status)
+
+    assert status == expected_answer['status']
+
+    if status == HTTPStatus.OK:
+        assert len(body) == expected_answer['length']
+        assert [film['uuid'] for film in body] == query_data['ids'][:len(body)]
+
+    cache_body, status = await make_post_request(url, query_data)
+
+    if status == HTTPStatus.OK:
+        assert cache_body == body
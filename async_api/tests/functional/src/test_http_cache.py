@@ -0,0 +1,44 @@
+import os
+import sys
+from http import HTTPStatus
+
+import pytest
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+from settings import test_settings
+from functional.testdata.es_data import genres, movies, persons
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.mark.parametrize(
+    'path, params',
+    [
+        (f'/api/v1/films/{movies[0]["id"]}', None),
+        (f'/api/v1/genres/{genres[0]["id"]}', None),
+        (f'/api/v1/persons/{persons[0]["id"]}', None),
+        ('/api/v1/films/', {'sort': '-imdb_rating', 'page_size': 10}),
+        ('/api/v1/genres/', None),
+    ]
+)
+async def test_etag_not_modified(make_get_response, path: str, params: dict):
+    url = test_settings.service_url + path
+    body, status, headers = await make_get_response(url, params)
+    assert status == HTTPStatus.OK
+    etag = headers.get('ETag')
+    cache_control = headers.get('Cache-Control')
+    assert etag, 'ответ без ETag'
+    assert cache_control.startswith('public, max-age=')
+
+    # Актуальная копия клиента: 304 без тела, но с теми же заголовками кеша.
+    body, status, headers = await make_get_response(url, params, {'If-None-Match': etag})
+    assert status == HTTPStatus.NOT_MODIFIED
+    assert body == b''
+    assert headers.get('ETag') == etag
+    assert headers.get('Cache-Control') == cache_control
+
+    body, status, _ = await make_get_response(url, params, {'If-None-Match': '"stale"'})
+    assert status == HTTPStatus.OK
+    assert body
@@ -0,0 +1,67 @@
+import os
+import re
+import sys
+from http import HTTPStatus
+
+import pytest
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+from settings import test_settings
+
+pytestmark = pytest.mark.asyncio
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][\w:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(body: bytes) -> list[tuple[str, dict, float]]:
+    """Сэмплы текстового формата Prometheus: (имя, метки, значение)."""
+    samples = []
+    for line in body.decode().splitlines():
+        match = SAMPLE.match(line)
+        if match is None:
+            continue
+        labels = dict(LABEL.findall(match['labels'] or ''))
+        samples.append((match['name'], labels, float(match['value'])))
+    return samples
+
+
+def requests_count(samples: list[tuple[str, dict, float]], route: str) -> float:
+    return sum(
+        value for name, labels, value in samples
+        if name == 'http_request_duration_seconds_count'
+        and labels.get('route') == route and labels.get('status') == '200'
+    )
+
+
+async def test_metrics_exposition(make_get_request, make_get_response):
+    url = test_settings.service_url + '/metrics'
+    # Хотя бы один запрос к elastic и к кешу.
+    _, status = await make_get_request(test_settings.service_url + '/api/v1/genres/')
+    assert status == HTTPStatus.OK
+
+    body, status, headers = await make_get_response(url)
+    assert status == HTTPStatus.OK
+    assert headers['Content-Type'].startswith('text/plain')
+    names = {name for name, _, _ in parse_metrics(body)}
+    assert 'cache_hits_total' in names or 'cache_misses_total' in names
+    assert 'elastic_request_duration_seconds_count' in names
+
+
+async def test_metrics_aggregated_across_workers(make_get_request, make_get_response):
+    # Запросы распределяются по воркерам, а /metrics любого из них
+    # должен учитывать все.
+    metrics_url = test_settings.service_url + '/metrics'
+    route = '/api/v1/genres/'
+    requests = 20
+    body, _, _ = await make_get_response(metrics_url)
+    before = requests_count(parse_metrics(body), route)
+
+    for _ in range(requests):
+        _, status = await make_get_request(test_settings.service_url + route)
+        assert status == HTTPStatus.OK
+
+    body, _, _ = await make_get_response(metrics_url)
+    assert requests_count(parse_metrics(body), route) - before == requests
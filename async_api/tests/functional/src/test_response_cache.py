@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import sys
+from http import HTTPStatus
+
+import pytest
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+from settings import test_settings
+from functional.testdata.es_data import movies
+from functional.utils.helpers import get_response_cache_key
+
+pytestmark = pytest.mark.asyncio
+
+CHANGES_STREAM = 'cache:changes'
+INVALIDATION_TIMEOUT_IN_SECONDS = 10
+
+
+async def publish_change(redis_client, make_get_response, url: str, film: dict, title: str) -> None:
+    """Сообщение ETL об изменении фильма; ждем, пока API отдаст новое название.
+
+    Кеш в памяти других воркеров очищается через pub/sub, поэтому ждем
+    по ответам API, а не только по ключу в redis.
+    """
+    await redis_client.xadd(CHANGES_STREAM, {'index': 'movies', 'ids': json.dumps([film['id']])})
+    for _ in range(INVALIDATION_TIMEOUT_IN_SECONDS * 10):
+        body, status, _ = await make_get_response(url)
+        if status == HTTPStatus.OK and json.loads(body)['title'] == title:
+            return
+        await asyncio.sleep(0.1)
+    pytest.fail('cached response is not invalidated')
+
+
+async def test_response_cache_invalidated_by_changes(
+        es_client, redis_client, make_get_response
+):
+    film = movies[10]
+    path = f'/api/v1/films/{film["id"]}'
+    url = test_settings.service_url + path
+    body, status, _ = await make_get_response(url)
+    assert status == HTTPStatus.OK
+    key = await get_response_cache_key(redis_client, path)
+    assert await redis_client.exists(key), 'response is not cached'
+
+    # Без сообщения об изменении ответ отдается из кеша.
+    await es_client.update(
+        index='movies', id=film['id'], body={'doc': {'title': 'The Moon'}}, refresh=True
+    )
+    try:
+        cached_body, status, _ = await make_get_response(url)
+        assert status == HTTPStatus.OK
+        assert cached_body == body
+
+        await publish_change(redis_client, make_get_response, url, film, 'The Moon')
+    finally:
+        await es_client.update(
+            index='movies', id=film['id'], body={'doc': {'title': film['title']}}, refresh=True
+        )
+        await publish_change(redis_client, make_get_response, url, film, film['title'])
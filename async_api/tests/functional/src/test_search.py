@@ -10,6 +10,7 @@ parent = os.path.dirname(current)
 sys.path.append(parent)
 from settings import test_settings
 from functional.testdata.es_data import movies
+from functional.utils.helpers import get_search_cache_key
 
 pytestmark = pytest.mark.asyncio
 
@@ -54,3 +55,46 @@ async def test_search_all_films(make_get_request, query_data: dict, expected_ans
             cached_body, status = await make_get_request(url, query_data)
 
             assert cached_body == body
+
+
+@pytest.mark.parametrize(
+    'query_data, same_query',
+    [
+        (
+                {'film_title': 'The Star', 'page_size': 7},
+                {'film_title': '  the   STAR ', 'page_size': 7}
+        ),
+    ]
+)
+async def test_search_cached_by_normalized_query(
+        make_get_request, redis_client, query_data: dict, same_query: dict
+):
+    url = test_settings.service_url + '/api/v1/films/search/'
+    body, status = await make_get_request(url, query_data)
+    assert status == HTTPStatus.OK
+
+    key = await get_search_cache_key(
+        redis_client, 'film', query_data['film_title'], query_data['page_size'], 1
+    )
+    assert await redis_client.exists(key), 'search result is not cached'
+
+    # Запрос в другом регистре и с лишними пробелами читается из того же ключа.
+    cached_body, status = await make_get_request(url, same_query)
+    assert status == HTTPStatus.OK
+    assert cached_body == body
+    assert await redis_client.zscore('film:search:index', key) is not None
+
+
+async def test_search_cache_evicts_oldest_results(make_get_request, redis_client):
+    url = test_settings.service_url + '/api/v1/films/search/'
+    max_entries = test_settings.search_cache_max_entries
+    keys = []
+    for page_number in range(1, max_entries + 2):
+        query_data = {'film_title': 'star', 'page_size': 5, 'page_number': page_number}
+        _, status = await make_get_request(url, query_data)
+        assert status == HTTPStatus.OK
+        keys.append(await get_search_cache_key(redis_client, 'film', 'star', 5, page_number))
+
+    assert await redis_client.zcard('film:search:index') <= max_entries
+    assert not await redis_client.exists(keys[0]), 'oldest search result is not evicted'
+    assert await redis_client.exists(keys[-1])
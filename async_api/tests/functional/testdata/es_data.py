@@ -10,7 +10,7 @@ print("жанры:", genres)
 movies = [{
     'id': str(uuid.uuid4()),
     'imdb_rating': 8.5,
-    'genre': [choice(genres)['name'] for _ in range(randint(1, 3))],
+    'genre': [choice(genres) for _ in range(randint(1, 3))],
     'title': 'The Star',
     'description': 'New World',
     'director': [
@@ -35,6 +35,14 @@ persons = [{
         {
             'id': choice(movies)['id'],
             'title': f'Film_{val}',
-            'roles': [f'Film_{val}', ]},
+            'roles': ['actor', ]},
     ],
 } for val in range(60)]
+
+# Фильмография персоны ищется по составу фильма.
+movies_by_id = {movie['id']: movie for movie in movies}
+for person in persons:
+    for film in person['films']:
+        movie = movies_by_id[film['id']]
+        movie['actors'].append({'id': person['id'], 'name': person['full_name']})
+        movie['actors_names'].append(person['full_name'])
@@ -49,7 +49,16 @@ INDEX_MOVIES = {
                 "type": "float"
             },
             "genre": {
-                "type": "keyword"
+                "type": "nested",
+                "dynamic": "strict",
+                "properties": {
+                    "id": {
+                        "type": "keyword"
+                    },
+                    "name": {
+                        "type": "keyword"
+                    }
+                }
             },
             "title": {
                 "type": "text",
@@ -1,6 +1,8 @@
+import hashlib
 import json
 import logging
 import sys
+import unicodedata
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -23,3 +25,24 @@ async def get_es_bulk_query(
             ])
 
     return bulk_query
+
+
+async def get_search_cache_key(
+        redis_client,
+        namespace: str,
+        query: str,
+        page_size: int,
+        page_number: int
+) -> str:
+    """Ключ результата поиска в кеше API (см. RedisStorage._search_key_generate)."""
+    generation = int(await redis_client.get(f'{namespace}:generation') or 0)
+    normalized = ' '.join(unicodedata.normalize('NFKC', query).casefold().split())
+    query_hash = hashlib.sha1(normalized.encode()).hexdigest()
+    return f'{namespace}:v{generation}:search:{query_hash}:{page_size}:{page_number}'
+
+
+async def get_response_cache_key(redis_client, path: str, query: str = '') -> str:
+    """Ключ готового ответа в кеше API (см. ResponseCacheRepository.response_key)."""
+    generation = int(await redis_client.get('response:generation') or 0)
+    path_hash = hashlib.sha1(f'{path}?{query}'.encode()).hexdigest()
+    return f'response:v{generation}:{path_hash}'
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модульные тесты импортируют код сервиса напрямую, без docker.
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'src')
+)
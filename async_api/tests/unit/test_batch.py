@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+import fakeredis.aioredis
+import pytest
+
+from db.redis.film import FilmCacheRepository
+from db.redis.local_cache import LocalCache
+from models.film import DetailFilm
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_film(title: str) -> DetailFilm:
+    return DetailFilm(uuid4(), title, 8.0)
+
+
+@pytest.fixture
+def redis():
+    redis = fakeredis.aioredis.FakeRedis()
+    redis.mget_calls = []
+    mget = redis.mget
+
+    async def counting_mget(keys, *args):
+        redis.mget_calls.append(list(keys))
+        return await mget(keys, *args)
+    redis.mget = counting_mget
+    return redis
+
+
+async def test_get_many_reads_all_keys_with_one_mget(redis):
+    storage = FilmCacheRepository(redis)
+    films = [make_film('Star Wars'), make_film('Alien')]
+    await storage.put_many(films)
+    missing = uuid4()
+
+    entries = await storage.get_many([films[1].uuid, missing, films[0].uuid])
+
+    assert [entry and entry.value for entry in entries] == [films[1], None, films[0]]
+    assert len(redis.mget_calls) == 1
+
+
+async def test_put_many_tags_each_film(redis):
+    storage = FilmCacheRepository(redis)
+    films = [make_film('Star Wars'), make_film('Alien')]
+    await storage.put_many(films)
+
+    assert await storage.invalidate_tags(f'movies:{films[0].uuid}') == 1
+    entries = await storage.get_many([film.uuid for film in films])
+    assert [entry and entry.value for entry in entries] == [None, films[1]]
+
+
+async def test_get_many_reads_only_missing_keys_from_redis(redis):
+    storage = FilmCacheRepository(
+        redis, local_cache=LocalCache(redis, maxsize=10, ttl=60)
+    )
+    cached, other = make_film('Star Wars'), make_film('Alien')
+    await storage.put_film(cached)
+
+    await storage.get_many([cached.uuid, other.uuid])
+
+    assert redis.mget_calls == [[storage._key_generate(other.uuid)]]
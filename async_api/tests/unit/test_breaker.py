@@ -0,0 +1,156 @@
+import time
+
+import pytest
+from elasticsearch.exceptions import ConnectionError, NotFoundError, TransportError
+
+from db.elastic.breaker import BreakerState, CircuitBreaker, CircuitOpenError, is_unavailable
+from db.redis.base import CacheEntry, _serve_expired
+from services.cache import CacheAside, served_expired
+
+
+async def ok():
+    return 'ok'
+
+
+async def down():
+    raise ConnectionError('N/A', 'down', None)
+
+
+async def not_found():
+    raise NotFoundError(404, 'not_found', {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Сдвиг time.monotonic на заданное число секунд."""
+    now = time.monotonic()
+
+    def move(seconds: float) -> None:
+        monkeypatch.setattr(time, 'monotonic', lambda: now + seconds)
+    return move
+
+
+async def fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            await breaker.call(down())
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(min_calls=4, window_size=4, open_timeout=10, half_open_calls=2)
+
+
+@pytest.mark.asyncio
+async def test_opens_after_failure_rate_and_rejects_calls():
+    breaker = make_breaker()
+    await breaker.call(ok())
+    await breaker.call(ok())
+    await fail(breaker, 2)
+
+    assert breaker.state == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok())
+
+
+@pytest.mark.asyncio
+async def test_stays_closed_below_min_calls():
+    breaker = make_breaker()
+    await fail(breaker, 3)
+
+    assert breaker.state == BreakerState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_failures():
+    breaker = make_breaker()
+    for _ in range(4):
+        with pytest.raises(NotFoundError):
+            await breaker.call(not_found())
+
+    assert breaker.state == BreakerState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_failures(clock):
+    breaker = CircuitBreaker(min_calls=1, window_size=1, slow_call=1)
+
+    async def slow():
+        clock(2)
+        return 'ok'
+
+    assert await breaker.call(slow()) == 'ok'
+    assert breaker.state == BreakerState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_successful_probes_close_breaker(clock):
+    breaker = make_breaker()
+    await fail(breaker, 4)
+    clock(11)
+
+    await breaker.call(ok())
+    assert breaker.state == BreakerState.HALF_OPEN
+    await breaker.call(ok())
+    assert breaker.state == BreakerState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_breaker(clock):
+    breaker = make_breaker()
+    await fail(breaker, 4)
+    clock(11)
+
+    await fail(breaker, 1)
+
+    assert breaker.state == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok())
+
+
+@pytest.mark.asyncio
+async def test_half_open_admits_only_probe_calls(clock):
+    breaker = make_breaker()
+    await fail(breaker, 4)
+    clock(11)
+    # Пробы еще выполняются.
+    breaker._acquire()
+    breaker._acquire()
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok())
+
+
+def test_unavailable_errors():
+    assert is_unavailable(CircuitOpenError())
+    assert is_unavailable(TransportError(503, 'unavailable', {}))
+    assert is_unavailable(TransportError(429, 'too_many_requests', {}))
+    assert not is_unavailable(NotFoundError(404, 'not_found', {}))
+    assert not is_unavailable(ValueError())
+
+
+@pytest.mark.asyncio
+async def test_unavailable_storage_falls_back_to_expired_entry():
+    async def cached():
+        # Обычное чтение жестко истекшую запись не видит.
+        return CacheEntry('last known') if _serve_expired.get() else None
+
+    async def load():
+        raise CircuitOpenError()
+
+    async def put(value):
+        pass
+
+    assert await CacheAside('film').get_or_load('1', cached, load, put) == 'last known'
+    assert served_expired.get()
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_hidden_by_fallback():
+    async def cached():
+        return CacheEntry('last known') if _serve_expired.get() else None
+
+    async def put(value):
+        pass
+
+    with pytest.raises(NotFoundError):
+        await CacheAside('film').get_or_load('1', cached, not_found, put)
@@ -0,0 +1,204 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from elasticsearch.exceptions import ConnectionTimeout
+
+from core import deadline
+from core.config import settings
+from core.metrics import CACHE_COALESCED
+from db.elastic.breaker import CircuitOpenError
+from db.redis.base import CacheEntry
+from services.cache import CacheAside, served_expired, served_stale_for
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_shared_load_gets_full_request_budget():
+    seen = []
+
+    async def cached():
+        return CacheEntry('old', is_stale=True)
+
+    async def load():
+        seen.append(deadline.remaining())
+        return 'new'
+
+    async def put(value):
+        pass
+
+    cache = CacheAside('film')
+    # Запрос, запустивший загрузку, почти исчерпал бюджет.
+    deadline.set_deadline(0.01)
+    assert await cache.get_or_load('1', cached, load, put) == 'old'
+    await asyncio.sleep(0)
+
+    left, = seen
+    assert settings.request_deadline - 0.1 < left <= settings.request_deadline
+
+
+async def test_shared_load_without_caller_deadline_is_bounded():
+    seen = []
+
+    async def load():
+        seen.append(deadline.remaining())
+
+    async def put(value):
+        pass
+
+    await CacheAside('film').refresh('1', load, put)
+
+    left, = seen
+    assert left is not None and left <= settings.request_deadline
+
+
+async def test_waiter_gives_up_on_its_deadline_but_load_continues():
+    loaded = asyncio.Event()
+
+    async def cached():
+        return None
+
+    async def load():
+        await asyncio.sleep(0.05)
+        loaded.set()
+        return 'new'
+
+    async def put(value):
+        pass
+
+    cache = CacheAside('film')
+    deadline.set_deadline(0.01)
+    with pytest.raises(ConnectionTimeout):
+        await cache.get_or_load('1', cached, load, put)
+
+    await asyncio.wait_for(loaded.wait(), 1)
+
+
+async def test_many_serves_stale_entries_and_refreshes_them_in_background():
+    refreshed = asyncio.Event()
+
+    async def cached(ids):
+        return [CacheEntry('old', is_stale=True), None]
+
+    async def load(ids):
+        if ids == ['1']:
+            await refreshed.wait()
+        return {id_: 'new' for id_ in ids}
+
+    async def put(values):
+        pass
+
+    cache = CacheAside('film')
+    assert await cache.get_many_or_load(['1', '2'], cached, load, put) == {
+        '1': 'old', '2': 'new'
+    }
+    assert served_stale_for.get() is not None
+    refreshed.set()
+
+
+async def test_many_falls_back_to_cached_and_expired_entries():
+    reads = iter([[CacheEntry('cached'), None], [CacheEntry('expired')]])
+
+    async def cached(ids):
+        return next(reads)
+
+    async def load(ids):
+        raise CircuitOpenError()
+
+    async def put(values):
+        pass
+
+    cache = CacheAside('film')
+    assert await cache.get_many_or_load(['1', '2'], cached, load, put) == {
+        '1': 'cached', '2': 'expired'
+    }
+    assert served_expired.get()
+
+
+async def test_refresh_reloads_and_waits_for_put():
+    stored = []
+
+    async def load():
+        return 'new'
+
+    async def put(value):
+        await asyncio.sleep(0.01)
+        stored.append(value)
+
+    cache = CacheAside('film')
+    assert await cache.refresh('1', load, put) == 'new'
+    assert stored == ['new']
+
+
+async def test_concurrent_misses_load_once():
+    loads = []
+
+    async def cached():
+        return None
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return 'new'
+
+    async def put(value):
+        pass
+
+    cache = CacheAside('film')
+    coalesced = CACHE_COALESCED.labels('film')._value.get()
+    results = await asyncio.gather(*(
+        cache.get_or_load('1', cached, load, put) for _ in range(5)
+    ))
+
+    assert results == ['new'] * 5
+    assert loads == [1]
+    assert CACHE_COALESCED.labels('film')._value.get() - coalesced == 4
+
+
+async def test_different_keys_are_not_coalesced():
+    loads = []
+
+    async def cached():
+        return None
+
+    def load(key):
+        async def load():
+            loads.append(key)
+            return key
+        return load
+
+    async def put(value):
+        pass
+
+    cache = CacheAside('film')
+    assert await asyncio.gather(
+        cache.get_or_load('1', cached, load('1'), put),
+        cache.get_or_load('2', cached, load('2'), put),
+    ) == ['1', '2']
+    assert sorted(loads) == ['1', '2']
+
+
+async def test_load_under_lock_rereads_cache():
+    loads = []
+
+    async def cached():
+        # Пока ждали блокировку, запись обновил другой воркер.
+        return None if not locked else CacheEntry('from other worker')
+
+    async def load():
+        loads.append(1)
+        return 'new'
+
+    async def put(value):
+        pass
+
+    @asynccontextmanager
+    async def lock(key):
+        nonlocal locked
+        locked = True
+        yield True
+
+    locked = False
+    cache = CacheAside('film', lock=lock)
+    assert await cache.get_or_load('1', cached, load, put) == 'from other worker'
+    assert loads == []
@@ -0,0 +1,42 @@
+import fakeredis.aioredis
+import pytest
+
+from db.redis import changes
+from db.redis.base import RedisStorage
+from db.redis.changes import ChangesConsumer
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.aioredis.FakeRedis()
+
+
+async def test_messages_of_dead_consumer_are_claimed(redis, monkeypatch):
+    monkeypatch.setattr(changes, 'CLAIM_IDLE_IN_MILLISECONDS', 0)
+    storage = RedisStorage(redis)
+    await storage._set('film:1', 'value', tags=['movies:1'])
+    consumer = ChangesConsumer(storage, stream='changes')
+    await consumer._create_group()
+    await redis.xadd('changes', {'index': 'movies', 'ids': '["1"]'})
+    # Воркер получил сообщение и завершился, не подтвердив его.
+    await redis.xreadgroup('async_api', 'dead', {'changes': '>'})
+
+    await consumer._claim_pending()
+
+    assert (await redis.xpending('changes', 'async_api'))['pending'] == 0
+    assert await storage._get('film:1') is None
+
+
+async def test_malformed_message_is_acked(redis):
+    consumer = ChangesConsumer(RedisStorage(redis), stream='changes')
+    await consumer._create_group()
+    await redis.xadd('changes', {'index': 'movies'})
+    [(_, messages)] = await redis.xreadgroup(
+        'async_api', consumer.consumer, {'changes': '>'}
+    )
+
+    await consumer._process(messages)
+
+    assert (await redis.xpending('changes', 'async_api'))['pending'] == 0
@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from db.redis import codecs
+from db.redis.codecs import CODECS, get_codec
+from models.film import Actor, DetailFilm, Director, ShortFilm
+from models.genre import Genre
+from models.person import Person, PersonRoleInFilm
+
+FILM = DetailFilm(
+    uuid4(), 'Star Wars', 8.6, 'A long time ago',
+    actors=(Actor(uuid4(), 'Mark Hamill'),),
+    writers=(),
+    directors=(Director(uuid4(), 'George Lucas'),),
+    genre=(Genre(uuid4(), 'Sci-Fi'),),
+)
+
+
+@pytest.fixture(params=list(CODECS))
+def codec(request):
+    return get_codec(request.param)
+
+
+def test_model_round_trip(codec):
+    assert codec.decode(codec.encode(FILM), DetailFilm) == FILM
+
+
+def test_list_round_trip(codec):
+    films = [ShortFilm(uuid4(), 'Star Wars', 8.6), ShortFilm(uuid4(), 'Alien', 8.5)]
+
+    assert codec.decode_many(codec.encode(films), ShortFilm) == films
+
+
+def test_nested_tuples_round_trip(codec):
+    person = Person(uuid4(), 'George Lucas', (PersonRoleInFilm(uuid4(), ('director', 'writer')),))
+
+    assert codec.decode(codec.encode(person), Person) == person
+
+
+def test_orjson_value_is_response_json():
+    value = get_codec('orjson').encode(FILM)
+
+    assert orjson.loads(value)['uuid'] == str(FILM.uuid)
+    assert orjson.loads(value)['genre'] == [{'uuid': str(FILM.genre[0].uuid), 'name': 'Sci-Fi'}]
+
+
+def test_msgpack_codec_requires_package(monkeypatch):
+    monkeypatch.setattr(codecs, 'msgpack', None)
+
+    with pytest.raises(RuntimeError):
+        get_codec('msgpack')
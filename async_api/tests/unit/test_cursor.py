@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+from elasticsearch.exceptions import NotFoundError
+from fastapi import Request, Response
+
+from api.v1.utils import NEXT_CURSOR_HEADER, conditional_response
+from db.elastic.base import BaseElasticStorage, InvalidCursorError, SearchCursor
+from db.redis.base import make_etag
+
+
+class ExpiredPitElastic:
+    async def search(self, **kwargs):
+        raise NotFoundError(404, 'search_phase_execution_exception', {})
+
+
+@pytest.mark.asyncio
+async def test_expired_cursor_is_not_an_empty_page():
+    storage = BaseElasticStorage(ExpiredPitElastic(), use_pit=True)
+
+    with pytest.raises(InvalidCursorError):
+        await storage._search_after('movies', {}, 10, SearchCursor([8.5, 'id'], 'pit'))
+
+
+@pytest.mark.asyncio
+async def test_first_page_of_missing_index_is_empty():
+    storage = BaseElasticStorage(ExpiredPitElastic())
+
+    assert await storage._search_after('movies', {}, 10, SearchCursor()) == ([], None)
+
+
+def test_not_modified_cursor_page_keeps_next_cursor():
+    request = Request({
+        'type': 'http', 'method': 'GET', 'path': '/api/v1/films/',
+        'headers': [(b'if-none-match', make_etag(b'[]').encode())],
+    })
+    response = Response(b'[]')
+    response.headers[NEXT_CURSOR_HEADER] = 'next'
+
+    not_modified = conditional_response(request, response, 'public, max-age=60')
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.headers[NEXT_CURSOR_HEADER] == 'next'
@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+import time
+from uuid import uuid4
+
+import pytest
+
+from core import deadline
+from db.dataloader import DataLoader
+from db.elastic.base import BaseElasticStorage
+
+pytestmark = pytest.mark.asyncio
+
+
+class RecordingLoad:
+    """batch_load, который запоминает пакеты и дедлайн каждого."""
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.batches = []
+        self.deadlines = []
+
+    async def __call__(self, keys):
+        self.batches.append(keys)
+        self.deadlines.append(deadline.current())
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return [f'value {key}' for key in keys]
+
+
+async def test_loads_in_one_loop_pass_share_a_batch():
+    batch_load = RecordingLoad()
+    loader = DataLoader(batch_load, name='test')
+
+    values = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1)))
+
+    assert values == ['value 1', 'value 2', 'value 1']
+    assert batch_load.batches == [[1, 2]]
+
+
+async def test_window_batches_loads_across_passes():
+    batch_load = RecordingLoad()
+    loader = DataLoader(batch_load, name='test', window=0.05)
+
+    async def late_load():
+        await asyncio.sleep(0.01)
+        return await loader.load(2)
+
+    await asyncio.gather(loader.load(1), late_load())
+
+    assert batch_load.batches == [[1, 2]]
+
+
+async def test_batch_is_flushed_at_max_size():
+    batch_load = RecordingLoad()
+    loader = DataLoader(batch_load, name='test', max_batch_size=2)
+
+    await asyncio.gather(*(loader.load(key) for key in range(3)))
+
+    assert batch_load.batches == [[0, 1], [2]]
+
+
+async def test_batch_error_is_raised_for_every_caller():
+    loader = DataLoader(RecordingLoad(ValueError('down')), name='test')
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_cancelled_caller_does_not_cancel_shared_key():
+    loader = DataLoader(RecordingLoad(), name='test')
+    cancelled = asyncio.create_task(loader.load(1))
+    waiting = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+
+    assert await waiting == 'value 1'
+
+
+async def test_batch_runs_with_latest_caller_deadline():
+    batch_load = RecordingLoad()
+    loader = DataLoader(batch_load, name='test')
+
+    def load_with_deadline(key, seconds):
+        # Каждый вызывающий - отдельный запрос со своим дедлайном.
+        context = contextvars.copy_context()
+        context.run(deadline.set_deadline, seconds)
+        return context.run(asyncio.create_task, loader.load(key))
+
+    await asyncio.gather(load_with_deadline(1, 1), load_with_deadline(2, 5))
+
+    batch_deadline, = batch_load.deadlines
+    assert batch_deadline - time.monotonic() > 4
+
+
+async def test_storage_gets_are_batched_into_mget():
+    class MgetElastic:
+        def __init__(self):
+            self.requests = []
+
+        async def mget(self, index, body, _source_includes):
+            self.requests.append(body['ids'])
+            return {'docs': [{'found': True, '_source': {'id': id_}} for id_ in body['ids']]}
+
+    elastic = MgetElastic()
+    storage = BaseElasticStorage(elastic, batch_gets=True)
+    ids = [uuid4(), uuid4()]
+
+    docs = await asyncio.gather(*(storage._get_source('movies', id_, ['id']) for id_ in ids))
+
+    assert docs == [{'id': str(id_)} for id_ in ids]
+    assert elastic.requests == [[str(id_) for id_ in ids]]
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from elasticsearch import AsyncTransport
+from elasticsearch.exceptions import ConnectionTimeout
+from fastapi import Request
+
+from api.v1.utils import request_deadline
+from core import deadline
+from core.config import settings
+from db.elastic.transport import ServiceTransport
+from db.redis.connection import DeadlineConnection
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Транспорт elastic, который запоминает параметры запросов."""
+    sent = []
+
+    async def perform_request(self, method, url, headers=None, params=None, body=None):
+        sent.append((url, params))
+        return {}
+    monkeypatch.setattr(AsyncTransport, 'perform_request', perform_request)
+    transport = ServiceTransport([{'host': 'localhost'}])
+    transport.sent = sent
+    return transport
+
+
+def test_timeout_is_remaining_time_bounded_by_default():
+    with deadline.scope(time.monotonic() + 10):
+        assert 9 < deadline.timeout() <= 10
+        assert deadline.timeout(1) == 1
+    with deadline.scope(time.monotonic() - 1):
+        # Нулевой таймаут означал бы "без таймаута".
+        assert deadline.timeout() == deadline.MIN_TIMEOUT_IN_SECONDS
+    assert deadline.timeout(1) == 1
+
+
+def test_latest_deadline_is_none_if_any_caller_has_none():
+    assert deadline.latest([1.0, 3.0, 2.0]) == 3.0
+    assert deadline.latest([1.0, None]) is None
+
+
+def test_redis_socket_timeout_follows_deadline():
+    connection = DeadlineConnection(socket_timeout=5)
+
+    assert connection.socket_timeout == 5
+    with deadline.scope(time.monotonic() + 0.5):
+        assert 0 < connection.socket_timeout <= 0.5
+
+
+@pytest.mark.asyncio
+async def test_search_gets_request_and_shard_timeouts(transport):
+    with deadline.scope(time.monotonic() + 0.5):
+        await transport.perform_request('POST', '/movies/_search')
+
+    (_, params), = transport.sent
+    assert 0 < params['request_timeout'] <= 0.5
+    assert 0 < int(params['timeout'].removesuffix('ms')) <= 500
+
+
+@pytest.mark.asyncio
+async def test_spent_deadline_is_not_sent(transport):
+    with deadline.scope(time.monotonic() - 1):
+        with pytest.raises(ConnectionTimeout):
+            await transport.perform_request('GET', '/movies/_doc/1')
+
+    assert transport.sent == []
+
+
+@pytest.mark.asyncio
+async def test_route_deadline_overrides_request_deadline(monkeypatch):
+    async def film_details():
+        pass
+    monkeypatch.setattr(settings, 'route_deadlines', {'film_details': 0.5})
+    request = Request({'type': 'http', 'endpoint': film_details})
+
+    with deadline.scope(None):
+        await request_deadline(request)
+        assert 0 < deadline.remaining() <= 0.5
@@ -0,0 +1,99 @@
+from uuid import UUID, uuid4
+
+import pytest
+
+from db.elastic.film import (
+    DETAIL_FILM_FIELDS,
+    SHORT_FILM_FIELDS,
+    FilmElasticRepository,
+)
+from db.elastic.person import PERSON_FIELDS, PERSON_ROLES, PersonElasticRepository
+from models.genre import Genre
+from models.person import PersonFilm
+
+pytestmark = pytest.mark.asyncio
+
+GENRE = {'id': str(uuid4()), 'name': 'Sci-Fi'}
+MOVIE = {
+    'id': str(uuid4()), 'title': 'Star Wars', 'imdb_rating': 8.6,
+    'description': 'A long time ago', 'genre': [GENRE],
+    'director': [], 'actors': [], 'writers': [],
+}
+PERSON = {'id': str(uuid4()), 'full_name': 'George Lucas', 'films': []}
+
+
+class RecordingElastic:
+    """Elastic, который запоминает запросы и отвечает документом doc."""
+
+    def __init__(self, doc: dict = MOVIE):
+        self.doc = doc
+        self.requests = []
+
+    async def search(self, **kwargs):
+        self.requests.append(kwargs)
+        return {'hits': {'hits': [{'_source': self.doc, 'sort': [8.6, self.doc['id']]}]}}
+
+    async def get(self, index, doc_id, **kwargs):
+        self.requests.append({'index': index, **kwargs})
+        return {'_source': self.doc}
+
+
+async def test_genre_filter_is_nested_query_by_id():
+    elastic = RecordingElastic()
+    genre_id = uuid4()
+
+    await FilmElasticRepository(elastic).get_by_sort('-imdb_rating', 10, 1, genre_id)
+
+    query = elastic.requests[0]['body']['query']
+    assert query == {'nested': {
+        'path': 'genre', 'query': {'term': {'genre.id': str(genre_id)}}
+    }}
+
+
+async def test_film_genres_are_read_from_document():
+    film = await FilmElasticRepository(RecordingElastic()).get_by_id(uuid4())
+
+    assert film.genre == (Genre(UUID(GENRE['id']), 'Sci-Fi'),)
+
+
+async def test_list_queries_request_only_short_film_fields():
+    elastic = RecordingElastic()
+    films = FilmElasticRepository(elastic)
+
+    await films.get_by_sort('-imdb_rating', 10, 1, None)
+    await films.get_by_title('star', 10, 1)
+
+    assert [request['body']['_source'] for request in elastic.requests] == [
+        SHORT_FILM_FIELDS, SHORT_FILM_FIELDS
+    ]
+
+
+async def test_film_card_requests_only_detail_fields():
+    elastic = RecordingElastic()
+
+    await FilmElasticRepository(elastic).get_by_id(uuid4())
+
+    assert elastic.requests[0]['_source_includes'] == DETAIL_FILM_FIELDS
+
+
+async def test_person_search_requests_only_person_fields():
+    elastic = RecordingElastic(PERSON)
+
+    await PersonElasticRepository(elastic).search_by_name('lucas', 10, 1)
+
+    assert elastic.requests[0]['body']['_source'] == PERSON_FIELDS
+
+
+async def test_filmography_is_one_nested_search_on_movies():
+    elastic = RecordingElastic()
+    person_id = uuid4()
+
+    films = await PersonElasticRepository(elastic).get_films_for_person(person_id, 10, 1)
+
+    assert films == [PersonFilm(UUID(MOVIE['id']), 'Star Wars', 8.6)]
+    request, = elastic.requests
+    assert request['index'] == 'movies'
+    assert request['body']['query']['bool']['should'] == [
+        {'nested': {'path': role, 'query': {'term': {f'{role}.id': str(person_id)}}}}
+        for role in PERSON_ROLES
+    ]
@@ -0,0 +1,37 @@
+from uuid import uuid4
+
+import fakeredis.aioredis
+import pytest
+
+from api.v1.utils import json_response
+from db.redis.base import make_etag
+from db.redis.codecs import MsgpackCodec
+from db.redis.film import FilmCacheRepository
+from models.film import DetailFilm
+from models.genre import Genre
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_film() -> DetailFilm:
+    return DetailFilm(
+        uuid=uuid4(), title='Star Wars', imdb_rating=8.6, description='',
+        actors=(), writers=(), directors=(), genre=(Genre(uuid=uuid4(), name='Sci-Fi'),),
+    )
+
+
+async def test_cached_entry_etag_matches_response_etag():
+    storage = FilmCacheRepository(fakeredis.aioredis.FakeRedis())
+    film = make_film()
+    await storage.put_film(film)
+
+    # 304 без загрузки модели возможен, только если ETag совпадает с ответом.
+    assert await storage.get_etag_by_id(film.uuid) == make_etag(json_response(film).body)
+
+
+async def test_no_cached_etag_for_binary_codec():
+    storage = FilmCacheRepository(fakeredis.aioredis.FakeRedis(), codec=MsgpackCodec())
+    film = make_film()
+    await storage.put_film(film)
+
+    assert await storage.get_etag_by_id(film.uuid) is None
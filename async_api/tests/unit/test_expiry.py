@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from db.redis.base import CacheEntry, RedisStorage, serving_expired
+from services.cache import CacheAside, served_stale_for
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def storage():
+    return RedisStorage(
+        fakeredis.aioredis.FakeRedis(), ttl=10, stale_ttl=5, fallback_ttl=100
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Сдвиг time.time на заданное число секунд."""
+    now = time.time()
+
+    def move(seconds: float) -> None:
+        monkeypatch.setattr(time, 'time', lambda: now + seconds)
+    return move
+
+
+async def test_entry_is_stale_after_soft_expiry(storage, clock):
+    await storage._set('film:1', 'value')
+    assert not (await storage._get('film:1')).is_stale
+
+    clock(11)
+    entry = await storage._get('film:1')
+    assert entry.is_stale
+    assert entry.value == b'value'
+
+
+async def test_entry_is_kept_in_redis_until_fallback_expiry(storage):
+    await storage._set('film:1', 'value')
+
+    assert await storage.redis.ttl('film:1') == 10 + 5 + 100
+
+
+async def test_hard_expired_entry_is_served_only_as_fallback(storage, clock):
+    await storage._set('film:1', 'value')
+    clock(16)
+
+    assert await storage._get('film:1') is None
+    with serving_expired():
+        entry = await storage._get('film:1')
+    assert entry.is_stale
+    assert entry.value == b'value'
+
+
+async def test_stale_entry_is_served_and_refreshed_in_background():
+    refreshed = asyncio.Event()
+
+    async def cached():
+        return CacheEntry('old', is_stale=True, expires_at=time.time() - 3)
+
+    async def load():
+        return 'new'
+
+    async def put(value):
+        refreshed.set()
+
+    cache = CacheAside('film')
+    assert await cache.get_or_load('1', cached, load, put) == 'old'
+    assert served_stale_for.get() >= 3
+
+    await asyncio.wait_for(refreshed.wait(), 1)
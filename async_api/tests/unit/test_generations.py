@@ -0,0 +1,26 @@
+import fakeredis.aioredis
+import pytest
+
+from db.redis.base import RedisStorage
+from db.redis.generations import GenerationWatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+class FilmStorage(RedisStorage):
+    namespace = 'film'
+
+
+async def test_bump_hides_old_keys_in_all_workers():
+    redis = fakeredis.aioredis.FakeRedis()
+    writer, reader = FilmStorage(redis), FilmStorage(redis)
+    await writer._set(writer._key_generate('1'), 'value')
+    assert (await reader._get(reader._key_generate('1'))).value == b'value'
+
+    await writer.bump_generation()
+    # Так же поколение меняет ETL при пересоздании индекса.
+    await redis.incr('film:generation')
+    await GenerationWatcher(redis, [reader]).refresh()
+
+    assert reader.generation == 2
+    assert await reader._get(reader._key_generate('1')) is None
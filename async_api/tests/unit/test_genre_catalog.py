@@ -0,0 +1,64 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+
+from db.elastic import genre_catalog
+from db.elastic.genre_catalog import GenreCatalog
+
+pytestmark = pytest.mark.asyncio
+
+
+class GenresElastic:
+    """Индекс genres, в котором считаются поиски."""
+
+    def __init__(self, *genres: dict):
+        self.genres = list(genres)
+        self.searches = 0
+
+    async def search(self, index, body, size):
+        self.searches += 1
+        await asyncio.sleep(0)
+        return {'hits': {'hits': [{'_source': genre} for genre in self.genres]}}
+
+
+def make_genre(name: str) -> dict:
+    return {'id': str(uuid4()), 'name': name}
+
+
+async def test_lookups_are_served_from_memory():
+    drama = make_genre('Drama')
+    elastic = GenresElastic(drama, make_genre('Comedy'))
+    catalog = GenreCatalog(elastic)
+    await catalog.refresh()
+
+    for _ in range(3):
+        assert (await catalog.get_by_id(drama['id'])).name == 'Drama'
+    assert len(await catalog.all()) == 2
+    assert elastic.searches == 1
+
+
+async def test_unknown_genre_rereads_catalog_at_most_once_per_interval(monkeypatch):
+    elastic = GenresElastic()
+    catalog = GenreCatalog(elastic)
+    await catalog.refresh()
+    now = time.monotonic()
+    monkeypatch.setattr(
+        time, 'monotonic', lambda: now + genre_catalog.MISS_REFRESH_INTERVAL_IN_SECONDS + 1
+    )
+    horror = make_genre('Horror')
+    elastic.genres.append(horror)
+
+    assert (await catalog.get_by_id(horror['id'])).name == 'Horror'
+    assert await catalog.get_by_id(uuid4()) is None
+    assert elastic.searches == 2
+
+
+async def test_concurrent_misses_share_one_refresh():
+    elastic = GenresElastic(make_genre('Drama'))
+    catalog = GenreCatalog(elastic)
+
+    await asyncio.gather(*(catalog.get_by_id(uuid4()) for _ in range(5)))
+
+    assert elastic.searches == 1
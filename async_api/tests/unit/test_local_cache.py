@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from db.redis.base import RedisStorage
+from db.redis.local_cache import LocalCache
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_worker(server) -> LocalCache:
+    """Кеш в памяти одного воркера; redis у воркеров общий."""
+    return LocalCache(
+        fakeredis.aioredis.FakeRedis(server=server), maxsize=10, ttl=60
+    )
+
+
+async def listening(cache: LocalCache) -> asyncio.Task:
+    task = asyncio.create_task(cache.listen())
+    for _ in range(100):
+        if (await cache.redis.pubsub_numsub(cache.channel))[0][1]:
+            return task
+        await asyncio.sleep(0.01)
+    task.cancel()
+    pytest.fail('invalidation channel is not subscribed')
+
+
+async def eventually(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail('condition is not met')
+
+
+def test_least_recently_used_entry_is_evicted(server):
+    cache = LocalCache(fakeredis.aioredis.FakeRedis(server=server), maxsize=2, ttl=60)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+
+    assert cache.get('a') == b'1'
+    assert cache.get('b') is None
+    assert cache.get('c') == b'3'
+
+
+def test_entry_expires_after_ttl(server, monkeypatch):
+    cache = make_worker(server)
+    cache.set('a', b'1')
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+
+    assert cache.get('a') is None
+
+
+@pytest.mark.asyncio
+async def test_write_in_one_worker_invalidates_others(server):
+    writer, reader = make_worker(server), make_worker(server)
+    tasks = [await listening(writer), await listening(reader)]
+    try:
+        storage = RedisStorage(writer.redis, local_cache=writer)
+        reader.set('film:1', b'old')
+        await storage._set('film:1', 'new')
+
+        await eventually(lambda: reader.get('film:1') is None)
+        # Свое сообщение воркер пропускает: запись только что обновлена.
+        assert writer.get('film:1') is not None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_read_is_served_from_memory(server):
+    cache = make_worker(server)
+    storage = RedisStorage(cache.redis, local_cache=cache)
+    await storage._set('film:1', 'value')
+    # Запись в redis не видна, пока не пришло сообщение об изменении.
+    await cache.redis.delete('film:1')
+
+    entry = await storage._get('film:1')
+    assert entry.value == b'value'
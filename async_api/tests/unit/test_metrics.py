@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+# Режим multiprocess prometheus_client выбирается при импорте,
+# поэтому метрики воркера проверяются в отдельном процессе.
+WORKER_EXITS_WITH_OPEN_BREAKER = '''
+import os
+from prometheus_client import multiprocess
+from core.metrics import ELASTIC_BREAKER_STATE, render
+
+ELASTIC_BREAKER_STATE.set(2)
+multiprocess.mark_process_dead(os.getpid())
+body, _ = render()
+print(body.decode())
+'''
+
+
+def test_dead_worker_breaker_state_is_dropped(tmp_path):
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'src')
+    result = subprocess.run(
+        [sys.executable, '-c', WORKER_EXITS_WITH_OPEN_BREAKER],
+        env={**os.environ, 'PYTHONPATH': src, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)},
+        capture_output=True, text=True, check=True,
+    )
+
+    samples = [
+        line for line in result.stdout.splitlines()
+        if line.startswith('elastic_breaker_state')
+    ]
+    assert samples == []
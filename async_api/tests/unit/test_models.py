@@ -0,0 +1,50 @@
+import dataclasses
+from uuid import uuid4
+
+import pytest
+
+from models.film import Actor, DetailFilm, ShortFilm
+from models.genre import Genre
+from models.person import Person
+
+INSTANCES = [
+    Actor(uuid4(), 'Mark Hamill'),
+    ShortFilm(uuid4(), 'Star Wars', 8.6),
+    DetailFilm(uuid4(), 'Star Wars', 8.6),
+    Genre(uuid4(), 'Sci-Fi'),
+    Person(uuid4(), 'George Lucas'),
+]
+
+
+@pytest.mark.parametrize('instance', INSTANCES)
+def test_model_has_no_instance_dict(instance):
+    assert not hasattr(instance, '__dict__')
+
+
+def test_model_is_frozen():
+    film = ShortFilm(uuid4(), 'Star Wars', 8.6)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        film.title = 'Alien'
+
+
+def test_from_dict_builds_tuples():
+    data = {
+        'uuid': str(uuid4()), 'title': 'Star Wars', 'imdb_rating': 8.6,
+        'actors': [{'uuid': str(uuid4()), 'full_name': 'Mark Hamill'}],
+        'genre': [{'uuid': str(uuid4()), 'name': 'Sci-Fi'}],
+    }
+    film = DetailFilm.from_dict(data)
+
+    assert isinstance(film.actors, tuple)
+    assert film.actors[0].full_name == 'Mark Hamill'
+    assert film.writers is None
+    # Модель неизменяема целиком, поэтому ее можно хешировать и разделять.
+    assert hash(film) == hash(DetailFilm.from_dict(data))
+
+
+def test_to_dict_keeps_nested_models():
+    genre = Genre(uuid4(), 'Sci-Fi')
+    film = DetailFilm(uuid4(), 'Star Wars', 8.6, genre=(genre,))
+
+    assert film.to_dict()['genre'] == (genre,)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from elasticsearch.exceptions import ConnectionError, NotFoundError
+
+from core import deadline
+from db.elastic.base import BaseElasticStorage
+from db.elastic.msearch import MSearchBatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+class MSearchElastic:
+    """Elastic, который отвечает на каждый поиск _msearch его индексом."""
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.bodies = []
+
+    async def msearch(self, body):
+        self.bodies.append(body)
+        if self.error is not None:
+            raise self.error
+        responses = []
+        for header, query in zip(body[::2], body[1::2]):
+            if header['index'] == 'missing':
+                responses.append({'status': 404, 'error': {'type': 'index_not_found_exception'}})
+            else:
+                responses.append({'hits': {'hits': [{'_index': header['index'], 'query': query}]}})
+        return {'responses': responses}
+
+
+async def test_concurrent_searches_share_one_msearch():
+    elastic = MSearchElastic()
+    batcher = MSearchBatcher(elastic)
+
+    movies, persons = await asyncio.gather(
+        batcher.search('movies', {'query': {'match_all': {}}}),
+        batcher.search('persons', {'query': {'match_all': {}}}),
+    )
+
+    assert len(elastic.bodies) == 1
+    assert movies['hits']['hits'][0]['_index'] == 'movies'
+    assert persons['hits']['hits'][0]['_index'] == 'persons'
+
+
+async def test_failed_search_raises_only_for_its_caller():
+    batcher = MSearchBatcher(MSearchElastic())
+
+    movies, missing = await asyncio.gather(
+        batcher.search('movies', {}), batcher.search('missing', {}),
+        return_exceptions=True,
+    )
+
+    assert movies['hits']['hits']
+    assert isinstance(missing, NotFoundError)
+
+
+async def test_transport_error_is_raised_for_every_caller():
+    batcher = MSearchBatcher(MSearchElastic(ConnectionError('N/A', 'down', None)))
+
+    results = await asyncio.gather(
+        batcher.search('movies', {}), batcher.search('persons', {}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_batch_is_split_by_max_size():
+    elastic = MSearchElastic()
+    batcher = MSearchBatcher(elastic, max_batch_size=2)
+
+    await asyncio.gather(*(batcher.search('movies', {}) for _ in range(3)))
+
+    assert [len(body) // 2 for body in elastic.bodies] == [2, 1]
+
+
+async def test_each_search_gets_timeout_from_its_deadline():
+    elastic = MSearchElastic()
+    batcher = MSearchBatcher(elastic)
+    deadline.set_deadline(0.5)
+
+    response = await batcher.search('movies', {})
+
+    timeout = response['hits']['hits'][0]['query']['timeout']
+    assert 0 < int(timeout.removesuffix('ms')) <= 500
+
+
+async def test_storage_search_goes_through_batcher():
+    elastic = MSearchElastic()
+    storage = BaseElasticStorage(elastic, batcher=MSearchBatcher(elastic))
+
+    hits = await storage._search('movies', {'query': {'match_all': {}}}, 3, 10)
+    missing = await storage._search('missing', {'query': {'match_all': {}}}, 1, 10)
+
+    assert hits[0]['query'] == {'query': {'match_all': {}}, 'size': 10, 'from': 20}
+    assert missing == []
@@ -0,0 +1,44 @@
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from api.v1.response_models import Film, FilmSearch, ResponsePerson
+from api.v1.utils import json_response
+from models.film import DetailFilm, ShortFilm
+from models.person import Person
+
+
+def person_source() -> dict:
+    return {'id': str(uuid4()), 'name': 'George Lucas'}
+
+
+MOVIE = {
+    'id': str(uuid4()), 'title': 'Star Wars', 'imdb_rating': 8.6,
+    'description': 'A long time ago',
+    'genre': [{'id': str(uuid4()), 'name': 'Sci-Fi'}],
+    'director': [person_source()], 'actors': [person_source()], 'writers': [],
+    # Поле для поиска, в ответ не попадает.
+    'actors_names': ['Mark Hamill'],
+}
+PERSON = {
+    'id': str(uuid4()), 'full_name': 'George Lucas',
+    'films': [{'id': str(uuid4()), 'roles': ['director', 'writer']}],
+}
+
+
+@pytest.mark.parametrize('model, response_model, source', [
+    (DetailFilm, Film, MOVIE),
+    (ShortFilm, FilmSearch, MOVIE),
+    (Person, ResponsePerson, PERSON),
+])
+def test_body_matches_response_model(model, response_model, source):
+    body = json_response(model.from_source(source)).body
+
+    # Тело без пропущенных и лишних полей, как после response_model.
+    assert orjson.loads(body) == orjson.loads(response_model.parse_raw(body).json())
+
+
+def test_invalid_source_is_rejected_on_input():
+    with pytest.raises(ValueError):
+        ShortFilm.from_source({**MOVIE, 'imdb_rating': 'n/a'})
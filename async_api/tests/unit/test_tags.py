@@ -0,0 +1,59 @@
+import time
+from uuid import uuid4
+
+import fakeredis.aioredis
+import pytest
+
+from db.redis.base import RedisStorage, make_tags
+from db.redis.person import PersonCacheRepository
+from models.person import PersonFilm
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.aioredis.FakeRedis()
+
+
+async def test_invalidate_deletes_tagged_keys(redis):
+    storage = RedisStorage(redis)
+    await storage._set('film:1', 'value', tags=['movies', 'movies:1'])
+    await storage._set('film:2', 'value', tags=['movies:2'])
+
+    assert await storage.invalidate_tags('movies:1') == 1
+    assert await storage._get('film:1') is None
+    assert await storage._get('film:2') is not None
+    assert not await redis.exists(storage._tag_key('movies:1'))
+
+
+async def test_expired_keys_are_trimmed_from_tags_on_write(redis, monkeypatch):
+    storage = RedisStorage(redis, ttl=10)
+    await storage._set('film:1', 'value', tags=['movies'])
+    # Через срок хранения первой записи пишется следующая.
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    await storage._set('film:2', 'value', tags=['movies'])
+
+    assert await redis.zrange(storage._tag_key('movies'), 0, -1) == [b'film:2']
+
+
+async def test_evicted_search_results_leave_the_search_tag(redis):
+    storage = RedisStorage(redis, search_max_entries=2)
+    for i in range(3):
+        await storage._set_search(f'search:{i}', 'value', tags=['movies'])
+
+    assert await redis.zrange(storage._tag_key('movies'), 0, -1) == [
+        b'search:1', b'search:2'
+    ]
+
+
+async def test_new_film_invalidates_person_filmography(redis):
+    storage = PersonCacheRepository(redis)
+    person_id = uuid4()
+    await storage.put_person_films(person_id, [PersonFilm(uuid4(), 'Film', 8.5)], 10, 1)
+
+    # Так ChangesConsumer обрабатывает сообщение ETL о новом фильме.
+    await storage.invalidate_tags('movies', *make_tags('movies', uuid4()))
+
+    assert await storage.get_person_films(person_id, 10, 1) is None
@@ -0,0 +1,94 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from db.redis.base import RedisStorage
+from services.warmup import CacheWarmer
+
+pytestmark = pytest.mark.asyncio
+
+
+class FilmService:
+    def __init__(self):
+        self.calls = 0
+
+    async def refresh_by_sort(self, *args):
+        self.calls += 1
+        # Пока идет прогрев, стартуют остальные воркеры.
+        await asyncio.sleep(0.01)
+        return []
+
+    async def refresh_by_id(self, film_id):
+        self.calls += 1
+
+
+class GenreService:
+    def __init__(self, genres=()):
+        self.genres = [Genre(genre_id) for genre_id in genres]
+
+    async def get_all(self):
+        return self.genres
+
+
+class Genre:
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+
+class Film:
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+
+async def test_only_one_worker_warms_per_interval():
+    storage = RedisStorage(fakeredis.aioredis.FakeRedis())
+    services = [FilmService() for _ in range(3)]
+    await asyncio.gather(*(
+        CacheWarmer(
+            film_service, GenreService(), pages=1, page_size=10,
+            top_films=10, concurrency=1, claim=storage.claim,
+        ).run(0)
+        for film_service in services
+    ))
+    # Воркер, пришедший после окончания прогрева, тоже его не повторяет.
+    late = FilmService()
+    await CacheWarmer(
+        late, GenreService(), pages=1, page_size=10,
+        top_films=10, concurrency=1, claim=storage.claim,
+    ).run(0)
+
+    assert sorted(service.calls for service in services) == [0, 0, 3]
+    assert late.calls == 0
+
+
+async def test_refreshes_are_bounded_by_concurrency():
+    active = 0
+    peak = 0
+    refreshed = []
+
+    class SlowFilmService:
+        async def refresh(self, value):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            refreshed.append(value)
+            return value
+
+        async def refresh_by_sort(self, sort, page_size, page_number, genre_id):
+            return await self.refresh([Film(i) for i in range(page_size)])
+
+        async def refresh_by_id(self, film_id):
+            return await self.refresh(film_id)
+
+    warmer = CacheWarmer(
+        SlowFilmService(), GenreService(range(5)), pages=2, page_size=3,
+        top_films=4, concurrency=2, claim=None,
+    )
+    await warmer.warm()
+
+    # 6 жанров (с None) * 2 сортировки * 2 страницы, топ и 4 карточки.
+    assert len(refreshed) == 6 * 2 * 2 + 1 + 4
+    assert peak == 2
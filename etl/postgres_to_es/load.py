@@ -1,3 +1,4 @@
+import json
 import logging
 import time
 from typing import List, Iterator, Tuple, Optional
@@ -13,6 +14,27 @@ from state import State
 logger = logging.getLogger(__name__)
 
 
+def mapping_conflicts(expected: dict, actual: dict, path: str = '') -> List[str]:
+    """
+    Поля схемы expected, которых нет в маппинге индекса actual
+    или у которых в нём другой тип.
+    """
+    conflicts = []
+    actual_properties = actual.get('properties', {})
+    for name, field in expected.get('properties', {}).items():
+        current = actual_properties.get(name)
+        if current is None:
+            conflicts.append(f'{path}{name}: missing')
+            continue
+        expected_type = field.get('type', 'object')
+        current_type = current.get('type', 'object')
+        if expected_type != current_type:
+            conflicts.append(f'{path}{name}: {current_type} -> {expected_type}')
+            continue
+        conflicts.extend(mapping_conflicts(field, current, f'{path}{name}.'))
+    return conflicts
+
+
 class ElasticLoader:
     def __init__(
             self,
@@ -21,12 +43,18 @@ class ElasticLoader:
             config: ElasticConfig,
             index: str,
             elastic_conn: Optional[Elasticsearch] = None,
+            changes_stream: Optional[str] = None,
+            changes_stream_maxlen: int = 10_000,
+            cache_namespaces: Tuple[str, ...] = (),
     ) -> None:
         self.state = state
         self.state_key = state_key
         self.config = config
         self.index = index
         self.elastic_conn = elastic_conn
+        self.changes_stream = changes_stream
+        self.changes_stream_maxlen = changes_stream_maxlen
+        self.cache_namespaces = cache_namespaces
 
     @property
     def elastic_connection(self) -> Elasticsearch:
@@ -50,24 +78,64 @@ class ElasticLoader:
 
     @backoff(start_sleep_time=0.5)
     def create_index_if_not_exists(self, index_code) -> None:
-        """Создаёт индекс, если его не существовало."""
-        self.elastic_connection.indices.create(
+        """
+        Создаёт индекс, если его не существовало.
+        Если типы полей существующего индекса расходятся со схемой
+        (например, genre был keyword, а стал nested), документы в него
+        уже не загрузить: индекс пересоздаётся, а состояние ETL
+        сбрасывается, чтобы все документы загрузились заново.
+        Новый (в том числе пересозданный) индекс сбрасывает кеш API.
+        """
+        elastic_conn = self.elastic_connection
+        if elastic_conn.indices.exists(index=self.index):
+            mapping = elastic_conn.indices.get_mapping(index=self.index)
+            conflicts = mapping_conflicts(
+                index_code['mappings'], next(iter(mapping.values()))['mappings']
+            )
+            if not conflicts:
+                return
+            logger.warning(
+                'Index %s mapping is outdated (%s), recreating',
+                self.index, '; '.join(conflicts)
+            )
+            elastic_conn.indices.delete(index=self.index)
+            self.state.delete_state(self.state_key)
+        response = elastic_conn.indices.create(
             index=self.index,
             body=index_code,
             ignore=400
         )
+        if response.get('acknowledged'):
+            self.bump_cache_generations()
+
+    @backoff(start_sleep_time=0.5)
+    def bump_cache_generations(self) -> None:
+        """
+        Увеличивает поколения namespace кеша API, зависящих от индекса:
+        старые записи перестают читаться и истекают сами.
+        """
+        redis_conn = self.state.redis_connection
+        for namespace in self.cache_namespaces:
+            generation = redis_conn.incr(f'{namespace}:generation')
+            logger.info(
+                "Cache %s generation bumped to %s", namespace, generation
+            )
 
     @backoff(start_sleep_time=0.5)
     def generate_docs(
-            self, docs: Iterator[List[ESMovies | ESPersons | ESGenres]]
+            self,
+            docs: Iterator[List[ESMovies | ESPersons | ESGenres]],
+            changed_ids: List[str],
     ) -> Iterator[Tuple[dict, str]]:
         """
         Возвращает итератор документов для ES.
+        Собирает id документов в changed_ids.
         Записывает в стэйт дату последнего изменения, последней записи.
         """
         modified = ''
         for doc in docs:
             modified = doc.pop('modified')
+            changed_ids.append(str(doc['id']))
             yield doc
 
         if modified:
@@ -78,12 +146,17 @@ class ElasticLoader:
         """Загружает данные в ES используя итератор"""
         t = time.perf_counter()
 
-        docs_generator = self.generate_docs(docs)
+        changed_ids = []
+        docs_generator = self.generate_docs(docs, changed_ids)
         lines, _ = helpers.bulk(
             client=self.elastic_connection,
             actions=docs_generator,
             index=self.index,
-            chunk_size=itersize
+            chunk_size=itersize,
+            # Изменения публикуются для сброса кеша API: к этому моменту
+            # документы должны быть видны поиску, иначе API закеширует
+            # старую выдачу заново.
+            refresh='wait_for',
         )
 
         elapsed_time = time.perf_counter() - t
@@ -95,3 +168,21 @@ class ElasticLoader:
                 "%s lines saved in %s for index %s",
                 lines, elapsed_time, self.index
             )
+            self.publish_changes(changed_ids, itersize)
+
+    @backoff(start_sleep_time=0.5)
+    def publish_changes(self, ids: List[str], chunk_size: int) -> None:
+        """
+        Публикует id измененных документов в redis stream,
+        по которому API сбрасывает зависящие от них записи кеша.
+        """
+        if not self.changes_stream:
+            return
+        redis_conn = self.state.redis_connection
+        for i in range(0, len(ids), chunk_size):
+            redis_conn.xadd(
+                self.changes_stream,
+                {'index': self.index, 'ids': json.dumps(ids[i:i + chunk_size])},
+                maxlen=self.changes_stream_maxlen,
+                approximate=True,
+            )
@@ -26,9 +26,15 @@ genres_index = app_config.genres_index
 
 state = State(config=redis_config, redis_conn=Redis)
 postgres_extractor = PostgresExtractor(dsn=postgres_dsn)
-movies_loader = ElasticLoader(config=elastic_config, state=state, index=movies_index, state_key='movies_modified')
-persons_loader = ElasticLoader(config=elastic_config, state=state, index=persons_index, state_key='persons_modified')
-genres_loader = ElasticLoader(config=elastic_config, state=state, index=genres_index, state_key='genres_modified')
+changes_stream = app_config.changes_stream
+# Namespace кеша API, которые сбрасываются при пересоздании индекса:
+# фильмографии персон и кеш ответов тоже строятся по фильмам.
+movies_loader = ElasticLoader(config=elastic_config, state=state, index=movies_index, state_key='movies_modified',
+                              changes_stream=changes_stream, cache_namespaces=('film', 'person', 'response'))
+persons_loader = ElasticLoader(config=elastic_config, state=state, index=persons_index, state_key='persons_modified',
+                               changes_stream=changes_stream, cache_namespaces=('person', 'response'))
+genres_loader = ElasticLoader(config=elastic_config, state=state, index=genres_index, state_key='genres_modified',
+                              changes_stream=changes_stream, cache_namespaces=('genre', 'response'))
 
 loaders = {
     movies_loader: ('movies', ESMovies, INDEX_MOVIES),
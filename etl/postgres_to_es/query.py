@@ -11,7 +11,8 @@ def get_movies_query(modified: Optional[str]) -> str:
         film.rating AS imdb_rating,
         film.title,
         film.description,
-        ARRAY_AGG(DISTINCT genre.name) AS genre,
+        ARRAY_AGG(DISTINCT jsonb_build_object('id', genre.id, 'name', genre.name))
+            FILTER (WHERE genre.id IS NOT NULL) AS genre,
         ARRAY_AGG(DISTINCT jsonb_build_object('id', person.id, 'name', person.full_name))
             FILTER (WHERE person_film.role = 'director') AS director,
         ARRAY_AGG(DISTINCT person.full_name) FILTER (WHERE person_film.role = 'actor') AS actors_names,
@@ -11,11 +11,15 @@ class PersonInFilm(UUIDModel):
     name: str
 
 
+class GenreInFilm(UUIDModel):
+    name: str
+
+
 @dataclass
 class ESMovies:
     id: uuid.UUID
     imdb_rating: float | None
-    genre: list[str] | None
+    genre: list[GenreInFilm] | None
     title: str | None
     description: str | None
     director: list[PersonInFilm] | None
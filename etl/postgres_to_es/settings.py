@@ -32,6 +32,7 @@ class AppConfig(BaseSettings):
     movies_index: str = Field(env='MOVIES_INDEX')
     persons_index: str = Field(env='PERSONS_INDEX')
     genres_index: str = Field(env='GENRES_INDEX')
+    changes_stream: str = Field('cache:changes', env='CACHE_CHANGES_STREAM')
 
 
 postgres_dsn = PostgresDSN()
@@ -57,3 +57,8 @@ class State:
         if state:
             return state.decode()
         return default
+
+    @backoff()
+    def delete_state(self, key: str) -> None:
+        """Сбросить состояние для определённого ключа."""
+        self.redis_connection.delete(key)